@@ -1,36 +1,85 @@
-import sys, os
+import sys, os, time
+# Inicio del import de la app: referencia de los tiempos de arranque (services/health.py)
+_import_started = time.perf_counter()
 sys.path.append(os.path.dirname(__file__))
 
+import asyncio
 import logging
-from fastapi import FastAPI
-from services.neo4j import get_driver, close_driver
-from routers import pieces, puzzles, solver
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
+from services.neo4j import close_driver, close_async_driver, pool_metrics, warm_up
+from services.health import startup_state
+from services.metrics import MetricsMiddleware, TimedRoute, render_metrics
+from services.profiler import ProfilerMiddleware, get_profile
+from services.compression import CompressionMiddleware
+from routers import admin, assembly, pieces, puzzles, solver
+from core.batch import shutdown_executor
+from core.jobs import shutdown_jobs
+from repositories import PUZZLE_REPOSITORY
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(message)s"
 )
 
+# Segundos entre intentos de conexión mientras la base no responde
+NEO4J_WARMUP_RETRY_SECONDS = float(os.getenv("NEO4J_WARMUP_RETRY_SECONDS", "5"))
+
 app = FastAPI()
+app.router.route_class = TimedRoute
+# La compresión queda por dentro de las métricas: su costo se mide en la fase "serialize"
+app.add_middleware(CompressionMiddleware)
+# El perfilador queda por fuera de las métricas: su costo no se suma a la latencia medida
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilerMiddleware)
 
-@app.on_event("startup")
-async def startup_event():
+_warm_up_task = None
+
+
+async def _warm_up_neo4j():
     """
-    Se ejecuta al iniciar la aplicación.
-    Probaremos la conexión a Neo4j lanzando una consulta trivial.
+    Conecta con Neo4j en segundo plano: precalienta el pool, crea las restricciones e índices
+    que falten y marca la app como lista. Si la base no responde, reintenta cada
+    NEO4J_WARMUP_RETRY_SECONDS; mientras tanto /ready responde 503 y /live sigue en 200.
+    El esquema se intenta una sola vez: si falla (p. ej. sin permiso para crear restricciones),
+    la app queda lista igual y /ready lo informa en "schema".
     """
+    from services.schema import ensure_schema
+
+    while True:
+        try:
+            await warm_up()
+            break
+        except Exception as e:
+            startup_state.set_failed(e)
+            logging.error(f"❌ Error al conectar con Neo4j: {e}")
+            await asyncio.sleep(NEO4J_WARMUP_RETRY_SECONDS)
+    logging.info("✅ Conexión a Neo4j establecida correctamente.")
+
     try:
-        driver = get_driver()
-        # Abrimos una sesión y lanzamos un RETURN 1 AS test
-        with driver.session() as session:
-            result = session.run("RETURN 1 AS test")
-            record = result.single()
-            if record and record["test"] == 1:
-                logging.info("✅ Conexión a Neo4j establecida correctamente.")
-            else:
-                logging.error("❌ Conexión a Neo4j, pero la query de prueba no devolvió el resultado esperado.")
+        # Restricciones e índices (idempotente); usa el driver síncrono, en un hilo
+        startup_state.set_schema(await asyncio.to_thread(ensure_schema))
     except Exception as e:
-        logging.error(f"❌ Error al conectar con Neo4j: {e}")
+        startup_state.set_schema(None, e)
+        logging.error(f"❌ No se pudo preparar el esquema de Neo4j; se sigue sin él: {e}")
+    startup_state.set_ready()
+    logging.info(f"🚀 Lista en {startup_state.phases['ready']:.2f} s desde el inicio del import.")
+
+
+@app.on_event("startup")
+async def startup_event():
+    """
+    Se ejecuta al iniciar la aplicación, sin esperar a la base de datos: la conexión a Neo4j
+    (con el pool precalentado) y el esquema se preparan en segundo plano, y /ready indica
+    cuándo terminó. Con PUZZLE_REPOSITORY=memory no se usa Neo4j y la app queda lista de inmediato.
+    """
+    global _warm_up_task
+    startup_state.mark("startup")
+    if PUZZLE_REPOSITORY != "neo4j":
+        logging.info(f"🗃️ Repositorio '{PUZZLE_REPOSITORY}': se omite la conexión a Neo4j.")
+        startup_state.set_ready()
+        return
+    _warm_up_task = asyncio.create_task(_warm_up_neo4j())
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -38,8 +87,13 @@ async def shutdown_event():
     Se ejecuta al apagar la aplicación.
     Cerramos el driver para liberar recursos.
     """
+    if _warm_up_task is not None:
+        _warm_up_task.cancel()
     try:
+        shutdown_jobs()
+        shutdown_executor()
         close_driver()
+        await close_async_driver()
         logging.info("🔌 Driver de Neo4j cerrado correctamente.")
     except Exception as e:
         logging.error(f"⚠️ Error al cerrar el driver de Neo4j: {e}")
@@ -49,6 +103,47 @@ async def shutdown_event():
 async def ping():
     return {"message": "pong"}
 
+@app.get("/live")
+async def live():
+    """Sonda de vida: el proceso atiende requests (no consulta la base de datos)."""
+    return {"status": "alive"}
+
+@app.get("/ready")
+async def ready():
+    """
+    Sonda de disponibilidad: 503 hasta que el almacenamiento responde; incluye los tiempos de
+    arranque y el estado del esquema ("missing" no impide atender requests, sólo los hace más lentos).
+    """
+    state = startup_state.snapshot()
+    return JSONResponse(state, status_code=200 if state["ready"] else 503)
+
+@app.get("/metrics/neo4j")
+async def neo4j_pool_metrics():
+    """Uso del pool de conexiones: en uso, esperando, tiempo de espera, reintentos y fallos."""
+    return pool_metrics.snapshot()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Métricas en formato de texto de Prometheus: latencia por ruta, fases, piezas, cache y pool."""
+    return render_metrics()
+
+@app.get("/debug/profiles/{profile_id}", response_class=PlainTextResponse)
+async def debug_profile(
+    profile_id: str,
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls)$"),
+    limit: int = Query(50, ge=1, le=1000)
+):
+    """Resultado de un request perfilado con el header X-Profile (requiere PROFILER_ENABLED)."""
+    profile = get_profile(profile_id, sort, limit)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Perfil no encontrado")
+    return profile
+
 app.include_router(pieces.router)
 app.include_router(puzzles.router)
-app.include_router(solver.router)
\ No newline at end of file
+app.include_router(assembly.router)
+app.include_router(solver.router)
+app.include_router(admin.router)
+
+startup_state.started = _import_started
+startup_state.mark("import")
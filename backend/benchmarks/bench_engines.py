@@ -0,0 +1,58 @@
+"""
+Compara los motores "python" y "numpy" de solve_regular con puzzles sintéticos.
+Uso (desde la carpeta backend):
+
+    python -m benchmarks.bench_engines
+"""
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.steps import regular_solution, to_columns
+from core import render, numpy_engine
+from benchmarks.synthetic import synthetic_regular
+
+SIZES = [1_000, 10_000, 100_000]
+REPEAT = 3
+
+
+def best_time(fn, *args) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def python_text(puzzle, pieces):
+    return list(render.render_lines(*regular_solution(puzzle, pieces)))
+
+
+def python_structured(puzzle, pieces):
+    summary, steps = regular_solution(puzzle, pieces)
+    return summary, to_columns(steps)
+
+
+def main():
+    if not numpy_engine.available():
+        sys.exit("NumPy no está instalado.")
+
+    print(f"{'piezas':>8} | {'modo':>11} | {'python (ms)':>11} | {'numpy (ms)':>10} | {'speedup':>7}")
+    for n in SIZES:
+        puzzle, pieces = synthetic_regular(n)
+        assert python_text(puzzle, pieces) == numpy_engine.solve_regular(puzzle, pieces)
+        assert python_structured(puzzle, pieces) == numpy_engine.solve_regular_structured(puzzle, pieces)
+        for mode, py_fn, np_fn in (
+            ("texto", python_text, numpy_engine.solve_regular),
+            ("estructura", python_structured, numpy_engine.solve_regular_structured),
+            ("columnas", lambda pz, pc: list(regular_solution(pz, pc)[1]), numpy_engine.regular_columns),
+        ):
+            t_py = best_time(py_fn, puzzle, pieces)
+            t_np = best_time(np_fn, puzzle, pieces)
+            print(f"{n:>8} | {mode:>11} | {t_py * 1000:>11.1f} | {t_np * 1000:>10.1f} | {t_py / t_np:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Memoria de las piezas en el solver: compara un diccionario por pieza (como devolvía la lectura
+completa, con todas las propiedades del nodo) con las columnas compactas de core/pieces.py
+llenadas desde la proyección de la consulta. Para cada tamaño mide:
+- con tracemalloc, bytes retenidos por pieza al cargarlas y pico de memoria al resolver
+  (texto y estructurada) desde las piezas ya cargadas;
+- en otra corrida, sin tracemalloc, el tiempo de carga y de resolución.
+Las columnas las usan el motor NumPy, la solución estructurada y el streaming; la solución
+en texto por defecto (GET /solver/{id}) arma una IncrementalSolution con un diccionario por pieza.
+Uso (desde la carpeta backend):
+
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory --sizes 1000 100000 --regular
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core import solver
+from core.pieces import SOLVER_FIELDS, PieceColumns
+from benchmarks.synthetic import synthetic_irregular, synthetic_regular
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+def node_properties(pieces: list) -> list:
+    """Propiedades de cada nodo Piece tal como las guarda Neo4j (incluye ids en texto)."""
+    return [
+        {**p, "pieceId": str(uuid.UUID(int=i)), "puzzleId": "00000000-0000-0000-0000-000000000000"}
+        for i, p in enumerate(pieces)
+    ]
+
+
+def load_dicts(nodes: list) -> list:
+    return [{k: node[k] for k in node.keys()} for node in nodes]
+
+
+def load_columns(rows: list) -> PieceColumns:
+    return PieceColumns.from_rows(rows)
+
+
+def measure_memory(load, source, puzzle, solve) -> dict:
+    """Carga `source` con `load` y resuelve bajo tracemalloc; devuelve bytes retenidos y pico."""
+    gc.collect()
+    tracemalloc.start()
+    pieces = load(source)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    solve(puzzle, pieces)
+    solver.solve_structured(puzzle, pieces)
+    peak = tracemalloc.get_traced_memory()[1] - retained
+    tracemalloc.stop()
+    return {"retained": retained, "peak": peak}
+
+
+def measure_time(load, source, puzzle, solve) -> dict:
+    """Lo mismo sin tracemalloc (que encarece cada asignación); devuelve tiempos en ms."""
+    gc.collect()
+    t0 = time.perf_counter()
+    pieces = load(source)
+    loaded_ms = (time.perf_counter() - t0) * 1000
+    t0 = time.perf_counter()
+    solve(puzzle, pieces)
+    solver.solve_structured(puzzle, pieces)
+    solve_ms = (time.perf_counter() - t0) * 1000
+    return {"load_ms": loaded_ms, "solve_ms": solve_ms}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--regular", action="store_true", help="Puzzle regular (por defecto, irregular)")
+    args = parser.parse_args()
+
+    print(f"{'piezas':>8} | {'formato':>9} | {'B/pieza':>8} | {'pico al resolver':>16} | {'carga':>9} | {'resolver':>9}")
+    for n in args.sizes:
+        puzzle, pieces = synthetic_regular(n) if args.regular else synthetic_irregular(n)
+        puzzle["puzzleId"] = "p"
+        solve = solver.solve_regular if args.regular else solver.solve_irregular
+        nodes = node_properties(pieces)
+        rows = [[node.get(f) for f in SOLVER_FIELDS] for node in nodes]
+        for name, load, source in (("dicts", load_dicts, nodes), ("columnas", load_columns, rows)):
+            r = {**measure_memory(load, source, puzzle, solve), **measure_time(load, source, puzzle, solve)}
+            print(f"{n:>8} | {name:>9} | {r['retained'] / len(pieces):>8.0f} | {r['peak'] / 2**20:>13.1f} MB"
+                  f" | {r['load_ms']:>6.1f} ms | {r['solve_ms']:>6.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Benchmarks reproducibles de los caminos críticos, contra la API en el mismo proceso
+con el repositorio en memoria (sin Neo4j ni red):
+- solve_regular / solve_irregular / solve_edges (piezas sin numerar, por la forma de los bordes)
+- carga masiva de piezas (POST /puzzle/{id}/pieces/bulk)
+- list_pieces (GET /puzzle/{id}/pieces/) y list_puzzles (GET /puzzles/)
+
+Los resultados se guardan en JSON para comparar entre versiones.
+Uso (desde la carpeta backend):
+
+    python -m benchmarks.bench_suite                          # 100, 1k, 10k y 100k piezas
+    python -m benchmarks.bench_suite --sizes 100 1000 --output base.json
+    python -m benchmarks.bench_suite --compare base.json      # marca regresiones
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ["PUZZLE_REPOSITORY"] = "memory"
+
+import httpx
+from app import app
+from core import solver
+from repositories import get_repository
+from benchmarks.synthetic import synthetic_regular, synthetic_irregular, synthetic_edges, puzzle_payload
+
+SIZES = [100, 1_000, 10_000, 100_000]
+REPEAT = 3
+SEED = 0
+# Un resultado más lento que la referencia por encima de este factor cuenta como regresión
+REGRESSION_THRESHOLD = 1.2
+
+
+async def measure(fn, repeat: int) -> dict:
+    """Ejecuta `fn` (síncrona o corrutina) `repeat` veces y devuelve mejor y mediana en ms."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        if asyncio.iscoroutine(result):
+            await result
+        times.append((time.perf_counter() - t0) * 1000)
+    return {"best_ms": round(min(times), 3), "median_ms": round(statistics.median(times), 3)}
+
+
+async def run_suite(sizes: list, repeat: int) -> list:
+    results = []
+    repository = get_repository()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+        async def create(puzzle, pieces=None):
+            response = await client.post("/puzzles/", json=puzzle_payload(puzzle))
+            response.raise_for_status()
+            puzzle_id = response.json()["puzzleId"]
+            if pieces is not None:
+                response = await client.post(f"/puzzle/{puzzle_id}/pieces/bulk", json=pieces)
+                response.raise_for_status()
+            return puzzle_id
+
+        for n in sizes:
+            regular, regular_pieces = synthetic_regular(n, SEED)
+            irregular, irregular_pieces = synthetic_irregular(n, seed=SEED)
+            edges, edges_pieces = synthetic_edges(n, seed=SEED)
+
+            cases = [
+                ("solve_regular", lambda: solver.solve_regular(regular, regular_pieces, "python")),
+                ("solve_irregular", lambda: solver.solve_irregular(irregular, irregular_pieces)),
+                ("solve_edges", lambda: solver.solve_edges(edges, edges_pieces)),
+                ("bulk_create_pieces", lambda: create(regular, regular_pieces)),
+            ]
+            puzzle_id = await create(regular, regular_pieces)
+            cases.append(("list_pieces", lambda: client.get(f"/puzzle/{puzzle_id}/pieces/")))
+
+            for name, fn in cases:
+                results.append({"name": name, "size": n, **await measure(fn, repeat)})
+                print(f"{name:>20} | {n:>7} | {results[-1]['best_ms']:>10.1f} ms")
+
+            # list_puzzles con n puzzles; se insertan directo en el repositorio para no medir la carga
+            repository.clear()
+            payload = puzzle_payload(regular)
+            for i in range(n):
+                await repository.create_puzzle(f"00000000-0000-0000-0000-{i:012d}", payload)
+            results.append({"name": "list_puzzles", "size": n, **await measure(lambda: client.get("/puzzles/"), repeat)})
+            print(f"{'list_puzzles':>20} | {n:>7} | {results[-1]['best_ms']:>10.1f} ms")
+            repository.clear()
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(__file__)
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: list, baseline: dict, threshold: float) -> list:
+    """Compara con un JSON anterior; devuelve los casos más lentos que threshold × referencia."""
+    previous = {(r["name"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = previous.get((r["name"], r["size"]))
+        if not old or not old["best_ms"]:
+            continue
+        ratio = r["best_ms"] / old["best_ms"]
+        flag = "REGRESIÓN" if ratio > threshold else ""
+        print(f"{r['name']:>20} | {r['size']:>7} | {old['best_ms']:>10.1f} -> {r['best_ms']:>10.1f} ms | {ratio:>5.2f}x {flag}")
+        if flag:
+            regressions.append({**r, "baseline_ms": old["best_ms"], "ratio": round(ratio, 3)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de PuzzleSolver")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--output", help="Archivo JSON de resultados (por defecto benchmarks/results/<fecha>.json)")
+    parser.add_argument("--compare", help="JSON de una corrida anterior con el que comparar")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    # Sin el log por lote de la carga masiva
+    logging.getLogger().setLevel(logging.WARNING)
+
+    started = datetime.now(timezone.utc)
+    results = asyncio.run(run_suite(args.sizes, args.repeat))
+    report = {
+        "meta": {
+            "timestamp": started.isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repository": "memory",
+            "seed": SEED,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    output = args.output or os.path.join(
+        os.path.dirname(__file__), "results", started.strftime("%Y%m%dT%H%M%SZ") + ".json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Resultados guardados en {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
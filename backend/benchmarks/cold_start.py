@@ -0,0 +1,72 @@
+"""
+Tiempo de arranque en frío: en procesos nuevos mide el import de la app, el evento de startup
+y el primer /live, y verifica que los paquetes pesados (neo4j, numpy) no se carguen al importar.
+Con --repository neo4j apunta a una base inalcanzable para comprobar que /live no la espera.
+Uso (desde la carpeta backend):
+
+    python -m benchmarks.cold_start
+    python -m benchmarks.cold_start --runs 10 --max-import-ms 600   # sale con 1 si se supera
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Paquetes que sólo deben cargarse al usarse (driver de Neo4j, motor vectorizado)
+LAZY_MODULES = ("neo4j", "numpy")
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter() - started
+from fastapi.testclient import TestClient
+heavy = [m for m in %r if m in sys.modules]
+with TestClient(app.app) as client:
+    client.get("/live").raise_for_status()
+    live = time.perf_counter() - started
+    print(json.dumps({"import": imported, "live": live, "phases": app.startup_state.snapshot()["startupSeconds"], "heavy": heavy}))
+"""
+
+
+def probe(repository: str) -> dict:
+    env = {**os.environ, "PUZZLE_REPOSITORY": repository, "NEO4J_WARMUP_RETRY_SECONDS": "60"}
+    if repository == "neo4j":
+        env.update(NEO4J_URI="bolt://127.0.0.1:9", NEO4J_USERNAME="neo4j", NEO4J_PASSWORD="x")
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE % (LAZY_MODULES,)], cwd=BACKEND, env=env,
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--repository", choices=("memory", "neo4j"), default="memory")
+    parser.add_argument("--max-import-ms", type=float, default=None, help="Falla si la mediana del import lo supera")
+    args = parser.parse_args()
+
+    results = [probe(args.repository) for _ in range(args.runs)]
+    import_ms = statistics.median(r["import"] for r in results) * 1000
+    live_ms = statistics.median(r["live"] for r in results) * 1000
+    print(f"import de la app: {import_ms:.0f} ms (mediana de {args.runs})")
+    print(f"primer /live:     {live_ms:.0f} ms")
+    print(f"etapas:           {results[-1]['phases']}")
+
+    failed = False
+    heavy = sorted({m for r in results for m in r["heavy"]})
+    if heavy:
+        print(f"❌ Se importan al arrancar: {', '.join(heavy)}")
+        failed = True
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        print(f"❌ El import supera {args.max_import_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+Prueba de carga: lanza peticiones concurrentes contra uno o más servidores de la API
+y compara throughput y latencias (p50/p95). Sirve para comparar, p. ej., una versión
+con handlers síncronos y otra con el driver asíncrono, ambas con un solo worker.
+Uso (desde la carpeta backend, con la API levantada):
+
+    python -m benchmarks.load_test --path /solver/<puzzle_id> http://localhost:8000 http://localhost:8001
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run(base_url: str, path: str, requests: int, concurrency: int) -> dict:
+    """Hace `requests` peticiones GET con a lo sumo `concurrency` en vuelo a la vez."""
+    latencies, errors = [], 0
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                queue.get_nowait()
+                t0 = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+
+    return {
+        "rps": requests / elapsed,
+        "p50": percentile(latencies, 0.50) * 1000,
+        "p95": percentile(latencies, 0.95) * 1000,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API de PuzzleSolver")
+    parser.add_argument("base_urls", nargs="+", help="URLs base a comparar")
+    parser.add_argument("--path", default="/ping", help="Ruta a consultar (p. ej. /solver/<puzzle_id>)")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'servidor':>28} | {'req/s':>8} | {'p50 (ms)':>8} | {'p95 (ms)':>8} | {'errores':>7}")
+    for base_url in args.base_urls:
+        stats = asyncio.run(run(base_url, args.path, args.requests, args.concurrency))
+        print(f"{base_url:>28} | {stats['rps']:>8.1f} | {stats['p50']:>8.1f} | {stats['p95']:>8.1f} | {stats['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Generadores de puzzles sintéticos (reproducibles con una semilla) para los benchmarks."""
+import random
+
+
+def synthetic_regular(n: int, seed: int = 0):
+    """Puzzle regular de n piezas (5% faltantes y algunas inexistentes)."""
+    rnd = random.Random(seed)
+    row_size = max(1, int(n ** 0.5))
+    puzzle = {"puzzleTypeIsRegular": True, "puzzlePieceQty": n, "row_size": row_size}
+    pieces = [
+        {
+            "sequenceNumber": seq,
+            "pieceOrientation": rnd.choice([0, 90, 180, 270]),
+            "group": 1,
+            "status": "missing" if rnd.random() < 0.05 else "present",
+        }
+        for seq in range(1, n + 1)
+        if rnd.random() > 0.01
+    ]
+    rnd.shuffle(pieces)
+    return puzzle, pieces
+
+
+def synthetic_irregular(n: int, groups: int = None, seed: int = 0):
+    """
+    Puzzle irregular de n piezas repartidas en varios grupos de tamaño desigual
+    (por defecto ~sqrt(n)/2 grupos) con 5% de faltantes.
+    """
+    rnd = random.Random(seed)
+    groups = groups or max(1, int(n ** 0.5) // 2)
+    puzzle = {"puzzleTypeIsRegular": False, "puzzlePieceQty": n}
+    pieces = [
+        {
+            "sequenceNumber": seq,
+            "pieceOrientation": rnd.choice([0, 90, 180, 270]),
+            "group": min(groups, int(rnd.paretovariate(1.5))),
+            "status": "missing" if rnd.random() < 0.05 else "present",
+        }
+        for seq in range(1, n + 1)
+    ]
+    rnd.shuffle(pieces)
+    return puzzle, pieces
+
+
+def synthetic_edges(n: int, profiles: int = None, seed: int = 0):
+    """
+    Puzzle rectangular de ~n piezas sin numerar para el modo por bordes: cada unión interna
+    tiene un perfil al azar entre `profiles` (por defecto n, casi sin ambigüedad; con pocos
+    perfiles hay piezas intercambiables y la búsqueda debe retroceder). Las piezas se entregan
+    mezcladas, con números arbitrarios y giradas al azar.
+    """
+    rnd = random.Random(seed)
+    cols = max(2, int(n ** 0.5))
+    rows = max(2, n // cols)
+    profiles = profiles or rows * cols
+
+    def joint():
+        return rnd.choice((1, -1)) * rnd.randint(1, profiles)
+
+    # Borde derecho de cada celda (horizontal) y borde inferior (vertical); 0 en el marco
+    right = [[joint() if c < cols - 1 else 0 for c in range(cols)] for _ in range(rows)]
+    bottom = [[joint() if r < rows - 1 else 0 for _ in range(cols)] for r in range(rows)]
+    pieces = []
+    for r in range(rows):
+        for c in range(cols):
+            edges = [
+                -bottom[r - 1][c] if r else 0,
+                right[r][c],
+                bottom[r][c],
+                -right[r][c - 1] if c else 0,
+            ]
+            turns = rnd.randrange(4)
+            # La pieza llega girada: hay que girarla `turns` cuartos de vuelta para colocarla
+            pieces.append({"edges": edges[turns:] + edges[:turns], "pieceOrientation": 0, "group": 1, "status": "present"})
+    rnd.shuffle(pieces)
+    for seq, piece in enumerate(pieces, start=1):
+        piece["sequenceNumber"] = seq
+    puzzle = {
+        "puzzleTypeIsRegular": True, "solverMode": "edges",
+        "puzzlePieceQty": rows * cols, "row_size": cols,
+    }
+    return puzzle, pieces
+
+
+def puzzle_payload(puzzle: dict) -> dict:
+    """Cuerpo de POST /puzzles/ para un puzzle sintético."""
+    return {
+        "puzzleTypeIsRegular": puzzle["puzzleTypeIsRegular"],
+        "puzzleTheme": "Benchmark",
+        "puzzleBrand": "Synthetic",
+        "puzzlePieceQty": puzzle["puzzlePieceQty"],
+        "puzzleMaterial": "Cartón",
+        "row_size": puzzle.get("row_size"),
+        "solverMode": puzzle.get("solverMode"),
+    }
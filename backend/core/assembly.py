@@ -0,0 +1,182 @@
+"""
+Sesiones de armado: el avance de quien arma un puzzle guardado en el backend (qué filas o grupos
+ya terminó y hasta qué paso llegó), en lugar de vivir sólo en el estado del cliente.
+
+Los pasos de la solución estructurada forman bloques contiguos: una fila por cada `columns`
+pasos (regular y por bordes) o un grupo por tamaño de grupo (irregular, en el orden del resumen).
+Los límites de cada bloque se calculan con el resumen, sin recorrer los pasos, así que
+"los próximos N pasos sin terminar después del cursor" es una lectura por rango: se saltean los
+bloques terminados y sólo se copian (y se pasan a texto) los pasos que se devuelven.
+
+El cursor es la posición de un paso en la solución de la versión actual del puzzle.
+"""
+import uuid
+from typing import Optional
+
+from core import render
+from core.solver import solve_puzzle_structured_cached
+from core.steps import Step
+from repositories import get_repository
+
+# Pasos devueltos por defecto y como máximo en una lectura
+NEXT_LIMIT = 20
+MAX_NEXT_LIMIT = 1000
+
+
+class InvalidProgress(RuntimeError):
+    """Bloques o cursor que no existen en la solución actual (400)."""
+
+
+def block_kind(summary: dict) -> str:
+    return "group" if summary["mode"] == "irregular" else "row"
+
+
+def blocks(summary: dict, total: int) -> list:
+    """Bloques de la solución en orden: (clave, primera posición, posición siguiente a la última)."""
+    if summary["mode"] == "irregular":
+        found, start = [], 0
+        for group_id, size in zip(summary["groups"], summary["groupSizes"]):
+            found.append((group_id, start, start + size))
+            start += size
+        return found
+    width = summary["columns"] or total or 1
+    return [(row + 1, row * width, min((row + 1) * width, total)) for row in range(-(-total // width))]
+
+
+def progress(summary: dict, total: int, completed) -> dict:
+    """Bloques y pasos terminados según las claves completadas (las que ya no existen no cuentan)."""
+    done = set(completed)
+    found = blocks(summary, total)
+    finished = [(start, end) for key, start, end in found if key in done]
+    return {
+        "blocks": len(found),
+        "completedBlocks": len(finished),
+        "steps": total,
+        "remainingSteps": total - sum(end - start for start, end in finished),
+    }
+
+
+def unfinished_range(summary: dict, total: int, completed, after: int, limit: int):
+    """
+    Posiciones de los próximos `limit` pasos desde `after` (inclusive) que no pertenecen a un
+    bloque terminado, y la posición desde la que sigue la próxima lectura (None si no quedan).
+    """
+    done = set(completed)
+    positions = []
+    for key, start, end in blocks(summary, total):
+        if key in done or end <= after:
+            continue
+        begin = max(start, after)
+        if len(positions) == limit:
+            return positions, begin
+        take = min(end - begin, limit - len(positions))
+        positions.extend(range(begin, begin + take))
+        if begin + take < end:
+            return positions, begin + take
+    return positions, None
+
+
+def _view(session: dict, solution: dict) -> dict:
+    summary = solution["summary"]
+    total = len(solution["steps"]["seq"])
+    return {
+        **session,
+        "completed": sorted(session["completed"]),
+        "version": solution["version"],
+        "mode": summary["mode"],
+        "blockKind": block_kind(summary),
+        "summary": {**summary, "text": render.summary_line(summary)},
+        "progress": progress(summary, total, session["completed"]),
+    }
+
+
+async def _solution(puzzle_id: str) -> dict:
+    return await solve_puzzle_structured_cached(puzzle_id)
+
+
+async def create_session(puzzle_id: str) -> dict:
+    """Crea una sesión sin avance. ValueError si el puzzle no existe o no tiene piezas."""
+    solution = await _solution(puzzle_id)
+    session = await get_repository().create_assembly(puzzle_id, str(uuid.uuid4()))
+    if session is None:
+        raise ValueError("Puzzle no encontrado.")
+    return _view(session, solution)
+
+
+async def _session(session_id: str) -> dict:
+    session = await get_repository().get_assembly(session_id)
+    if session is None:
+        raise ValueError("Sesión no encontrada.")
+    return session
+
+
+async def get_session(session_id: str) -> dict:
+    """Estado de la sesión con el resumen de la solución y el avance."""
+    session = await _session(session_id)
+    return _view(session, await _solution(session["puzzleId"]))
+
+
+async def list_sessions(puzzle_id: str) -> list:
+    sessions = await get_repository().list_assemblies(puzzle_id)
+    if sessions is None:
+        raise ValueError("Puzzle no encontrado.")
+    return sessions
+
+
+async def update_session(session_id: str, complete: list, reopen: list, cursor: Optional[int]) -> dict:
+    """
+    Marca bloques como terminados (`complete`) o pendientes (`reopen`) y mueve el cursor.
+    InvalidProgress si un bloque no existe en la solución actual o el cursor está fuera de rango.
+    """
+    session = await _session(session_id)
+    solution = await _solution(session["puzzleId"])
+    summary = solution["summary"]
+    total = len(solution["steps"]["seq"])
+    keys = {key for key, _, _ in blocks(summary, total)}
+    unknown = sorted(set(complete) - keys, key=str)
+    if unknown:
+        kind = "filas" if block_kind(summary) == "row" else "grupos"
+        raise InvalidProgress(f"No existen estas {kind} en la solución: {unknown}")
+    if cursor is not None and cursor > total:
+        raise InvalidProgress(f"El cursor debe estar entre 0 y {total}.")
+
+    complete = list(dict.fromkeys(complete))
+    session = await get_repository().update_assembly(session_id, complete, list(reopen), cursor)
+    if session is None:
+        raise ValueError("Sesión no encontrada.")
+    return _view(session, solution)
+
+
+async def delete_session(session_id: str) -> None:
+    if not await get_repository().delete_assembly(session_id):
+        raise ValueError("Sesión no encontrada.")
+
+
+async def next_steps(session_id: str, limit: int = NEXT_LIMIT, after: Optional[int] = None,
+                     text: bool = True) -> dict:
+    """
+    Los próximos `limit` pasos sin terminar desde `after` (por defecto, el cursor de la sesión),
+    en columnas como la solución estructurada más su posición; nextCursor es el `after` de la
+    lectura siguiente (None si no quedan).
+    """
+    session = await _session(session_id)
+    solution = await _solution(session["puzzleId"])
+    summary, steps = solution["summary"], solution["steps"]
+    total = len(steps["seq"])
+    after = session["cursor"] if after is None else after
+    positions, next_cursor = unfinished_range(summary, total, session["completed"], min(after, total), limit)
+
+    page = {field: [steps[field][i] for i in positions] for field in Step._fields}
+    page["position"] = positions
+    if text:
+        line = render.step_line(summary["mode"])
+        page["text"] = [line(Step._make(row)) for row in zip(*(page[f] for f in Step._fields))]
+    return {
+        "sessionId": session_id,
+        "puzzleId": session["puzzleId"],
+        "version": solution["version"],
+        "blockKind": block_kind(summary),
+        "after": after,
+        "nextCursor": next_cursor,
+        "steps": page,
+    }
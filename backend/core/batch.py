@@ -0,0 +1,56 @@
+import os
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from core.solver import solve_loaded
+
+# Procesos para resolver lotes de puzzles (por defecto, uno por núcleo)
+SOLVER_BATCH_WORKERS = int(os.getenv("SOLVER_BATCH_WORKERS", "0")) or os.cpu_count()
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Inicializa y retorna el pool de procesos singleton."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=SOLVER_BATCH_WORKERS)
+        return _executor
+
+
+def shutdown_executor() -> None:
+    """Detiene el pool (llamar al apagar la app)."""
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
+
+
+def _solve_job(puzzle_id: str, puzzle: dict, pieces: list, engine: str):
+    """
+    Se ejecuta en un proceso del pool.
+    Devuelve (puzzle_id, instrucciones | None, error | None) para identificar el resultado.
+    """
+    try:
+        return puzzle_id, solve_loaded(puzzle, pieces, engine), None
+    except (ValueError, RuntimeError) as e:
+        return puzzle_id, None, str(e)
+
+
+async def solve_many(loaded: dict, engine: str = None):
+    """
+    Resuelve en el pool de procesos los puzzles ya cargados ({id: (puzzle, piezas)})
+    y produce (puzzle_id, instrucciones | None, error | None) a medida que terminan.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    pending = [
+        loop.run_in_executor(executor, _solve_job, puzzle_id, puzzle, pieces, engine)
+        for puzzle_id, (puzzle, pieces) in loaded.items()
+    ]
+    for future in asyncio.as_completed(pending):
+        yield await future
@@ -0,0 +1,129 @@
+import os
+import sys
+import time
+import threading
+from collections import OrderedDict
+
+from services.metrics import add_collector, gauge_lines
+
+
+def estimate_size(value) -> int:
+    """Tamaño aproximado en bytes de una solución (lista de instrucciones o columnas)."""
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class SolutionCache:
+    """
+    Cache LRU de soluciones con expiración (TTL) y límite de memoria.
+    Las entradas se indexan por (puzzle_id, version): cualquier escritura sobre el puzzle
+    incrementa su versión, por lo que una solución cacheada nunca queda desactualizada.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 600, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # (puzzle_id, version) -> (expira_en, tamaño, valor)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, puzzle_id: str, version: int):
+        key = (puzzle_id, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, puzzle_id: str, version: int, value) -> None:
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        key = (puzzle_id, version)
+        with self._lock:
+            same = [k for k in self._entries if k[0] == puzzle_id]
+            # Una resolución lenta que termina después de otra más nueva no la reemplaza
+            if any(k[1] > version for k in same):
+                return
+            # Las versiones anteriores del mismo puzzle ya no sirven
+            for old in same:
+                self._remove(old)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, puzzle_id: str) -> None:
+        """Descarta todas las soluciones cacheadas de un puzzle."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == puzzle_id]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, key) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+def _from_env() -> SolutionCache:
+    return SolutionCache(
+        max_entries=int(os.getenv("SOLVER_CACHE_MAX_ENTRIES", "256")),
+        ttl_seconds=float(os.getenv("SOLVER_CACHE_TTL_SECONDS", "600")),
+        max_bytes=int(os.getenv("SOLVER_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    )
+
+
+# Instancias compartidas por los routers: instrucciones en texto y solución estructurada
+solution_cache = _from_env()
+structured_cache = _from_env()
+
+
+def _cache_metrics() -> list:
+    caches = {"instructions": solution_cache.stats(), "structured": structured_cache.stats()}
+    lines = []
+    for field, kind, help_text in (
+        ("hits", "counter", "Aciertos del cache de soluciones."),
+        ("misses", "counter", "Fallos del cache de soluciones."),
+        ("evictions", "counter", "Entradas desalojadas del cache de soluciones."),
+        ("entries", "gauge", "Soluciones en cache."),
+        ("bytes", "gauge", "Memoria aproximada usada por el cache de soluciones."),
+    ):
+        suffix = "_total" if kind == "counter" else ""
+        lines.extend(gauge_lines(
+            f"solver_cache_{field}{suffix}", help_text,
+            [({"cache": name}, stats[field]) for name, stats in caches.items()], kind,
+        ))
+    return lines
+
+
+add_collector(_cache_metrics)
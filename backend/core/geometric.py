@@ -0,0 +1,265 @@
+"""
+Motor geométrico: arma un puzzle rectangular de piezas sin numerar a partir de la forma
+de sus bordes (puzzles con solverMode="edges").
+
+Cada pieza trae `edges`: cuatro enteros [arriba, derecha, abajo, izquierda] tal como está
+la pieza (0°): 0 = borde plano, +k = saliente con perfil k, -k = entrante con perfil k.
+Dos bordes encajan si suman 0 y no son planos.
+
+Búsqueda:
+1. Se verifica el marco por conteo de bordes planos (4 esquinas, piezas de borde e interiores).
+2. Se arma primero el marco (en sentido horario desde la esquina superior izquierda) y luego
+   el interior fila por fila, de modo que cada celda tiene al menos dos lados contiguos conocidos.
+3. Los candidatos de una celda salen de un índice (lado, borde, borde del lado siguiente) ->
+   [(pieza, giro)]; sólo se aceptan los giros cuyos cuatro lados cumplen con los vecinos
+   ya colocados y con el marco (planos exactamente hacia afuera).
+4. Propagación por conteo: tras cada colocación, cada borde abierto de la frontera debe
+   tener al menos tantos bordes complementarios entre las piezas sin usar; si no, se descarta.
+5. Si una celda se queda sin candidatos se retrocede (backtracking iterativo con pila
+   explícita) hasta GEOMETRIC_MAX_STEPS colocaciones.
+
+Con perfiles casi únicos (lo normal en piezas reales) la búsqueda es prácticamente lineal;
+con muy pocos perfiles distintos el problema es combinatorio y puede agotar el límite.
+"""
+import os
+from collections import defaultdict
+
+from core.steps import Step, UnsolvablePuzzle
+from services.progress import report
+
+# Colocaciones de prueba antes de abandonar la búsqueda
+GEOMETRIC_MAX_STEPS = int(os.getenv("GEOMETRIC_MAX_STEPS", "2000000"))
+# Cada cuántas colocaciones de prueba se informa el avance (celdas colocadas / total)
+PROGRESS_EVERY = 4096
+
+TOP, RIGHT, BOTTOM, LEFT = range(4)
+# Desplazamiento (fila, columna) hacia el vecino de cada lado
+_NEIGHBOR = ((-1, 0), (0, 1), (1, 0), (0, -1))
+
+
+def is_edges_puzzle(puzzle: dict) -> bool:
+    return bool(puzzle) and puzzle.get("solverMode") == "edges"
+
+
+def rotate(edges, turns: int) -> tuple:
+    """Bordes de la pieza girada `turns` cuartos de vuelta en sentido horario."""
+    turns %= 4
+    edges = tuple(edges)
+    return edges[-turns:] + edges[:-turns] if turns else edges
+
+
+def _cell_order(rows: int, cols: int) -> list:
+    """Marco en sentido horario desde (0, 0) y luego el interior fila por fila."""
+    ring = [(0, c) for c in range(cols)]
+    ring += [(r, cols - 1) for r in range(1, rows)]
+    if rows > 1:
+        ring += [(rows - 1, c) for c in range(cols - 2, -1, -1)]
+    if cols > 1:
+        ring += [(r, 0) for r in range(rows - 2, 0, -1)]
+    order = list(dict.fromkeys(ring))
+    order += [(r, c) for r in range(1, rows - 1) for c in range(1, cols - 1)]
+    return order
+
+
+def _check_frame(edge_sets: list, rows: int, cols: int) -> None:
+    """Descarta de entrada los puzzles cuyo número de esquinas y bordes no cuadra con la grilla."""
+    if rows < 2 or cols < 2:
+        return
+    flats = defaultdict(int)
+    for edges in edge_sets:
+        flats[sum(1 for e in edges if e == 0)] += 1
+    expected = {2: 4, 1: 2 * (rows - 2) + 2 * (cols - 2), 0: (rows - 2) * (cols - 2)}
+    if dict(flats) != {k: v for k, v in expected.items() if v}:
+        raise UnsolvablePuzzle(
+            f"Los bordes no forman un marco de {rows}x{cols}: se esperaban {expected[2]} esquinas, "
+            f"{expected[1]} piezas de borde y {expected[0]} interiores; "
+            f"hay {flats[2]}, {flats[1]} y {flats[0]}."
+        )
+
+
+class EdgeSolver:
+    """Búsqueda de la colocación (pieza, giro) de cada celda de una grilla rows x cols."""
+
+    def __init__(self, edge_sets: list, rows: int, cols: int, max_steps: int = None):
+        self.rows = rows
+        self.cols = cols
+        self.max_steps = max_steps or GEOMETRIC_MAX_STEPS
+        self.steps = 0
+        # Índice: (lado, borde de ese lado, borde del lado siguiente) -> [(pieza, giro, bordes)]
+        self.index = defaultdict(list)
+        for i, edges in enumerate(edge_sets):
+            seen = set()
+            for turns in range(4):
+                rotated = rotate(edges, turns)
+                if rotated in seen:
+                    continue  # Pieza simétrica: el giro no aporta otra colocación
+                seen.add(rotated)
+                for side in range(4):
+                    self.index[(side, rotated[side], rotated[(side + 1) % 4])].append((i, turns, rotated))
+        self.placed = {}  # (fila, columna) -> bordes colocados
+        # Propagación por conteo: bordes de las piezas sin usar por valor (oferta) y bordes
+        # que exige la frontera de lo ya armado (demanda); nunca puede faltar oferta
+        self.supply = defaultdict(int)
+        for edges in edge_sets:
+            for value in edges:
+                self.supply[value] += 1
+        self.demand = defaultdict(int)
+
+    def _required(self, cell) -> dict:
+        """Borde exigido en cada lado conocido: plano hacia afuera, complementario junto a un vecino."""
+        r, c = cell
+        required = {}
+        for side, (dr, dc) in enumerate(_NEIGHBOR):
+            nr, nc = r + dr, c + dc
+            if not (0 <= nr < self.rows and 0 <= nc < self.cols):
+                required[side] = 0
+            elif (nr, nc) in self.placed:
+                required[side] = -self.placed[(nr, nc)][(side + 2) % 4]
+        return required
+
+    def _candidates(self, cell) -> list:
+        required = self._required(cell)
+        # El par de lados contiguos conocidos más selectivo (con algún vecino, no sólo planos)
+        pairs = [(s, (s + 1) % 4) for s in range(4) if s in required and (s + 1) % 4 in required]
+        pairs.sort(key=lambda pair: not (required[pair[0]] or required[pair[1]]))
+        if pairs:
+            side, following = pairs[0]
+            pool = self.index.get((side, required[side], required[following]), ())
+        else:
+            pool = [entry for entries in self.index.values() for entry in entries]
+        return [
+            entry for entry in pool
+            if all(entry[2][s] == v for s, v in required.items())
+            and all(entry[2][s] != 0 for s in range(4) if s not in required)
+        ]
+
+    def _apply(self, cell, rotated, sign: int) -> bool:
+        """
+        Coloca (sign=1) o retira (sign=-1) una pieza y actualiza la oferta de bordes libres y
+        la demanda de la frontera. Al colocar devuelve False si algún borde exigido por la
+        frontera ya no tiene suficientes bordes complementarios entre las piezas sin usar.
+        """
+        r, c = cell
+        touched = []
+        for side, (dr, dc) in enumerate(_NEIGHBOR):
+            value = rotated[side]
+            self.supply[value] -= sign
+            touched.append(value)
+            nr, nc = r + dr, c + dc
+            if not (0 <= nr < self.rows and 0 <= nc < self.cols):
+                continue
+            if (nr, nc) in self.placed:
+                self.demand[value] -= sign  # Este lado cubre un borde abierto del vecino
+            else:
+                self.demand[-value] += sign  # Nuevo borde abierto hacia una celda vacía
+                touched.append(-value)
+        if sign < 0:
+            return True
+        return all(self.demand[v] <= self.supply[v] for v in touched if v)
+
+    def solve(self) -> dict:
+        """Devuelve {(fila, columna): (pieza, giro)}; UnsolvablePuzzle si no hay solución."""
+        order = _cell_order(self.rows, self.cols)
+        used = set()
+        placement = {}
+        candidates = [None] * len(order)
+        position = [0] * len(order)
+        depth = 0
+        while depth < len(order):
+            cell = order[depth]
+            if candidates[depth] is None:
+                candidates[depth] = self._candidates(cell)
+                position[depth] = 0
+
+            options = candidates[depth]
+            placed = False
+            while position[depth] < len(options):
+                i, turns, rotated = options[position[depth]]
+                position[depth] += 1
+                if i in used:
+                    continue
+                self.steps += 1
+                if self.steps % PROGRESS_EVERY == 0:
+                    report(depth, len(order))
+                if self.steps > self.max_steps:
+                    raise UnsolvablePuzzle(
+                        f"No se encontró una colocación en {self.max_steps} intentos (GEOMETRIC_MAX_STEPS)."
+                    )
+                if not self._apply(cell, rotated, 1):
+                    self._apply(cell, rotated, -1)
+                    continue
+                used.add(i)
+                placement[cell] = (i, turns)
+                self.placed[cell] = rotated
+                placed = True
+                break
+            if placed:
+                depth += 1
+                continue
+
+            # Sin candidatos: se retrocede a la celda anterior y se prueba su siguiente opción
+            candidates[depth] = None
+            depth -= 1
+            if depth < 0:
+                raise UnsolvablePuzzle("Las piezas no encajan en ninguna colocación completa.")
+            previous = order[depth]
+            used.discard(placement.pop(previous)[0])
+            rotated = self.placed.pop(previous)
+            self._apply(previous, rotated, -1)
+        report(len(order), len(order))
+        return placement
+
+
+def edges_summary(puzzle: dict, piece_count: int) -> dict:
+    cols = puzzle.get("row_size")
+    return {
+        "mode": "edges",
+        "rows": piece_count // cols if cols else None,
+        "columns": cols,
+        "total": piece_count,
+        "missing": 0,
+        "groups": [],
+        "groupSizes": [],
+    }
+
+
+def edges_solution(puzzle: dict, pieces: list, max_steps: int = None):
+    """
+    Resumen y pasos (uno por celda, por filas) de un puzzle por bordes: cada paso indica la
+    pieza (por su sequenceNumber), su posición y cuánto girarla respecto de cómo está.
+    """
+    summary, placed = edges_placements(puzzle, pieces, max_steps)
+    return summary, (step for _, step in placed)
+
+
+def edges_placements(puzzle: dict, pieces: list, max_steps: int = None):
+    """
+    Como edges_solution, pero cada paso va con el índice de la pieza en `pieces`: aquí la pieza
+    se elige por su forma, así que sequenceNumber no la identifica (puede repetirse o faltar).
+    Devuelve (resumen, [(índice, paso)]).
+    """
+    cols = puzzle.get("row_size")
+    total = puzzle.get("puzzlePieceQty") or len(pieces)
+    if not cols:
+        raise UnsolvablePuzzle("El modo por bordes requiere row_size (piezas por fila).")
+    if total % cols:
+        raise UnsolvablePuzzle(f"{total} piezas no forman filas completas de {cols}.")
+    if len(pieces) != total or any(p.get("status", "present") != "present" for p in pieces):
+        raise UnsolvablePuzzle("El modo por bordes necesita todas las piezas presentes.")
+    if any(len(p.get("edges") or ()) != 4 for p in pieces):
+        raise UnsolvablePuzzle("Todas las piezas deben tener sus 4 bordes (edges).")
+
+    rows = total // cols
+    edge_sets = [tuple(p["edges"]) for p in pieces]
+    _check_frame(edge_sets, rows, cols)
+    placement = EdgeSolver(edge_sets, rows, cols, max_steps).solve()
+
+    summary = edges_summary(puzzle, total)
+    placed = [
+        (i, Step(
+            pieces[i].get("sequenceNumber"), r + 1, c + 1, pieces[i].get("group"),
+            turns * 90, False, False,
+        ))
+        for (r, c), (i, turns) in sorted(placement.items())
+    ]
+    return summary, placed
@@ -0,0 +1,172 @@
+import csv
+import json
+from typing import AsyncIterator, Tuple, Union
+
+from pydantic import ValidationError
+from models.piece import PieceCreate
+
+_BOM = b"\xef\xbb\xbf"
+
+INVALID_UTF8 = "La línea no es texto UTF-8 válido"
+# Largo máximo de una línea: una sin saltos de línea no acumula el resto del cuerpo en memoria
+MAX_LINE_BYTES = 64 * 1024
+# Un registro CSV con un campo entre comillas puede abarcar varias líneas; se acota su tamaño
+# para que unas comillas sin cerrar no acumulen el resto del cuerpo en memoria
+MAX_CSV_RECORD_CHARS = 64 * 1024
+
+
+class InvalidLine:
+    """Línea que no se pudo leer (no es UTF-8 o es demasiado larga), con el motivo."""
+
+    def __init__(self, error: str):
+        self.error = error
+
+
+async def iter_lines(chunks: AsyncIterator[bytes],
+                     max_line_bytes: int = MAX_LINE_BYTES) -> AsyncIterator[Union[str, InvalidLine]]:
+    """
+    Convierte un flujo de bloques de bytes en líneas de texto, sin cargar todo el cuerpo.
+    Sólo se mantiene en memoria la línea incompleta, y cada bloque se recorre una sola vez.
+    Cada línea se decodifica por separado: una que no es UTF-8 válido, o que supera
+    `max_line_bytes`, se produce como InvalidLine (una sola vez, saltando hasta el próximo
+    salto de línea) y el resto del cuerpo se sigue leyendo.
+    """
+    parts, size = [], 0
+    skipping, first = False, True
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end < 0:
+                break
+            if not skipping:
+                if size + end - start > max_line_bytes:
+                    yield _too_long(max_line_bytes)
+                else:
+                    parts.append(chunk[start:end])
+                    yield _decode(b"".join(parts), first)
+            parts, size, skipping, first = [], 0, False, False
+            start = end + 1
+        if skipping or start == len(chunk):
+            continue
+        parts.append(chunk[start:])
+        size += len(chunk) - start
+        if size > max_line_bytes:
+            yield _too_long(max_line_bytes)
+            parts, size, skipping, first = [], 0, True, False
+    if parts:
+        yield _decode(b"".join(parts), first)
+
+
+def _too_long(max_line_bytes: int) -> InvalidLine:
+    return InvalidLine(f"La línea supera {max_line_bytes} bytes")
+
+
+def _decode(line: bytes, first: bool) -> Union[str, InvalidLine]:
+    if first and line.startswith(_BOM):
+        line = line[len(_BOM):]
+    try:
+        return line.decode("utf-8").rstrip("\r")
+    except UnicodeDecodeError:
+        return InvalidLine(INVALID_UTF8)
+
+
+class _Feed:
+    """Iterador de líneas que se le van agregando; alimenta un único csv.reader."""
+
+    def __init__(self):
+        self.pending = []
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.pending:
+            raise StopIteration
+        return self.pending.pop(0)
+
+
+async def _ndjson_records(lines: AsyncIterator[Union[str, InvalidLine]]):
+    """(número de línea, objeto | None, error | None) por cada línea no vacía."""
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if isinstance(line, InvalidLine):
+            yield line_no, None, line.error
+        elif line.strip():
+            try:
+                yield line_no, json.loads(line), None
+            except ValueError as e:
+                yield line_no, None, str(e)
+
+
+async def _csv_records(lines: AsyncIterator[Union[str, InvalidLine]]):
+    """
+    (número de la primera línea, celdas | None, error | None) por cada registro no vacío.
+    Las líneas pasan por un solo csv.reader, así que un campo entre comillas puede contener
+    saltos de línea; al reader sólo se le entregan registros completos (comillas pareadas).
+    """
+    feed = _Feed()
+    reader = csv.reader(feed)
+    record, start, quotes, size = [], 0, 0, 0
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if isinstance(line, InvalidLine):
+            if record:
+                yield start, None, "Campo entre comillas interrumpido por una línea inválida"
+                record, quotes, size = [], 0, 0
+            yield line_no, None, line.error
+            continue
+        if not record:
+            start = line_no
+        record.append(line + "\n")
+        quotes += line.count('"')
+        size += len(line)
+        if quotes % 2:
+            if size > MAX_CSV_RECORD_CHARS:
+                yield start, None, f"Campo entre comillas sin cerrar (más de {MAX_CSV_RECORD_CHARS} caracteres)"
+                record, quotes, size = [], 0, 0
+            continue
+        if len(record) > 1 or line.strip():
+            feed.pending.extend(record)
+            try:
+                yield start, next(reader), None
+            except csv.Error as e:
+                feed.pending.clear()
+                yield start, None, str(e)
+        record, quotes, size = [], 0, 0
+    if record:
+        yield start, None, "Campo entre comillas sin cerrar"
+
+
+async def iter_piece_rows(lines: AsyncIterator[Union[str, InvalidLine]], fmt: str) -> AsyncIterator[Tuple[int, dict, str]]:
+    """
+    Valida cada fila de forma perezosa.
+    Produce tuplas (número de línea, pieza validada | None, error | None).
+    - fmt="ndjson": un objeto JSON por línea.
+    - fmt="csv": la primera línea es el encabezado con los nombres de los campos.
+    """
+    header = None
+    records = _csv_records(lines) if fmt == "csv" else _ndjson_records(lines)
+    async for line_no, raw, error in records:
+        if error:
+            yield line_no, None, error
+            continue
+        try:
+            if fmt == "csv":
+                values = raw
+                if header is None:
+                    header = [h.strip() for h in values]
+                    continue
+                # Las celdas vacías usan el valor por defecto del modelo
+                raw = {k: v.strip() for k, v in zip(header, values) if v.strip() != ""}
+                # Los bordes van en una sola celda separados por ";" (p. ej. "0;3;-2;0")
+                if "edges" in raw:
+                    raw["edges"] = raw["edges"].split(";")
+            # Los campos opcionales sin valor (p. ej. edges) no se envían
+            piece = PieceCreate(**raw).model_dump(exclude_none=True)
+        except (ValueError, TypeError, ValidationError) as e:
+            yield line_no, None, str(e)
+            continue
+        yield line_no, piece, None
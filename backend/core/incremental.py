@@ -0,0 +1,212 @@
+import bisect
+import os
+import threading
+from collections import OrderedDict, defaultdict, deque
+
+from core import render
+from core.steps import piece_step
+
+
+class IncrementalSolution:
+    """
+    Solución de un puzzle que conserva su estructura por posición (regular) o por grupo
+    (irregular), de modo que el cambio de una pieza sólo regenera las líneas afectadas
+    y el resumen, en lugar de todo el puzzle.
+
+    Cada línea tiene una clave estable:
+    - "summary": línea de resumen.
+    - "piece:<seq>": posición de un puzzle regular.
+    - "group:<id>": encabezado de un grupo irregular.
+    - "piece:<pieceId>": pieza de un puzzle irregular.
+    """
+
+    def __init__(self, puzzle: dict, pieces: list, version: int = 0, history: int = 1000):
+        self.version = version
+        self.regular = bool(puzzle.get("puzzleTypeIsRegular"))
+        self.total = puzzle.get("puzzlePieceQty") or len(pieces)
+        self.pieces = {p["pieceId"]: dict(p) for p in pieces}
+        self.present_count = sum(1 for p in pieces if p.get("status") == "present")
+        self.lines = {}
+        # Historial acotado de cambios: (versión, clave, texto | None si se eliminó la línea)
+        self.changes = deque(maxlen=history)
+        # Versión más antigua desde la que el historial está completo
+        self.history_floor = version
+
+        if self.regular:
+            self.row_size = puzzle.get("row_size")
+            self.column_size = puzzle.get("column_size") or (self.total // self.row_size)
+            # Igual que seq_map en solve_regular: la última pieza con un número gana
+            self.seq_owner = {p["sequenceNumber"]: p["pieceId"] for p in pieces}
+            for seq in range(1, self.total + 1):
+                self.lines[f"piece:{seq}"] = self._regular_line(seq)
+        else:
+            # Por grupo: lista ordenada de (sequenceNumber, orden de llegada, pieceId)
+            self.groups = defaultdict(list)
+            self._arrival = 0
+            for p in pieces:
+                self._insert_in_group(p)
+            for group_id, members in self.groups.items():
+                self.lines[f"group:{group_id}"] = render.group_header(group_id, len(members))
+                for _, _, piece_id in members:
+                    self.lines[f"piece:{piece_id}"] = self._irregular_line(self.pieces[piece_id])
+        self.lines["summary"] = self._summary()
+
+    # -- Construcción de líneas ------------------------------------------------------------
+
+    def _summary(self) -> str:
+        missing = self.total - self.present_count
+        if self.regular:
+            return render.regular_summary(self.row_size, self.column_size, self.total, missing)
+        return render.irregular_summary(len(self.groups), self.total, missing)
+
+    def _regular_line(self, seq: int) -> str:
+        row = (seq - 1) // self.column_size + 1
+        col = (seq - 1) % self.column_size + 1
+        owner = self.seq_owner.get(seq)
+        return render.regular_line(piece_step(seq, row, col, self.pieces.get(owner)))
+
+    def _irregular_line(self, piece: dict) -> str:
+        return render.irregular_line(piece_step(piece["sequenceNumber"], None, None, piece))
+
+    def _insert_in_group(self, piece: dict) -> None:
+        self._arrival += 1
+        bisect.insort(
+            self.groups[piece["group"]],
+            (piece.get("sequenceNumber", 0), self._arrival, piece["pieceId"])
+        )
+
+    def _remove_from_group(self, piece: dict) -> None:
+        members = self.groups[piece["group"]]
+        seq = piece.get("sequenceNumber", 0)
+        i = bisect.bisect_left(members, (seq,))
+        while members[i][2] != piece["pieceId"]:
+            i += 1
+        del members[i]
+        if not members:
+            del self.groups[piece["group"]]
+
+    def _set(self, key: str, text) -> bool:
+        if self.lines.get(key) == text:
+            return False
+        if text is None:
+            self.lines.pop(key, None)
+        else:
+            self.lines[key] = text
+        if len(self.changes) == self.changes.maxlen:
+            self.history_floor = max(self.history_floor, self.changes[0][0])
+        self.changes.append((self.version, key, text))
+        return True
+
+    # -- API pública -----------------------------------------------------------------------
+
+    def apply_piece_update(self, piece: dict, version: int) -> list:
+        """
+        Aplica el nuevo estado de una pieza existente (status, orientación o grupo) y
+        devuelve las claves de las líneas que cambiaron.
+        """
+        old = self.pieces.get(piece["pieceId"])
+        if old is None or old.get("sequenceNumber") != piece.get("sequenceNumber"):
+            raise KeyError(piece["pieceId"])
+
+        self.version = version
+        new = {**old, **piece}
+        self.pieces[new["pieceId"]] = new
+        self.present_count += (new.get("status") == "present") - (old.get("status") == "present")
+
+        changed = []
+        if self.regular:
+            seq = new["sequenceNumber"]
+            if self.seq_owner.get(seq) == new["pieceId"]:
+                changed.append((f"piece:{seq}", self._regular_line(seq)))
+        else:
+            if old["group"] != new["group"]:
+                self._remove_from_group(old)
+                self._insert_in_group(new)
+                for group_id in (old["group"], new["group"]):
+                    members = self.groups.get(group_id)
+                    header = render.group_header(group_id, len(members)) if members else None
+                    changed.append((f"group:{group_id}", header))
+            changed.append((f"piece:{new['pieceId']}", self._irregular_line(new)))
+        changed.append(("summary", self._summary()))
+
+        return [key for key, text in changed if self._set(key, text)]
+
+    def instructions(self) -> list:
+        """Lista completa de instrucciones, idéntica a solve_regular / solve_irregular."""
+        instructions = [self.lines["summary"]]
+        if self.regular:
+            instructions.extend(self.lines[f"piece:{seq}"] for seq in range(1, self.total + 1))
+        else:
+            for group_id in sorted(self.groups):
+                instructions.append(self.lines[f"group:{group_id}"])
+                instructions.extend(self.lines[f"piece:{pid}"] for _, _, pid in self.groups[group_id])
+        return instructions
+
+    def changes_since(self, version: int):
+        """
+        Líneas modificadas después de `version` (la última versión de cada clave),
+        o None si el historial ya no alcanza esa versión.
+        """
+        if not self.history_floor <= version <= self.version:
+            return None
+        latest = OrderedDict()
+        for v, key, text in self.changes:
+            if v > version:
+                latest.pop(key, None)
+                latest[key] = text
+        return [{"key": key, "text": text} for key, text in latest.items()]
+
+
+class IncrementalRegistry:
+    """Soluciones incrementales vivas, una por puzzle, con desalojo LRU."""
+
+    def __init__(self, max_puzzles: int = 64):
+        self.max_puzzles = max_puzzles
+        self._solutions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, puzzle_id: str, version: int = None):
+        with self._lock:
+            solution = self._solutions.get(puzzle_id)
+            if solution is None or (version is not None and solution.version != version):
+                return None
+            self._solutions.move_to_end(puzzle_id)
+            return solution
+
+    def put(self, puzzle_id: str, solution: IncrementalSolution) -> None:
+        with self._lock:
+            self._solutions[puzzle_id] = solution
+            self._solutions.move_to_end(puzzle_id)
+            while len(self._solutions) > self.max_puzzles:
+                self._solutions.popitem(last=False)
+
+    def apply_piece_update(self, puzzle_id: str, piece: dict, version: int) -> bool:
+        """
+        Aplica el cambio de una pieza si la solución guardada corresponde a la versión
+        inmediatamente anterior; si no, la descarta (se reconstruirá completa).
+        """
+        with self._lock:
+            solution = self._solutions.get(puzzle_id)
+            if solution is None:
+                return False
+            if solution.version == version - 1:
+                try:
+                    solution.apply_piece_update(piece, version)
+                    return True
+                except KeyError:
+                    pass
+            del self._solutions[puzzle_id]
+            return False
+
+    def invalidate(self, puzzle_id: str) -> None:
+        with self._lock:
+            self._solutions.pop(puzzle_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._solutions.clear()
+
+
+incremental_solutions = IncrementalRegistry(
+    max_puzzles=int(os.getenv("SOLVER_INCREMENTAL_MAX_PUZZLES", "64"))
+)
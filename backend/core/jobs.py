@@ -0,0 +1,338 @@
+"""
+Trabajos de resolución en segundo plano: POST /solver/{puzzle_id}/jobs devuelve un id y la
+solución se calcula fuera del request, así un puzzle muy grande o una búsqueda por bordes no
+retiene al worker ni choca con el timeout del proxy.
+
+- Admisión: a lo sumo SOLVER_JOB_QUEUE_SIZE trabajos activos (en cola o corriendo); más allá
+  se rechaza con JobQueueFull (429).
+- Concurrencia: SOLVER_JOB_WORKERS trabajos corren a la vez; el resto espera en cola.
+- Coalescencia: los pedidos para el mismo (puzzle, versión, motor) comparten el trabajo,
+  salvo que haya fallado o se haya cancelado. Si el puzzle cambió antes de leer sus piezas,
+  el trabajo queda con la versión que efectivamente resolvió.
+- Cancelación: un trabajo en cola se descarta; uno en curso pasa a "cancelling" y se interrumpe
+  en su próximo reporte de avance (services/progress.py). Si el solver no reporta, sigue en
+  "cancelling" hasta que termina el cálculo, y su resultado se descarta.
+- Resultados: los trabajos terminados se guardan hasta SOLVER_JOB_KEEP (se descartan los más
+  antiguos) y durante SOLVER_JOB_TTL_SECONDS. Sus instrucciones ocupan a lo sumo
+  SOLVER_JOB_RESULT_BYTES en total: por encima, los más antiguos las sueltan y quedan sólo
+  con la referencia (puzzle, versión) para leerlas del cache de soluciones.
+Los trabajos viven en el proceso: con varios workers, cada uno atiende los suyos.
+
+El mismo administrador corre las tareas de mantenimiento (JobManager.start): escrituras por
+lotes en la base, como purgar las piezas huérfanas, que no
+deben cortarse si el cliente se desconecta. No pasan por la admisión ni ocupan lugares del solver.
+"""
+import asyncio
+import contextlib
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+from core.cache import estimate_size
+from core.solver import SOLVER_ENGINE, fetch_puzzle_version, solve_puzzle_versioned
+from services import progress
+from services.metrics import add_collector, gauge_lines
+
+SOLVER_JOB_WORKERS = int(os.getenv("SOLVER_JOB_WORKERS", "2"))
+SOLVER_JOB_QUEUE_SIZE = int(os.getenv("SOLVER_JOB_QUEUE_SIZE", "64"))
+SOLVER_JOB_KEEP = int(os.getenv("SOLVER_JOB_KEEP", "256"))
+SOLVER_JOB_TTL_SECONDS = float(os.getenv("SOLVER_JOB_TTL_SECONDS", "600"))
+SOLVER_JOB_RESULT_BYTES = int(os.getenv("SOLVER_JOB_RESULT_BYTES", str(64 * 1024 * 1024)))
+
+FINISHED = ("done", "failed", "cancelled")
+
+
+class JobQueueFull(RuntimeError):
+    """No se admiten más trabajos hasta que terminen algunos de los activos."""
+
+
+class JobCancelled(Exception):
+    """Lo lanza el receptor de avance para interrumpir un trabajo cancelado."""
+
+
+class Job:
+
+    def __init__(self, puzzle_id: Optional[str], version: Optional[int], engine: Optional[str],
+                 kind: str = "solve"):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.key = (puzzle_id, version, engine) if kind == "solve" else (kind, puzzle_id)
+        self.puzzle_id = puzzle_id
+        self.version = version
+        self.engine = engine
+        self.status = "queued"
+        self.progress = None
+        self.error = None
+        self.result = None
+        self.result_bytes = 0
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_requested = False
+        self.task = None
+        # Cada cambio incrementa la revisión y despierta a los suscriptores
+        self.revision = 0
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def _touch(self, **fields) -> None:
+        for key, value in fields.items():
+            setattr(self, key, value)
+        self.revision += 1
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def set_progress(self, done: int, total: int) -> None:
+        if not self.finished:
+            self._touch(progress={"done": done, "total": total})
+
+    async def wait_change(self, revision: int, timeout: float = None) -> None:
+        """Espera a que la revisión cambie (o el timeout); vuelve de inmediato si ya cambió."""
+        if self.revision != revision:
+            return
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def snapshot(self) -> dict:
+        return {
+            "jobId": self.id,
+            "kind": self.kind,
+            "puzzleId": self.puzzle_id,
+            "version": self.version,
+            "engine": self.engine,
+            "status": self.status,
+            "progress": self.progress,
+            "error": self.error,
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+        }
+
+
+class JobManager:
+
+    def __init__(self, workers: int = SOLVER_JOB_WORKERS, queue_size: int = SOLVER_JOB_QUEUE_SIZE,
+                 keep: int = SOLVER_JOB_KEEP, ttl_seconds: float = SOLVER_JOB_TTL_SECONDS,
+                 max_result_bytes: int = SOLVER_JOB_RESULT_BYTES):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.keep = keep
+        self.ttl_seconds = ttl_seconds
+        self.max_result_bytes = max_result_bytes
+        self._slots = asyncio.Semaphore(workers)
+        self._jobs = OrderedDict()  # id -> Job, en orden de creación
+        self._by_key = {}           # Job.key: (puzzle_id, versión, motor) o (tipo, puzzle_id) -> id
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    def active(self, kind: Optional[str] = "solve") -> list:
+        """Trabajos en cola o en curso del tipo dado (todos con kind=None)."""
+        return [job for job in self._jobs.values() if not job.finished and kind in (None, job.kind)]
+
+    async def submit(self, puzzle_id: str, engine: str = None):
+        """
+        Devuelve (trabajo, creado): el trabajo existente para la versión actual del puzzle
+        o uno nuevo. ValueError si el puzzle no existe, JobQueueFull si no hay lugar.
+        """
+        version = await fetch_puzzle_version(puzzle_id)
+        if version is None:
+            raise ValueError("Puzzle no encontrado.")
+        engine = engine or SOLVER_ENGINE
+        self._expire()
+
+        key = (puzzle_id, version, engine)
+        existing = self._jobs.get(self._by_key.get(key))
+        if existing is not None and existing.status not in ("failed", "cancelling", "cancelled"):
+            self.coalesced += 1
+            return existing, False
+        if len(self.active()) >= self.queue_size:
+            self.rejected += 1
+            raise JobQueueFull(f"Hay {self.queue_size} trabajos activos; reintente más tarde.")
+
+        job = Job(puzzle_id, version, engine)
+        self.submitted += 1
+        return self._start(job, self._solve, self._slots), True
+
+    def start(self, kind: str, work, puzzle_id: str = None) -> Job:
+        """
+        Corre `await work(job)` como tarea de mantenimiento; su resultado (un resumen) queda en
+        job.result. Si ya hay una activa del mismo tipo y puzzle, devuelve esa.
+        `work` debe revisar job.cancel_requested entre lotes.
+        """
+        self._expire()
+        existing = self._jobs.get(self._by_key.get((kind, puzzle_id)))
+        if existing is not None and not existing.finished:
+            self.coalesced += 1
+            return existing
+        return self._start(Job(puzzle_id, None, None, kind), work, contextlib.nullcontext())
+
+    def _start(self, job: Job, work, slot) -> Job:
+        self._jobs[job.id] = job
+        self._by_key[job.key] = job.id
+        job.task = asyncio.create_task(self._run(job, work, slot))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._expire()
+        return self._jobs.get(job_id)
+
+    def get_all(self) -> list:
+        self._expire()
+        return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Pide la cancelación; un trabajo en cola termina de inmediato. Uno en curso queda en
+        "cancelling" hasta que se interrumpe al reportar avance o termina el cálculo.
+        """
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        job.cancel_requested = True
+        if job.status == "queued":
+            # Si la tarea aún no empezó, cancelarla no ejecuta su manejo de CancelledError
+            job.task.cancel()
+            job._touch(status="cancelled", finished_at=time.time())
+        elif job.status == "running":
+            job._touch(status="cancelling")
+        return job
+
+    async def _solve(self, job: Job):
+        loop = asyncio.get_running_loop()
+
+        def receiver(done: int, total: int) -> None:
+            # Se llama desde el hilo del solver
+            if job.cancel_requested:
+                raise JobCancelled()
+            loop.call_soon_threadsafe(job.set_progress, done, total)
+
+        with progress.tracking(receiver):
+            version, result = await solve_puzzle_versioned(job.puzzle_id, job.engine, job.version, shared=False)
+        if version != job.version:
+            self._retag(job, version)
+        return result
+
+    def _retag(self, job: Job, version: int) -> None:
+        """El puzzle cambió antes de leer sus piezas: el trabajo pasa a la versión que resolvió."""
+        if self._by_key.get(job.key) == job.id:
+            del self._by_key[job.key]
+        job.version = version
+        job.key = (job.puzzle_id, version, job.engine)
+        self._by_key.setdefault(job.key, job.id)
+
+    async def _run(self, job: Job, work, slot) -> None:
+        try:
+            async with slot:
+                job._touch(status="running", started_at=time.time())
+                result = await work(job)
+                if job.cancel_requested:
+                    raise JobCancelled()
+                job._touch(status="done", result=result, result_bytes=estimate_size(result),
+                           finished_at=time.time())
+                self._expire()
+        except (asyncio.CancelledError, JobCancelled):
+            job._touch(status="cancelled", finished_at=time.time())
+        except (ValueError, RuntimeError) as e:
+            job._touch(status="failed", error=str(e), finished_at=time.time())
+        except Exception as e:
+            logging.exception(f"❌ Falló el trabajo {job.id} ({job.kind}) del puzzle {job.puzzle_id}")
+            job._touch(status="failed", error=f"{type(e).__name__}: {e}", finished_at=time.time())
+
+    def _expire(self) -> None:
+        """
+        Descarta los trabajos terminados vencidos y los más antiguos por encima de `keep`.
+        Si los resultados guardados superan `max_result_bytes`, los más antiguos los sueltan.
+        """
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.finished]
+        excess = len(finished) - self.keep
+        for job in finished:
+            if excess > 0 or job.finished_at + self.ttl_seconds < now:
+                excess -= 1
+                self._remove(job)
+
+        held = sorted((job for job in self._jobs.values() if job.result is not None),
+                      key=lambda job: job.finished_at)
+        excess = sum(job.result_bytes for job in held) - self.max_result_bytes
+        for job in held:
+            if excess <= 0:
+                break
+            excess -= job.result_bytes
+            job.result, job.result_bytes = None, 0
+
+    def _remove(self, job: Job) -> None:
+        del self._jobs[job.id]
+        if self._by_key.get(job.key) == job.id:
+            del self._by_key[job.key]
+
+    def stats(self) -> dict:
+        active = self.active()
+        running = sum(job.status in ("running", "cancelling") for job in active)
+        return {
+            "workers": self.workers,
+            "queueSize": self.queue_size,
+            "running": running,
+            "queued": len(active) - running,
+            "stored": len(self._jobs),
+            "resultBytes": sum(job.result_bytes for job in self._jobs.values()),
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        """Cancela los trabajos activos (llamar al apagar la app)."""
+        for job in self.active(None):
+            job.cancel_requested = True
+            job.task.cancel()
+
+
+_manager = None
+
+
+def get_job_manager() -> JobManager:
+    """Retorna el administrador de trabajos singleton (se crea dentro del event loop)."""
+    global _manager
+    if _manager is None:
+        _manager = JobManager()
+    return _manager
+
+
+def set_job_manager(manager: Optional[JobManager]) -> None:
+    """Reemplaza el administrador en uso (p. ej. uno nuevo por test, con su event loop)."""
+    global _manager
+    _manager = manager
+
+
+def shutdown_jobs() -> None:
+    if _manager is not None:
+        _manager.shutdown()
+
+
+def _job_lines() -> list:
+    if _manager is None:
+        return []
+    stats = _manager.stats()
+    lines = gauge_lines(
+        "solver_jobs", "Trabajos de resolución activos por estado.",
+        [({"status": "running"}, stats["running"]), ({"status": "queued"}, stats["queued"])],
+    )
+    for name, key, help_text in (
+        ("solver_jobs_submitted_total", "submitted", "Trabajos creados."),
+        ("solver_jobs_coalesced_total", "coalesced", "Pedidos atendidos por un trabajo existente."),
+        ("solver_jobs_rejected_total", "rejected", "Pedidos rechazados por la cola llena."),
+    ):
+        lines.extend(gauge_lines(name, help_text, [(None, stats[key])], "counter"))
+    return lines
+
+
+add_collector(_job_lines)
@@ -0,0 +1,139 @@
+"""
+Disposición resuelta persistida en el grafo: dónde va cada pieza
+((:Piece)-[:PLACED_AT {row, col, orientation}]->(:Puzzle)) y qué piezas quedan juntas
+((:Piece)-[:ADJACENT_TO {side}]->(:Piece), con side "right" o "bottom").
+
+Se escribe en una sola transacción sellada con la versión del puzzle (layoutVersion). Cualquier
+escritura posterior cambia la versión y la disposición deja de valer sin tener que borrarla;
+se reemplaza la próxima vez que se guarda. Así "qué va junto a esta pieza" es una búsqueda de
+un salto, y un puzzle por bordes no repite la búsqueda en otro worker o tras reiniciar.
+Los puzzles irregulares no tienen posiciones en una grilla.
+"""
+from typing import Optional
+
+from repositories import get_repository
+from services.metrics import timed, count_pieces
+from services.profiler import run_in_thread
+from core.geometric import edges_placements, edges_summary, is_edges_puzzle
+from core.steps import Step, UnsolvablePuzzle, regular_solution
+
+SIDES = ("top", "right", "bottom", "left")
+
+
+def placements(owners: list, steps) -> list:
+    """
+    Una colocación {pieceId, sequenceNumber, row, col, orientation} por paso con pieza;
+    `owners` es la pieza de cada paso (None en las posiciones sin pieza, que se omiten).
+    """
+    placed = []
+    for piece, step in zip(owners, steps):
+        if piece is None or step.row is None:
+            continue
+        placed.append({
+            "pieceId": piece["pieceId"], "sequenceNumber": step.seq,
+            "row": step.row, "col": step.col, "orientation": step.orientation,
+        })
+    return placed
+
+
+def adjacency(placed: list) -> list:
+    """Pares de piezas contiguas {a, b, side}: b queda a la derecha ("right") o debajo ("bottom") de a."""
+    at = {(pl["row"], pl["col"]): pl["pieceId"] for pl in placed}
+    pairs = []
+    for (row, col), a in at.items():
+        for side, cell in (("right", (row, col + 1)), ("bottom", (row + 1, col))):
+            b = at.get(cell)
+            if b is not None:
+                pairs.append({"a": a, "b": b, "side": side})
+    return pairs
+
+
+def solved_layout(puzzle: dict, pieces: list):
+    """
+    Resumen, pasos (materializados) y la pieza de cada paso de un puzzle con posiciones en
+    una grilla. En un puzzle regular la pieza es la de ese sequenceNumber (con números repetidos
+    gana la última, como el solver); por bordes, la que eligió la búsqueda.
+    """
+    if is_edges_puzzle(puzzle):
+        summary, placed = edges_placements(puzzle, pieces)
+        return summary, [step for _, step in placed], [pieces[i] for i, _ in placed]
+    if not puzzle.get("puzzleTypeIsRegular"):
+        raise UnsolvablePuzzle("Los puzzles irregulares no tienen posiciones en una grilla.")
+    summary, steps = regular_solution(puzzle, pieces)
+    by_seq = {p["sequenceNumber"]: p for p in pieces}
+    steps = list(steps)
+    return summary, steps, [None if step.absent else by_seq.get(step.seq) for step in steps]
+
+
+async def save_layout(puzzle_id: str, puzzle: dict, owners: list, steps: list) -> bool:
+    """Guarda la disposición de la versión leída; False si el puzzle cambió entretanto."""
+    with timed("convert"):
+        placed = placements(owners, steps)
+        pairs = adjacency(placed)
+    return await get_repository().save_layout(puzzle_id, puzzle.get("version", 0), placed, pairs)
+
+
+async def edges_layout_solution(puzzle_id: str, puzzle: dict, pieces: list):
+    """
+    Solución de un puzzle por bordes: si la disposición guardada es de esta versión y cubre
+    todas las piezas se usa tal cual; si no, se busca (en un hilo) y se guarda.
+    """
+    layout = await get_repository().get_layout(puzzle_id)
+    version = puzzle.get("version", 0)
+    if layout and layout["layoutVersion"] == version and len(layout["placements"]) == len(pieces):
+        steps = [
+            Step(pl["sequenceNumber"], pl["row"], pl["col"], pl["group"], pl["orientation"] or 0, False, False)
+            for pl in layout["placements"]
+        ]
+        return edges_summary(puzzle, len(pieces)), steps
+
+    with timed("solve"):
+        summary, steps, owners = await run_in_thread(solved_layout, puzzle, pieces)
+    await save_layout(puzzle_id, puzzle, owners, steps)
+    return summary, steps
+
+
+async def _refresh(puzzle_id: str) -> None:
+    puzzle, pieces = await get_repository().get_puzzle_and_pieces(puzzle_id)
+    if not puzzle:
+        raise ValueError("Puzzle no encontrado.")
+    if not pieces:
+        raise ValueError("No hay piezas asociadas a este puzzle.")
+    count_pieces(len(pieces))
+    with timed("solve"):
+        _, steps, owners = await run_in_thread(solved_layout, puzzle, pieces)
+    await save_layout(puzzle_id, puzzle, owners, steps)
+
+
+async def current_layout(puzzle_id: str) -> dict:
+    """
+    Disposición guardada de la versión actual; si no hay o quedó vieja, resuelve el puzzle
+    y la guarda antes de devolverla. ValueError si el puzzle no existe, UnsolvablePuzzle si es irregular.
+    """
+    repository = get_repository()
+    layout = await repository.get_layout(puzzle_id)
+    if layout is None:
+        raise ValueError("Puzzle no encontrado.")
+    if layout["layoutVersion"] != layout["version"]:
+        await _refresh(puzzle_id)
+        layout = await repository.get_layout(puzzle_id)
+    return layout
+
+
+async def piece_neighbors(puzzle_id: str, piece_id: str) -> Optional[dict]:
+    """
+    Posición de la pieza y sus vecinas (ordenadas arriba, derecha, abajo, izquierda), leídas de
+    la disposición guardada; la recalcula sólo si quedó vieja. None si la pieza no existe.
+    Si otra escritura llega mientras se recalcula, version y layoutVersion quedan distintas.
+    """
+    repository = get_repository()
+    found = await repository.get_neighbors(puzzle_id, piece_id)
+    if found is None:
+        return None
+    if found["layoutVersion"] != found["version"]:
+        await _refresh(puzzle_id)
+        found = await repository.get_neighbors(puzzle_id, piece_id)
+        if found is None:
+            return None
+    found["neighbors"].sort(key=lambda n: SIDES.index(n["side"]))
+    return {"pieceId": piece_id, **found}
@@ -0,0 +1,47 @@
+"""
+Tareas de mantenimiento que escriben en la base por lotes y corren como trabajos en segundo
+plano (core/jobs.py): si el cliente se desconecta o el proxy corta el request, siguen hasta
+terminar. Cada una informa su avance en el trabajo, revisa la cancelación entre lotes
+y devuelve un resumen.
+"""
+import logging
+import time
+
+from core.jobs import Job, get_job_manager
+from repositories import get_repository
+from repositories.base import DELETE_BATCH_SIZE
+from services.metrics import count_pieces
+
+
+async def _delete_in_batches(job: Job, delete_batch, total: int, batch_size: int) -> dict:
+    """Llama a delete_batch(batch_size) hasta que borre menos que un lote completo."""
+    deleted = batches = 0
+    job.set_progress(0, total)
+    while not job.cancel_requested:
+        n = await delete_batch(batch_size)
+        if n:
+            deleted += n
+            batches += 1
+            count_pieces(n)
+            job.set_progress(deleted, max(total, deleted))
+        if n < batch_size:
+            break
+    return {"deleted": deleted, "batches": batches}
+
+
+def purge_orphans(batch_size: int = None) -> Job:
+    """Elimina las piezas huérfanas por lotes, una transacción por lote."""
+    size = batch_size or DELETE_BATCH_SIZE
+
+    async def work(job: Job) -> dict:
+        repo = get_repository()
+        t0 = time.perf_counter()
+        summary = await _delete_in_batches(job, repo.purge_orphan_pieces, await repo.count_orphan_pieces(), size)
+        logging.info(
+            f"Purga de piezas huérfanas: {summary['deleted']} eliminadas en {summary['batches']} lotes"
+            f" ({(time.perf_counter() - t0) * 1000:.0f} ms)"
+        )
+        return summary
+
+    return get_job_manager().start("purge_orphans", work)
+
@@ -0,0 +1,151 @@
+"""
+Motor vectorizado (NumPy) para puzzles regulares.
+Carga las piezas en arreglos (sequenceNumber, orientación, estado y grupo) y calcula
+fila/columna, faltantes y orientación por lotes; el texto sólo se genera si se pide.
+Produce exactamente la misma salida que el motor de Python (core/steps.py + core/render.py).
+"""
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él sólo está disponible el motor "python"
+    np = None
+
+from core import render
+from core.pieces import NO_GROUP, PieceColumns
+from core.steps import UnsolvablePuzzle, regular_summary
+
+
+def available() -> bool:
+    return np is not None
+
+
+def _arrays(pieces):
+    """
+    Columnas de las piezas como arreglos NumPy: de piezas en diccionarios, una pasada por campo;
+    de PieceColumns (core/pieces.py), vistas sobre sus arreglos, sin copiarlos.
+    """
+    if isinstance(pieces, PieceColumns):
+        group = np.frombuffer(pieces.group, dtype=np.int64)
+        has_group = group != NO_GROUP
+        return (
+            np.frombuffer(pieces.seq, dtype=np.int64),
+            np.frombuffer(pieces.orientation, dtype=np.int64),
+            np.frombuffer(pieces.present, dtype=bool),
+            group if has_group.all() else np.where(has_group, group, 0),
+            has_group,
+        )
+    n = len(pieces)
+    seq = np.fromiter([p['sequenceNumber'] for p in pieces], dtype=np.int64, count=n)
+    orientation = np.fromiter([p.get('pieceOrientation', 0) for p in pieces], dtype=np.int64, count=n)
+    present = np.fromiter([p.get('status') == 'present' for p in pieces], dtype=bool, count=n)
+    groups = [p.get('group') for p in pieces]
+    if None in groups:
+        has_group = np.fromiter([g is not None for g in groups], dtype=bool, count=n)
+        groups = [g or 0 for g in groups]
+    else:
+        has_group = np.ones(n, dtype=bool)
+    group = np.fromiter(groups, dtype=np.int64, count=n)
+    return seq, orientation, present, group, has_group
+
+
+def regular_columns(puzzle: dict, pieces: list):
+    """
+    Resumen y pasos en columnas (arreglos NumPy) de un puzzle regular.
+    Devuelve (summary, dict de arreglos con los campos de Step).
+    """
+    seq, orientation, present, group, has_group = _arrays(pieces)
+    summary = regular_summary(puzzle, len(pieces), int(present.sum()))
+    total, column_size = summary["total"], summary["columns"]
+
+    # Pieza que ocupa cada posición (-1 si no hay); con números repetidos gana la última
+    owner = np.full(total + 1, -1, dtype=np.int64)
+    in_range = np.nonzero((seq >= 1) & (seq <= total))[0]
+    if in_range.size:
+        reversed_idx = in_range[::-1]
+        seqs, first = np.unique(seq[reversed_idx], return_index=True)
+        owner[seqs] = reversed_idx[first]
+    owner = owner[1:]
+
+    positions = np.arange(total, dtype=np.int64)
+    absent = owner < 0
+    if not len(pieces):
+        # Sin piezas todas las posiciones son inexistentes; un índice 0 necesita al menos un valor
+        seq, orientation, present, group, has_group = (np.zeros(1, dtype=a.dtype) for a in (seq, orientation, present, group, has_group))
+    safe_owner = np.where(absent, 0, owner)
+    missing = absent | ~present[safe_owner]
+    piece_group = group[safe_owner]
+    no_group = absent | ~has_group[safe_owner]
+    piece_orientation = orientation[safe_owner]
+
+    columns = {
+        "seq": positions + 1,
+        "row": positions // column_size + 1,
+        "col": positions % column_size + 1,
+        "group": piece_group,
+        "group_null": no_group,
+        "orientation": piece_orientation,
+        "missing": missing,
+        "absent": absent,
+    }
+    return summary, columns
+
+
+def to_columns(columns: dict) -> dict:
+    """Convierte los arreglos a listas de Python (None donde el dato no aplica)."""
+    def nullable(values, null_mask):
+        out = values.astype(object)
+        out[null_mask] = None
+        return out.tolist()
+
+    return {
+        "seq": columns["seq"].tolist(),
+        "row": columns["row"].tolist(),
+        "col": columns["col"].tolist(),
+        "group": nullable(columns["group"], columns["group_null"]),
+        "orientation": nullable(columns["orientation"], columns["missing"]),
+        "missing": columns["missing"].tolist(),
+        "absent": columns["absent"].tolist(),
+    }
+
+
+def render_regular(summary: dict, columns: dict) -> list:
+    """
+    Instrucciones en texto. Las posiciones se separan en lotes (inexistentes, marcadas
+    como faltantes y una por orientación) y cada lote se formatea con una sola plantilla.
+    """
+    missing, absent = columns["missing"], columns["absent"]
+    placed = ~missing
+    orientation = columns["orientation"]
+
+    batches = [
+        (absent, "Pieza {}: falta esta pieza en la columna {}, fila {}. Continúa con la siguiente posición."),
+        (missing & ~absent, "Pieza {}: está marcada como faltante en la columna {}, fila {}. Continúa con la siguiente."),
+    ]
+    for o in np.unique(orientation[placed]).tolist():
+        hint = render.ORIENTATION_HINT.get(o, f"orientación desconocida ({o}°)")
+        template = "Pieza {}: colócala en la columna {}, fila {} y " + hint.replace("{", "{{").replace("}", "}}") + "."
+        batches.append((placed & (orientation == o), template))
+
+    lines = np.empty(len(missing), dtype=object)
+    for mask, template in batches:
+        idx = np.nonzero(mask)[0]
+        lines[idx] = [
+            template.format(s, c, r)
+            for s, c, r in zip(columns["seq"][idx].tolist(), columns["col"][idx].tolist(), columns["row"][idx].tolist())
+        ]
+    return [render.summary_line(summary)] + lines.tolist()
+
+
+def solve_regular(puzzle: dict, pieces: list) -> list:
+    """Equivalente vectorizado de core.solver.solve_regular."""
+    if np is None:
+        raise UnsolvablePuzzle("El motor 'numpy' requiere instalar numpy.")
+    return render_regular(*regular_columns(puzzle, pieces))
+
+
+def solve_regular_structured(puzzle: dict, pieces: list):
+    """Resumen y pasos en columnas (listas), como core.steps.to_columns."""
+    if np is None:
+        raise UnsolvablePuzzle("El motor 'numpy' requiere instalar numpy.")
+    summary, columns = regular_columns(puzzle, pieces)
+    return summary, to_columns(columns)
+
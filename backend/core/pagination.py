@@ -0,0 +1,47 @@
+"""
+Paginación por cursor (keyset): el cursor codifica la clave de orden de la última fila
+devuelta y la página siguiente empieza estrictamente después de ella, sin OFFSET.
+"""
+import base64
+import json
+
+
+def encode_cursor(key: list) -> str:
+    """Cursor opaco (base64 url-safe) a partir de la clave de orden de la última fila."""
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Clave de orden contenida en el cursor; ValueError si está mal formado."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Cursor inválido.")
+    if not isinstance(key, list) or len(key) != size:
+        raise ValueError("Cursor inválido.")
+    return key
+
+
+def parse_fields(fields: str, allowed: tuple, keys: tuple) -> list:
+    """
+    Proyección pedida como "a,b,c". Devuelve la lista de campos (siempre con las claves
+    de orden, necesarias para el cursor) o None si no se pidió; ValueError si hay campos desconocidos.
+    """
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise ValueError(f"Campos desconocidos: {', '.join(unknown)}.")
+    return list(dict.fromkeys([*keys, *requested]))
+
+
+def page(rows: list, limit: int, key) -> tuple:
+    """
+    Recibe hasta limit + 1 filas; devuelve (filas de la página, cursor siguiente o None).
+    `key(fila)` da la clave de orden de una fila.
+    """
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
@@ -0,0 +1,107 @@
+"""
+Piezas de un puzzle en columnas compactas para el solver: en lugar de un diccionario por pieza
+(varios cientos de bytes cada uno, con todas sus propiedades), un arreglo por campo con sólo lo
+que el solver usa: número de secuencia, grupo, orientación y si está presente (~25 bytes por pieza).
+
+Se llenan directamente desde la proyección de la consulta (filas en el orden de SOLVER_FIELDS)
+y las soluciones regular e irregular se calculan sobre las columnas, sin copias intermedias;
+el motor NumPy las toma como arreglos sin copiarlas.
+Los pasos producidos son los mismos que con las piezas en diccionarios (core/steps.py).
+"""
+from array import array
+from itertools import groupby
+
+from core.steps import Step, regular_summary, irregular_summary
+
+# Campos que el solver necesita de cada pieza, en el orden de las filas proyectadas
+SOLVER_FIELDS = ("sequenceNumber", "group", "status", "pieceOrientation")
+# Valor que representa una pieza sin grupo (None) en la columna de grupos
+NO_GROUP = -(2 ** 63)
+
+
+class PieceColumns:
+
+    __slots__ = ("seq", "group", "orientation", "present")
+
+    def __init__(self):
+        self.seq = array("q")
+        self.group = array("q")
+        self.orientation = array("q")
+        self.present = bytearray()
+
+    @classmethod
+    def from_rows(cls, rows) -> "PieceColumns":
+        """Columnas a partir de filas [sequenceNumber, group, status, pieceOrientation]."""
+        columns = cls()
+        seq, group, orientation, present = columns.seq, columns.group, columns.orientation, columns.present
+        for s, g, status, o in rows:
+            seq.append(s or 0)
+            group.append(NO_GROUP if g is None else g)
+            orientation.append(o or 0)
+            present.append(status == "present")
+        return columns
+
+    @classmethod
+    def from_dicts(cls, pieces) -> "PieceColumns":
+        """Columnas a partir de piezas en diccionarios (p. ej. el repositorio en memoria)."""
+        return cls.from_rows(
+            (p.get("sequenceNumber"), p.get("group"), p.get("status"), p.get("pieceOrientation"))
+            for p in pieces
+        )
+
+    def __len__(self) -> int:
+        return len(self.seq)
+
+    def present_count(self) -> int:
+        return self.present.count(1)
+
+    def nbytes(self) -> int:
+        """Memoria ocupada por los datos de las columnas."""
+        return sum(len(c) * c.itemsize for c in (self.seq, self.group, self.orientation)) + len(self.present)
+
+    def step(self, i: int, row, col) -> Step:
+        """Paso de la pieza i (igual que piece_step con la pieza en diccionario)."""
+        g = self.group[i]
+        group = None if g == NO_GROUP else g
+        if not self.present[i]:
+            return Step(self.seq[i], row, col, group, None, True, False)
+        return Step(self.seq[i], row, col, group, self.orientation[i], False, False)
+
+
+def regular_solution(puzzle: dict, columns: PieceColumns):
+    """Resumen y generador de pasos de un puzzle regular (como core.steps.regular_solution)."""
+    summary = regular_summary(puzzle, len(columns), columns.present_count())
+    total, column_size = summary["total"], summary["columns"]
+
+    # Pieza que ocupa cada posición (-1 si no hay); con números repetidos gana la última
+    owner = array("q", [-1]) * (total + 1)
+    for i, seq in enumerate(columns.seq):
+        if 1 <= seq <= total:
+            owner[seq] = i
+
+    def steps():
+        for seq in range(1, total + 1):
+            row = (seq - 1) // column_size + 1
+            col = (seq - 1) % column_size + 1
+            i = owner[seq]
+            yield Step(seq, row, col, None, None, True, True) if i < 0 else columns.step(i, row, col)
+
+    return summary, steps()
+
+
+def irregular_solution(puzzle: dict, columns: PieceColumns):
+    """Resumen y generador de pasos de un puzzle irregular (como core.steps.irregular_solution)."""
+    # Orden por (grupo, secuencia) con dos ordenamientos estables: dentro de un grupo, los números
+    # repetidos respetan el orden de llegada
+    order = sorted(range(len(columns)), key=columns.seq.__getitem__)
+    order.sort(key=columns.group.__getitem__)
+
+    group_ids, group_sizes = [], []
+    for g, members in groupby(order, key=columns.group.__getitem__):
+        group_ids.append(g)
+        group_sizes.append(sum(1 for _ in members))
+    summary = irregular_summary(
+        puzzle, len(columns), columns.present_count(),
+        [None if g == NO_GROUP else g for g in group_ids], group_sizes,
+    )
+    return summary, (columns.step(i, None, None) for i in order)
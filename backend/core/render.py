@@ -0,0 +1,84 @@
+"""
+Textos de las instrucciones del solver (capa de presentación opcional).
+Cada función produce una sola línea a partir del resumen o de un paso (core/steps.py),
+para poder regenerar sólo las líneas afectadas.
+"""
+
+ORIENTATION_HINT = {
+    0:   "gira la pieza de forma que la flecha apunte hacia arriba",
+    90:  "gira la pieza de forma que la flecha apunte hacia la derecha",
+    180: "gira la pieza de forma que la flecha apunte hacia abajo",
+    270: "gira la pieza de forma que la flecha apunte hacia la izquierda",
+}
+
+
+def regular_summary(row_size, column_size, total: int, missing: int) -> str:
+    return f"Rompecabezas regular: {row_size} filas x {column_size} columnas (total {total} piezas, {missing} faltantes)."
+
+
+def irregular_summary(n_groups: int, total: int, missing: int) -> str:
+    return f"Rompecabezas irregular dividido en {n_groups} grupos (total {total} piezas, {missing} faltantes)."
+
+
+def edges_summary(row_size, column_size, total: int) -> str:
+    return f"Rompecabezas armado por la forma de los bordes: {row_size} filas x {column_size} columnas ({total} piezas)."
+
+
+def summary_line(summary: dict) -> str:
+    if summary["mode"] == "edges":
+        return edges_summary(summary["rows"], summary["columns"], summary["total"])
+    if summary["mode"] == "regular":
+        return regular_summary(summary["rows"], summary["columns"], summary["total"], summary["missing"])
+    return irregular_summary(len(summary["groups"]), summary["total"], summary["missing"])
+
+
+def group_header(group_id, count: int) -> str:
+    return f"Grupo {group_id} ({count} piezas):"
+
+
+def regular_line(step) -> str:
+    """Línea de una posición del puzzle regular."""
+    if step.absent:
+        return f"Pieza {step.seq}: falta esta pieza en la columna {step.col}, fila {step.row}. Continúa con la siguiente posición."
+    if step.missing:
+        return f"Pieza {step.seq}: está marcada como faltante en la columna {step.col}, fila {step.row}. Continúa con la siguiente."
+    hint = ORIENTATION_HINT.get(step.orientation, f"orientación desconocida ({step.orientation}°)")
+    return f"Pieza {step.seq}: colócala en la columna {step.col}, fila {step.row} y {hint}."
+
+
+def edges_line(step) -> str:
+    """Línea de una celda de un puzzle armado por bordes: el giro es respecto de cómo está la pieza."""
+    if not step.orientation:
+        return f"Pieza {step.seq}: colócala en la columna {step.col}, fila {step.row} sin girarla."
+    return f"Pieza {step.seq}: colócala en la columna {step.col}, fila {step.row} girándola {step.orientation}° en sentido horario."
+
+
+def irregular_line(step) -> str:
+    """Línea de una pieza dentro de su grupo."""
+    if step.missing:
+        return f"- Pieza {step.seq} del grupo {step.group}: falta esta pieza."
+    orient_text = ORIENTATION_HINT.get(step.orientation, f"orientación {step.orientation}°")
+    return f"- Pieza {step.seq} del grupo {step.group}: {orient_text}."
+
+
+def step_line(mode: str):
+    """Función que genera la línea de un paso según el modo de la solución."""
+    return {"regular": regular_line, "edges": edges_line}.get(mode, irregular_line)
+
+
+def render_lines(summary: dict, steps):
+    """Genera las instrucciones en texto: resumen, encabezados de grupo y una línea por paso."""
+    yield summary_line(summary)
+    if summary["mode"] in ("regular", "edges"):
+        line = step_line(summary["mode"])
+        for step in steps:
+            yield line(step)
+        return
+
+    sizes = dict(zip(summary["groups"], summary["groupSizes"]))
+    current = object()
+    for step in steps:
+        if step.group != current:
+            current = step.group
+            yield group_header(current, sizes[current])
+        yield irregular_line(step)
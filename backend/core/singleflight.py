@@ -0,0 +1,90 @@
+"""
+Coalescencia de pedidos idénticos en curso ("single-flight"): cuando muchos usuarios abren el
+mismo puzzle a la vez, el primero (líder) ejecuta la lectura o el cálculo y los demás esperan
+su resultado en lugar de repetir la misma consulta a Neo4j o la misma resolución.
+
+- El cálculo corre en su propia tarea: si el líder se desconecta, los demás siguen esperando
+  y el resultado igual llega al cache.
+- Si falla, la misma excepción se propaga a todos los que esperaban.
+- Sólo se comparte lo que está en curso; al terminar, la clave se libera y el próximo pedido
+  vuelve a ejecutar (o encuentra el resultado en el cache).
+- El resultado es el mismo objeto para todos: no debe modificarse.
+- Las claves son tuplas que empiezan por el id del puzzle.
+
+Cada grupo exporta en /metrics cuántos pedidos ejecutaron y cuántos se coalescieron.
+"""
+import asyncio
+
+from services.metrics import add_collector, gauge_lines
+
+_groups = []
+
+
+class SingleFlight:
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self._calls = {}  # clave -> tarea en curso
+        self.leaders = 0
+        self.coalesced = 0
+        _groups.append(self)
+
+    async def do(self, key, fn, *args):
+        """Devuelve await fn(*args), compartido con los pedidos en curso de la misma clave."""
+        task = self._calls.get(key)
+        # Una tarea de otro event loop (p. ej. de un test anterior) no se puede esperar
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            self.leaders += 1
+            task = asyncio.ensure_future(fn(*args))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def forget(self, puzzle_id: str) -> None:
+        """
+        Los pedidos siguientes del puzzle no se suman a los que están en curso (llamar tras una
+        escritura, para claves que no incluyen la versión); quienes ya esperan reciben el resultado.
+        """
+        for key in [k for k in self._calls if k[0] == puzzle_id]:
+            del self._calls[key]
+
+    def clear(self) -> None:
+        """Olvida todas las operaciones en curso (p. ej. entre tests, que usan otro event loop)."""
+        self._calls.clear()
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def _finished(self, key, task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Si todos los que esperaban se cancelaron, la excepción no queda sin recuperar
+        if not task.cancelled():
+            task.exception()
+
+
+def clear_all() -> None:
+    for group in _groups:
+        group.clear()
+
+
+def _singleflight_lines() -> list:
+    lines = []
+    for name, field, kind, help_text in (
+        ("singleflight_leaders_total", "leaders", "counter", "Pedidos que ejecutaron la operación."),
+        ("singleflight_coalesced_total", "coalesced", "counter",
+         "Pedidos que esperaron el resultado de uno idéntico en curso."),
+    ):
+        lines.extend(gauge_lines(
+            name, help_text, [({"operation": g.operation}, getattr(g, field)) for g in _groups], kind,
+        ))
+    lines.extend(gauge_lines(
+        "singleflight_in_flight", "Operaciones compartibles en curso.",
+        [({"operation": g.operation}, g.in_flight()) for g in _groups],
+    ))
+    return lines
+
+
+add_collector(_singleflight_lines)
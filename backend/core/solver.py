@@ -1,10 +1,25 @@
+import os
 from services.neo4j import get_session
-from collections import defaultdict
+from services.metrics import timed, count_pieces
+from services.profiler import run_in_thread
+from repositories import get_repository
+from core.cache import solution_cache, structured_cache
+from core.singleflight import SingleFlight
+from core import pieces as compact, render
+from core.geometric import edges_solution, is_edges_puzzle
+from core.layout import edges_layout_solution
+from core.incremental import IncrementalSolution, incremental_solutions
+from core.pieces import PieceColumns
+from core.steps import (
+    Step, regular_solution, irregular_solution, to_columns,
+    regular_summary, irregular_summary, aiter_regular_steps, piece_step,
+)
 
 
 def fetch_puzzle_and_pieces(puzzle_id: str):
     """
-    Recupera el nodo Puzzle y sus piezas asociadas de Neo4j.
+    Recupera el nodo Puzzle y sus piezas asociadas de Neo4j (versión síncrona, para
+    scripts fuera del event loop; la API usa fetch_puzzle_and_pieces_async y el repositorio).
     Devuelve un diccionario con propiedades de puzzle y una lista de diccionarios de piezas.
     """
     with get_session() as session:
@@ -32,94 +47,351 @@ def fetch_puzzle_and_pieces(puzzle_id: str):
         return puzzle, pieces
 
 
-ORIENTATION_HINT = {
-    0:   "gira la pieza de forma que la flecha apunte hacia arriba",
-    90:  "gira la pieza de forma que la flecha apunte hacia la derecha",
-    180: "gira la pieza de forma que la flecha apunte hacia abajo",
-    270: "gira la pieza de forma que la flecha apunte hacia la izquierda",
-}
+# Lecturas y resoluciones idénticas en curso se comparten entre los requests concurrentes
+puzzle_fetches = SingleFlight("puzzle_and_pieces")
+solve_fetches = SingleFlight("puzzle_for_solve")
+solutions_in_flight = SingleFlight("solution")
+structured_in_flight = SingleFlight("structured_solution")
 
-def solve_regular(puzzle: dict, pieces: list) -> list:
+
+async def fetch_puzzle_and_pieces_async(puzzle_id: str):
     """
-    Genera instrucciones para armar un puzzle regular, indicando faltantes y posiciones.
+    Versión asíncrona de fetch_puzzle_and_pieces, a través del repositorio configurado.
+    Los pedidos concurrentes del mismo puzzle comparten una sola consulta.
     """
-    total_expected = puzzle.get("puzzlePieceQty") or len(pieces)
-    row_size = puzzle.get("row_size")
-    column_size = puzzle.get("column_size") or (total_expected // row_size)
+    puzzle, pieces = await puzzle_fetches.do((puzzle_id,), get_repository().get_puzzle_and_pieces, puzzle_id)
+    count_pieces(len(pieces))
+    return puzzle, pieces
 
-    # Crear mapa de secuencia a pieza
-    seq_map = {p['sequenceNumber']: p for p in pieces}
-    # Calcular faltantes por ausencia o status
-    present = [p for p in pieces if p.get('status') == 'present']
-    missing_count = total_expected - len(present)
 
-    instructions = []
-    instructions.append(
-        f"Rompecabezas regular: {row_size} filas x {column_size} columnas (total {total_expected} piezas, {missing_count} faltantes)."
+async def _fetch_for_solve(puzzle_id: str):
+    """
+    Puzzle y piezas para resolverlo completo, con una sola consulta: en columnas compactas
+    (PieceColumns, sin un diccionario por pieza), salvo los puzzles por bordes, cuya búsqueda
+    necesita todas las propiedades de cada pieza. Los pedidos concurrentes comparten la consulta.
+    """
+    puzzle, pieces = await solve_fetches.do(
+        (puzzle_id,), get_repository().get_puzzle_and_solver_pieces, puzzle_id
     )
+    count_pieces(len(pieces))
+    return puzzle, pieces
 
-    # Instrucciones por posición
-    for seq in range(1, total_expected + 1):
-        piece = seq_map.get(seq)
-        row = (seq - 1) // column_size + 1
-        col = (seq - 1) % column_size + 1
-        if not piece:
-            instructions.append(
-                f"Pieza {seq}: falta esta pieza en la columna {col}, fila {row}. Continúa con la siguiente posición."
-            )
-        elif piece.get('status') != 'present':
-            instructions.append(
-                f"Pieza {seq}: está marcada como faltante en la columna {col}, fila {row}. Continúa con la siguiente."
-            )
-        else:
-            orientation = piece.get('pieceOrientation', 0)
-            hint = ORIENTATION_HINT.get(orientation, f"orientación desconocida ({orientation}°)")
-            instructions.append(
-                f"Pieza {seq}: colócala en la columna {col}, fila {row} y {hint}."
-            )
 
-    return instructions
+async def fetch_many_puzzles_and_pieces(puzzle_ids: list) -> dict:
+    """
+    Recupera varios puzzles y sus piezas con una sola consulta.
+    Devuelve {puzzle_id: (puzzle, piezas)}; los ids inexistentes no aparecen.
+    """
+    loaded = await get_repository().get_many_puzzles_and_pieces(puzzle_ids)
+    count_pieces(sum(len(pieces) for _, pieces in loaded.values()))
+    return loaded
 
 
-def solve_irregular(puzzle: dict, pieces: list) -> list:
-    grouped = defaultdict(list)
-    for piece in pieces:
-        grouped[piece['group']].append(piece)
+async def fetch_puzzle_version(puzzle_id: str):
+    """
+    Devuelve la versión actual del puzzle (se incrementa en cada escritura),
+    o None si el puzzle no existe. Es la única consulta de una solución cacheada.
+    """
+    return await get_repository().get_puzzle_version(puzzle_id)
 
-    total = puzzle.get("puzzlePieceQty") or len(pieces)
-    present = [p for p in pieces if p.get('status') == 'present']
-    missing_count = total - len(present)
 
-    instructions = []
-    instructions.append(
-        f"Rompecabezas irregular dividido en {len(grouped)} grupos (total {total} piezas, {missing_count} faltantes)."
-    )
+# Motor por defecto para puzzles regulares: "python" o "numpy"
+SOLVER_ENGINE = os.getenv("SOLVER_ENGINE", "python")
 
-    for group_id, grp in sorted(grouped.items()):
-        instructions.append(f"Grupo {group_id} ({len(grp)} piezas):")
-        for piece in sorted(grp, key=lambda p: p.get("sequenceNumber", 0)):
-            seq = piece['sequenceNumber']
-            if piece.get('status') != 'present':
-                instructions.append(f"- Pieza {seq} del grupo {group_id}: falta esta pieza.")
-            else:
-                orient = piece.get('pieceOrientation', 0)
-                orient_text = ORIENTATION_HINT.get(orient, f"orientación {orient}°")
-                instructions.append(f"- Pieza {seq} del grupo {group_id}: {orient_text}.")
 
-    return instructions
+async def stream_solution(puzzle_id: str):
+    """
+    Generador asíncrono de la solución leída directamente del repositorio, sin cargar todas las piezas:
+    primero produce el resumen (calculado con agregaciones en la base) y luego los pasos,
+    uno a uno, a partir de un cursor de piezas ordenado.
+    Lanza ValueError al pedir el primer elemento si el puzzle no existe o no tiene piezas.
+    """
+    repository = get_repository()
+    counts = await repository.get_piece_counts(puzzle_id)
+    if counts is None:
+        raise ValueError("Puzzle no encontrado.")
+    puzzle, groups = counts
+    if not groups:
+        raise ValueError("No hay piezas asociadas a este puzzle.")
+
+    if is_edges_puzzle(puzzle):
+        # La colocación sale de una búsqueda sobre todas las piezas: no se puede leer en orden
+        puzzle, pieces = await fetch_puzzle_and_pieces_async(puzzle_id)
+        summary, steps = await edges_layout_solution(puzzle_id, puzzle, pieces)
+        yield summary
+        for step in steps:
+            yield step
+        return
+
+    piece_count = sum(g["n"] for g in groups)
+    count_pieces(piece_count)
+    present = sum(g["present"] for g in groups)
+    regular = puzzle.get("puzzleTypeIsRegular")
+    if regular:
+        summary = regular_summary(puzzle, piece_count, present)
+    else:
+        summary = irregular_summary(
+            puzzle, piece_count, present, [g["group"] for g in groups], [g["n"] for g in groups]
+        )
+    yield summary
+
+    ordered = repository.iter_ordered_pieces(puzzle_id, by_group=not regular)
+    if regular:
+        async for step in aiter_regular_steps(summary, ordered):
+            yield step
+    else:
+        async for piece in ordered:
+            yield piece_step(piece["sequenceNumber"], None, None, piece)
+
+
+def _regular_solution(puzzle: dict, pieces):
+    if isinstance(pieces, PieceColumns):
+        return compact.regular_solution(puzzle, pieces)
+    return regular_solution(puzzle, pieces)
 
 
-def solve_puzzle(puzzle_id: str) -> list:
+def _irregular_solution(puzzle: dict, pieces):
+    if isinstance(pieces, PieceColumns):
+        return compact.irregular_solution(puzzle, pieces)
+    return irregular_solution(puzzle, pieces)
+
+
+def solve_regular(puzzle: dict, pieces, engine: str = None) -> list:
     """
-    Función principal: devuelve instrucciones detalladas, incluso con piezas faltantes.
+    Genera instrucciones para armar un puzzle regular, indicando faltantes y posiciones.
+    engine: "python" (por defecto, SOLVER_ENGINE) o "numpy" (vectorizado, misma salida).
+    Las piezas pueden venir en diccionarios o en columnas compactas (PieceColumns).
     """
-    puzzle, pieces = fetch_puzzle_and_pieces(puzzle_id)
+    if (engine or SOLVER_ENGINE) == "numpy":
+        from core import numpy_engine  # NumPy sólo se importa si se usa el motor vectorizado
+        return numpy_engine.solve_regular(puzzle, pieces)
+    return list(render.render_lines(*_regular_solution(puzzle, pieces)))
+
+
+def solve_irregular(puzzle: dict, pieces) -> list:
+    return list(render.render_lines(*_irregular_solution(puzzle, pieces)))
+
+
+def solve_edges(puzzle: dict, pieces: list) -> list:
+    """Instrucciones de un puzzle sin numerar, colocando cada pieza por la forma de sus bordes."""
+    return list(render.render_lines(*edges_solution(puzzle, pieces)))
+
+
+def _check_loaded(puzzle: dict, pieces) -> None:
     if not puzzle:
         raise ValueError("Puzzle no encontrado.")
     if not pieces:
         raise ValueError("No hay piezas asociadas a este puzzle.")
 
+
+def solve_loaded(puzzle: dict, pieces, engine: str = None) -> list:
+    """Genera las instrucciones a partir del puzzle y sus piezas ya cargados."""
+    _check_loaded(puzzle, pieces)
+
+    if is_edges_puzzle(puzzle):
+        return solve_edges(puzzle, pieces)
     if puzzle.get("puzzleTypeIsRegular"):
-        return solve_regular(puzzle, pieces)
+        return solve_regular(puzzle, pieces, engine)
     else:
-        return solve_irregular(puzzle, pieces)
\ No newline at end of file
+        return solve_irregular(puzzle, pieces)
+
+
+def solve_puzzle(puzzle_id: str, engine: str = None) -> list:
+    """
+    Función principal: devuelve instrucciones detalladas, incluso con piezas faltantes.
+    """
+    puzzle, pieces = fetch_puzzle_and_pieces(puzzle_id)
+    return solve_loaded(puzzle, pieces, engine)
+
+
+async def _incremental_solution(puzzle_id: str, version: int):
+    """
+    Solución incremental de la versión dada; la construye leyendo las piezas si hace falta.
+    Devuelve (incremental, None, versión), o (None, instrucciones, versión) para los puzzles por
+    bordes, que no tienen solución incremental (cambiar una pieza puede mover todas las demás).
+    La versión es la efectivamente leída: puede ser posterior a la pedida.
+    """
+    incremental = incremental_solutions.get(puzzle_id, version)
+    if incremental is None:
+        puzzle, pieces = await fetch_puzzle_and_pieces_async(puzzle_id)
+        _check_loaded(puzzle, pieces)
+        if is_edges_puzzle(puzzle):
+            # La búsqueda se evita si la disposición guardada es de esta versión
+            summary, steps = await edges_layout_solution(puzzle_id, puzzle, pieces)
+            with timed("solve"):
+                instructions = list(render.render_lines(summary, steps))
+            solution_cache.put(puzzle_id, puzzle.get("version", 0), instructions)
+            return None, instructions, puzzle.get("version", 0)
+        # Se guarda bajo la versión efectivamente leída, por si hubo una escritura entre medio.
+        # Construirla es trabajo de CPU: se hace en un hilo para no bloquear el event loop.
+        with timed("solve"):
+            incremental = await run_in_thread(IncrementalSolution, puzzle, pieces, puzzle.get("version", 0))
+        incremental_solutions.put(puzzle_id, incremental)
+    return incremental, None, incremental.version
+
+
+async def solve_puzzle_cached(puzzle_id: str, engine: str = None, version: int = None,
+                              shared: bool = True) -> list:
+    """
+    Igual que solve_puzzle, pero reutiliza la solución de la versión actual del puzzle
+    si ya está en cache: en ese caso sólo se consulta la versión en Neo4j.
+    Si la versión cambió por la edición de una pieza, la solución incremental ya está
+    al día y no hace falta volver a leer las piezas.
+    Con engine="numpy" la solución se calcula completa con el motor vectorizado.
+    `version` evita volver a consultarla si el llamador ya la leyó.
+    Si falta en el cache, los pedidos concurrentes de la misma versión y motor comparten
+    el cálculo, salvo con shared=False (los trabajos en segundo plano, que coalescen entre sí
+    y cuya cancelación no debe alcanzar a otros requests).
+    """
+    _, instructions = await solve_puzzle_versioned(puzzle_id, engine, version, shared)
+    return instructions
+
+
+async def solve_puzzle_versioned(puzzle_id: str, engine: str = None, version: int = None,
+                                 shared: bool = True):
+    """
+    Como solve_puzzle_cached, pero devuelve (versión resuelta, instrucciones). Si falta en el
+    cache, la versión resuelta es la de las piezas leídas: puede ser posterior a `version`
+    cuando hubo una escritura entre la consulta de la versión y la lectura.
+    """
+    if version is None:
+        version = await fetch_puzzle_version(puzzle_id)
+    if version is None:
+        raise ValueError("Puzzle no encontrado.")
+
+    cached = solution_cache.get(puzzle_id, version)
+    if cached is not None:
+        return version, cached
+
+    engine = engine or SOLVER_ENGINE
+    if not shared:
+        return await _solve_puzzle(puzzle_id, engine, version)
+    return await solutions_in_flight.do((puzzle_id, version, engine), _solve_puzzle, puzzle_id, engine, version)
+
+
+async def _solve_puzzle(puzzle_id: str, engine: str, version: int):
+    if engine == "numpy":
+        puzzle, pieces = await _fetch_for_solve(puzzle_id)
+        with timed("solve"):
+            instructions = await run_in_thread(solve_loaded, puzzle, pieces, engine)
+        solution_cache.put(puzzle_id, puzzle.get("version", 0), instructions)
+        return puzzle.get("version", 0), instructions
+
+    incremental, instructions, version = await _incremental_solution(puzzle_id, version)
+    if incremental is None:
+        return version, instructions
+    with timed("solve"):
+        instructions = incremental.instructions()
+    solution_cache.put(puzzle_id, incremental.version, instructions)
+    return incremental.version, instructions
+
+
+async def solution_diff(puzzle_id: str, since: int) -> dict:
+    """
+    Devuelve sólo las instrucciones que cambiaron desde la versión `since`.
+    Si el historial no alcanza esa versión (o el puzzle se arma por bordes),
+    devuelve la solución completa (full=True).
+    """
+    version = await fetch_puzzle_version(puzzle_id)
+    if version is None:
+        raise ValueError("Puzzle no encontrado.")
+
+    incremental, instructions, version = await _incremental_solution(puzzle_id, version)
+    if incremental is None:
+        return {"version": version, "since": since, "full": True, "instructions": instructions}
+    changes = incremental.changes_since(since)
+    if changes is None:
+        return {"version": incremental.version, "since": since, "full": True,
+                "instructions": incremental.instructions()}
+    return {"version": incremental.version, "since": since, "full": False, "changes": changes}
+
+
+def _structured(puzzle: dict, summary: dict, columns: dict) -> dict:
+    return {
+        "puzzleId": puzzle.get("puzzleId"),
+        "version": puzzle.get("version", 0),
+        "summary": summary,
+        "steps": columns,
+    }
+
+
+def solve_structured(puzzle: dict, pieces, engine: str = None) -> dict:
+    """Solución estructurada: resumen y pasos en columnas, sin texto."""
+    _check_loaded(puzzle, pieces)
+    if is_edges_puzzle(puzzle):
+        summary, steps = edges_solution(puzzle, pieces)
+        columns = to_columns(steps)
+    elif puzzle.get("puzzleTypeIsRegular") and (engine or SOLVER_ENGINE) == "numpy":
+        from core import numpy_engine
+        summary, columns = numpy_engine.solve_regular_structured(puzzle, pieces)
+    else:
+        if puzzle.get("puzzleTypeIsRegular"):
+            summary, steps = _regular_solution(puzzle, pieces)
+        else:
+            summary, steps = _irregular_solution(puzzle, pieces)
+        columns = to_columns(steps)
+    return _structured(puzzle, summary, columns)
+
+
+def with_text(solution: dict) -> dict:
+    """Agrega la capa de texto (resumen y una instrucción por paso) a una solución estructurada."""
+    summary = dict(solution["summary"])
+    summary["text"] = render.summary_line(summary)
+    line = render.step_line(summary["mode"])
+    steps = dict(solution["steps"])
+    steps["text"] = [line(Step._make(row)) for row in zip(*(steps[f] for f in Step._fields))]
+    return {**solution, "summary": summary, "steps": steps}
+
+
+async def solve_puzzle_structured_cached(puzzle_id: str, text: bool = False, engine: str = None,
+                                         version: int = None) -> dict:
+    """Solución estructurada de la versión actual del puzzle, reutilizando el cache."""
+    if version is None:
+        version = await fetch_puzzle_version(puzzle_id)
+    if version is None:
+        raise ValueError("Puzzle no encontrado.")
+
+    solution = structured_cache.get(puzzle_id, version)
+    if solution is None:
+        engine = engine or SOLVER_ENGINE
+        solution = await structured_in_flight.do(
+            (puzzle_id, version, engine), _solve_structured, puzzle_id, engine
+        )
+
+    if not text:
+        return solution
+    with timed("solve"):
+        return with_text(solution)
+
+
+async def _solve_structured(puzzle_id: str, engine: str) -> dict:
+    puzzle, pieces = await _fetch_for_solve(puzzle_id)
+    if is_edges_puzzle(puzzle) and pieces:
+        summary, steps = await edges_layout_solution(puzzle_id, puzzle, pieces)
+        solution = _structured(puzzle, summary, to_columns(steps))
+    else:
+        with timed("solve"):
+            solution = await run_in_thread(solve_structured, puzzle, pieces, engine)
+    structured_cache.put(puzzle_id, solution["version"], solution)
+    return solution
+
+
+def invalidate_solutions(puzzle_id: str) -> None:
+    """Descarta toda solución derivada de un puzzle (llamar tras cualquier escritura)."""
+    puzzle_fetches.forget(puzzle_id)
+    solve_fetches.forget(puzzle_id)
+    solution_cache.invalidate(puzzle_id)
+    structured_cache.invalidate(puzzle_id)
+    incremental_solutions.invalidate(puzzle_id)
+
+
+def apply_piece_update(puzzle_id: str, piece: dict, version: int) -> None:
+    """
+    Propaga la edición de una pieza a la solución incremental, que sólo regenera las líneas
+    afectadas; si no es posible, la solución se descarta y se reconstruirá completa.
+    """
+    puzzle_fetches.forget(puzzle_id)
+    solve_fetches.forget(puzzle_id)
+    solution_cache.invalidate(puzzle_id)
+    structured_cache.invalidate(puzzle_id)
+    incremental_solutions.apply_piece_update(puzzle_id, piece, version)
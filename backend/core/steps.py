@@ -0,0 +1,131 @@
+"""
+Solución estructurada: un registro compacto por paso, sin texto.
+El texto legible es una capa opcional (core/render.py) que se genera a partir de estos pasos.
+"""
+from collections import defaultdict
+from typing import NamedTuple, Optional
+
+
+class UnsolvablePuzzle(RuntimeError):
+    """El puzzle no se puede resolver como se pidió (datos o motor): un error del cliente (400)."""
+
+
+class Step(NamedTuple):
+    seq: int                    # Número de secuencia de la pieza
+    row: Optional[int]          # Fila (sólo puzzles regulares)
+    col: Optional[int]          # Columna (sólo puzzles regulares)
+    group: Optional[int]        # Grupo de la pieza (None si la pieza no existe)
+    orientation: Optional[int]  # Orientación en grados (None si falta)
+    missing: bool               # La pieza falta (marcada como faltante o inexistente)
+    absent: bool                # No existe ninguna pieza con ese número
+
+
+def piece_step(seq: int, row, col, piece) -> Step:
+    """Paso de una posición; `piece` es None si no existe la pieza."""
+    if not piece:
+        return Step(seq, row, col, None, None, True, True)
+    if piece.get('status') != 'present':
+        return Step(seq, row, col, piece.get('group'), None, True, False)
+    return Step(seq, row, col, piece.get('group'), piece.get('pieceOrientation', 0), False, False)
+
+
+def regular_summary(puzzle: dict, piece_count: int, present: int) -> dict:
+    """Resumen de un puzzle regular a partir de los conteos de piezas."""
+    total_expected = puzzle.get("puzzlePieceQty") or piece_count
+    row_size = puzzle.get("row_size")
+    column_size = puzzle.get("column_size") or (total_expected // row_size)
+    return {
+        "mode": "regular",
+        "rows": row_size,
+        "columns": column_size,
+        "total": total_expected,
+        "missing": total_expected - present,
+        "groups": [],
+        "groupSizes": [],
+    }
+
+
+def irregular_summary(puzzle: dict, piece_count: int, present: int, group_ids: list, group_sizes: list) -> dict:
+    """Resumen de un puzzle irregular a partir de los conteos por grupo."""
+    total = puzzle.get("puzzlePieceQty") or piece_count
+    return {
+        "mode": "irregular",
+        "rows": None,
+        "columns": None,
+        "total": total,
+        "missing": total - present,
+        "groups": list(group_ids),
+        "groupSizes": list(group_sizes),
+    }
+
+
+def iter_regular_steps(summary: dict, lookup):
+    """
+    Genera los pasos de un puzzle regular de forma perezosa, uno por posición.
+    `lookup(seq)` devuelve la pieza de esa posición o None; se consulta en orden creciente.
+    """
+    column_size = summary["columns"]
+    for seq in range(1, summary["total"] + 1):
+        row = (seq - 1) // column_size + 1
+        col = (seq - 1) % column_size + 1
+        yield piece_step(seq, row, col, lookup(seq))
+
+
+def iter_irregular_steps(ordered_pieces):
+    """Genera los pasos de un puzzle irregular a partir de piezas ya ordenadas por (grupo, secuencia)."""
+    for piece in ordered_pieces:
+        yield piece_step(piece['sequenceNumber'], None, None, piece)
+
+
+async def aiter_regular_steps(summary: dict, ordered_pieces):
+    """
+    Igual que iter_regular_steps, pero a partir de un flujo asíncrono de piezas ordenado por
+    sequenceNumber (p. ej. un cursor de Neo4j), avanzándolo sin volver atrás (memoria constante).
+    Con números repetidos gana la última pieza, igual que un diccionario.
+    """
+    it = ordered_pieces.__aiter__()
+    current = await anext(it, None)
+    column_size = summary["columns"]
+    for seq in range(1, summary["total"] + 1):
+        found = None
+        while current is not None and current['sequenceNumber'] <= seq:
+            if current['sequenceNumber'] == seq:
+                found = current
+            current = await anext(it, None)
+        yield piece_step(seq, (seq - 1) // column_size + 1, (seq - 1) % column_size + 1, found)
+
+
+def regular_solution(puzzle: dict, pieces: list):
+    """Resumen y generador de pasos (uno por posición) de un puzzle regular."""
+    # Crear mapa de secuencia a pieza
+    seq_map = {p['sequenceNumber']: p for p in pieces}
+    # Calcular faltantes por ausencia o status
+    present = sum(1 for p in pieces if p.get('status') == 'present')
+
+    summary = regular_summary(puzzle, len(pieces), present)
+    return summary, iter_regular_steps(summary, seq_map.get)
+
+
+def irregular_solution(puzzle: dict, pieces: list):
+    """Resumen y generador de pasos (agrupados y ordenados por secuencia) de un puzzle irregular."""
+    grouped = defaultdict(list)
+    for piece in pieces:
+        grouped[piece['group']].append(piece)
+
+    present = sum(1 for p in pieces if p.get('status') == 'present')
+    group_ids = sorted(grouped)
+    summary = irregular_summary(
+        puzzle, len(pieces), present, group_ids, [len(grouped[g]) for g in group_ids]
+    )
+    ordered = (
+        piece
+        for group_id in group_ids
+        for piece in sorted(grouped[group_id], key=lambda p: p.get("sequenceNumber", 0))
+    )
+    return summary, iter_irregular_steps(ordered)
+
+
+def to_columns(steps) -> dict:
+    """Representación por columnas de los pasos: una lista por campo de Step."""
+    columns = [list(c) for c in zip(*steps)] or [[] for _ in Step._fields]
+    return dict(zip(Step._fields, columns))
@@ -0,0 +1,10 @@
+# Archivo: backend/models/assembly.py
+
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+# Cambios de una sesión de armado (todos opcionales)
+class AssemblyUpdate(BaseModel):
+    complete: List[int] = []                   # Filas (regular) o grupos (irregular) terminados
+    reopen: List[int] = []                     # Filas o grupos que vuelven a quedar pendientes
+    cursor: Optional[int] = Field(None, ge=0)  # Posición del paso al que llegó quien arma
@@ -1,7 +1,7 @@
 # Archivo: backend/models/piece.py
 
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
 from uuid import UUID
 
 # Modelo base con los campos comunes de una pieza de puzzle
@@ -10,6 +10,9 @@ class PieceBase(BaseModel):
     pieceOrientation: int      # Orientación de la pieza en grados (ejemplo: 90°)
     group: int                 # Grupo al que pertenece la pieza (ejemplo: grupo 3)
     status: Optional[str] = 'present' # 'present' | 'missing'
+    # Bordes [arriba, derecha, abajo, izquierda]: 0 plano, +k saliente / -k entrante con perfil k
+    # (sólo puzzles con solverMode 'edges')
+    edges: Optional[List[int]] = Field(None, min_length=4, max_length=4)
 
 # Modelo usado para crear una nueva pieza
 class PieceCreate(PieceBase):
@@ -21,9 +24,41 @@ class PieceUpdate(BaseModel):
     pieceOrientation: Optional[int]  = None # Permite actualizar la orientación
     group: Optional[int]       = None        # Permite actualizar el grupo
     status: Optional[str] = None # 'present' | 'missing'
+    edges: Optional[List[int]] = Field(None, min_length=4, max_length=4)
 
 
 # Modelo usado para leer una pieza (incluye el ID único)
 class PieceRead(PieceBase):
     pieceId: UUID  # Identificador único de la pieza
     puzzleId: str  # ID del puzzle al que pertenece la pieza
+
+
+# Identifica las piezas de una operación masiva: por UUID o por número de secuencia
+class PieceSelector(BaseModel):
+    pieceId: Optional[UUID] = None
+    sequenceNumber: Optional[int] = None
+
+    @model_validator(mode="after")
+    def _exactly_one(self):
+        if (self.pieceId is None) == (self.sequenceNumber is None):
+            raise ValueError("Indicar pieceId o sequenceNumber (sólo uno)")
+        return self
+
+
+# Elemento de PATCH .../pieces/bulk: selector + campos a actualizar
+class PieceBulkUpdate(PieceUpdate, PieceSelector):
+    pass
+
+
+# Cuerpo de DELETE .../pieces/bulk
+class PieceBulkDelete(BaseModel):
+    pieceIds: List[UUID] = []
+    sequenceNumbers: List[int] = []
+
+
+# Resultado de cada elemento de una operación masiva
+class PieceBulkResult(BaseModel):
+    pieceId: Optional[UUID] = None
+    sequenceNumber: Optional[int] = None
+    matched: int                    # Piezas afectadas por este elemento
+    pieces: List[PieceRead] = []    # Piezas actualizadas (vacío en el borrado)
@@ -1,7 +1,7 @@
 # Archivo: backend/models/puzzle.py
 
 from pydantic import BaseModel
-from typing import Optional
+from typing import Literal, Optional
 from uuid import UUID
 
 # Modelo base que contiene los atributos comunes de un Puzzle
@@ -12,6 +12,8 @@ class PuzzleBase(BaseModel):
     puzzlePieceQty: int  # Cantidad total de piezas del rompecabezas
     puzzleMaterial: str  # Material del rompecabezas (ej. "Cartón", "Madera", etc.)
     row_size: Optional[int] = None  # Solo para puzzles regulares (número de piezas por fila)
+    # 'sequence' (por defecto): posición según sequenceNumber | 'edges': por la forma de los bordes
+    solverMode: Optional[Literal["sequence", "edges"]] = None
 
 
 # Modelo utilizado al crear un nuevo Puzzle
@@ -27,6 +29,7 @@ class PuzzleUpdate(BaseModel):
     puzzlePieceQty: Optional[int]  = None
     puzzleMaterial: Optional[str]  = None
     row_size: Optional[int]  = None
+    solverMode: Optional[Literal["sequence", "edges"]] = None
 
 # Modelo utilizado para leer o devolver un Puzzle (incluye el ID)
 class PuzzleRead(PuzzleBase):
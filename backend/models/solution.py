@@ -0,0 +1,44 @@
+# Archivo: backend/models/solution.py
+
+import os
+
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+# Puzzles por pedido en POST /solver/batch (cada uno ocupa un proceso del pool)
+SOLVER_BATCH_MAX_PUZZLES = int(os.getenv("SOLVER_BATCH_MAX_PUZZLES", "100"))
+
+# Resumen de la solución
+class SolutionSummary(BaseModel):
+    mode: str                        # 'regular' | 'irregular'
+    rows: Optional[int] = None       # Sólo regulares
+    columns: Optional[int] = None    # Sólo regulares
+    total: int                       # Total de piezas esperadas
+    missing: int                     # Piezas faltantes (marcadas o inexistentes)
+    groups: List[int] = []           # Ids de grupo en orden (sólo irregulares)
+    groupSizes: List[int] = []       # Cantidad de piezas de cada grupo
+    text: Optional[str] = None       # Resumen en texto (sólo si se pide)
+
+# Pasos de la solución en formato columnar: la posición i de cada lista es el paso i
+class SolutionSteps(BaseModel):
+    seq: List[int]
+    row: List[Optional[int]]
+    col: List[Optional[int]]
+    group: List[Optional[int]]
+    orientation: List[Optional[int]]
+    missing: List[bool]
+    absent: List[bool]
+    text: Optional[List[str]] = None  # Instrucción en texto de cada paso (sólo si se pide)
+
+# Solución estructurada completa
+class StructuredSolution(BaseModel):
+    puzzleId: str
+    version: int
+    summary: SolutionSummary
+    steps: SolutionSteps
+
+
+# Pedido de resolución de varios puzzles
+class BatchSolveRequest(BaseModel):
+    puzzleIds: List[str] = Field(..., max_length=SOLVER_BATCH_MAX_PUZZLES)  # UUIDs de los puzzles a resolver
+    engine: Optional[Literal["python", "numpy"]] = None                    # Por defecto SOLVER_ENGINE
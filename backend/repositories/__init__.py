@@ -0,0 +1,36 @@
+"""
+Almacenamiento de puzzles y piezas. La implementación se elige con PUZZLE_REPOSITORY:
+- "neo4j" (por defecto): la base de datos configurada en services/neo4j.py.
+- "memory": diccionarios en el proceso; no necesita Neo4j (desarrollo, tests, benchmarks).
+"""
+import os
+
+from repositories.base import PuzzleRepository
+
+PUZZLE_REPOSITORY = os.getenv("PUZZLE_REPOSITORY", "neo4j")
+
+_repository = None
+
+
+def create_repository(kind: str) -> PuzzleRepository:
+    if kind == "neo4j":
+        from repositories.neo4j import Neo4jRepository
+        return Neo4jRepository()
+    if kind == "memory":
+        from repositories.memory import MemoryRepository
+        return MemoryRepository()
+    raise ValueError(f"PUZZLE_REPOSITORY desconocido: {kind!r} (use 'neo4j' o 'memory')")
+
+
+def get_repository() -> PuzzleRepository:
+    """Retorna el repositorio singleton configurado."""
+    global _repository
+    if _repository is None:
+        _repository = create_repository(PUZZLE_REPOSITORY)
+    return _repository
+
+
+def set_repository(repository: PuzzleRepository) -> None:
+    """Reemplaza el repositorio en uso (p. ej. uno en memoria en los tests)."""
+    global _repository
+    _repository = repository
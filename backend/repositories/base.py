@@ -0,0 +1,285 @@
+"""
+Interfaz del almacenamiento de puzzles y piezas.
+Los routers y el solver sólo usan estos métodos; la implementación se elige con
+PUZZLE_REPOSITORY (ver repositories/__init__.py).
+
+Convenciones comunes a todas las implementaciones:
+- Los puzzles y piezas se devuelven como diccionarios con sus propiedades
+  (las piezas incluyen puzzleId).
+- Toda escritura incrementa la versión del puzzle (invalida soluciones cacheadas).
+- Los listados aceptan filtros {propiedad: valor} (sólo las de *_FILTERS), una proyección
+  (sólo campos de *_FIELDS; None devuelve todas las propiedades) y paginación por clave:
+  los puzzles se ordenan por puzzleId y las piezas por (sequenceNumber, pieceId);
+  `after` es la clave de la última fila de la página anterior.
+- La disposición resuelta (dónde va cada pieza y cuáles quedan juntas) se guarda sellada con
+  la versión del puzzle en layoutVersion: guardarla no cambia la versión, y cualquier escritura
+  posterior la deja vieja sin tener que borrarla.
+- Las sesiones de armado ({sessionId, puzzleId, completed, cursor, createdAt, updatedAt})
+  guardan el avance de quien arma el puzzle; no cambian su versión y se eliminan con él.
+"""
+import functools
+import inspect
+import os
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Optional
+
+from core.geometric import is_edges_puzzle
+from core.pieces import PieceColumns
+from services.metrics import timed
+
+# Piezas borradas por transacción al eliminar un puzzle o purgar huérfanas
+DELETE_BATCH_SIZE = int(os.getenv("PIECES_DELETE_BATCH_SIZE", "10000"))
+
+# Campos que se pueden pedir en la proyección de los listados
+PUZZLE_FIELDS = (
+    "puzzleId", "puzzleTypeIsRegular", "puzzleTheme", "puzzleBrand",
+    "puzzlePieceQty", "puzzleMaterial", "row_size", "solverMode",
+)
+PIECE_FIELDS = ("pieceId", "puzzleId", "sequenceNumber", "pieceOrientation", "group", "status", "edges")
+
+# Propiedades por las que se puede filtrar
+PUZZLE_FILTERS = ("puzzleTheme", "puzzleBrand", "puzzleMaterial", "puzzleTypeIsRegular")
+PIECE_FILTERS = ("status", "group")
+
+
+def _timed_db(method):
+    """Cuenta el tiempo del método (o de cada paso del iterador) en la fase "db" del request."""
+    if inspect.isasyncgenfunction(method):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            iterator = method(*args, **kwargs).__aiter__()
+            while True:
+                with timed("db"):
+                    try:
+                        item = await iterator.__anext__()
+                    except StopAsyncIteration:
+                        return
+                yield item
+        return wrapper
+
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        with timed("db"):
+            return await method(*args, **kwargs)
+    return wrapper
+
+
+class PuzzleRepository(ABC):
+
+    def __init_subclass__(cls, **kwargs):
+        # Toda operación pública de una implementación cuenta como tiempo de base de datos
+        super().__init_subclass__(**kwargs)
+        for name, member in list(vars(cls).items()):
+            if not name.startswith("_") and (inspect.iscoroutinefunction(member) or inspect.isasyncgenfunction(member)):
+                setattr(cls, name, _timed_db(member))
+
+    # --- Puzzles ---
+
+    @abstractmethod
+    async def create_puzzle(self, puzzle_id: str, data: dict) -> dict:
+        """Crea un puzzle con versión 0 y lo devuelve."""
+
+    @abstractmethod
+    async def get_puzzle(self, puzzle_id: str) -> Optional[dict]:
+        """Devuelve el puzzle o None si no existe."""
+
+    @abstractmethod
+    async def list_puzzles(self, filters: dict = None, fields: list = None,
+                           after: list = None, limit: int = None) -> list:
+        """Devuelve los puzzles que cumplen los filtros, ordenados por puzzleId (hasta `limit`)."""
+
+    @abstractmethod
+    async def count_puzzles(self, filters: dict = None) -> int:
+        """Cuenta los puzzles que cumplen los filtros sin cargarlos."""
+
+    @abstractmethod
+    async def update_puzzle(self, puzzle_id: str, fields: dict) -> Optional[dict]:
+        """Actualiza parcialmente el puzzle; devuelve None si no existe."""
+
+    @abstractmethod
+    async def delete_puzzle_node(self, puzzle_id: str) -> bool:
+        """
+        Elimina el puzzle y sus sesiones de armado en una transacción corta; sus piezas quedan
+        huérfanas hasta que las borre delete_puzzle_pieces (o purge_orphan_pieces).
+        Devuelve False si no existía.
+        """
+
+    @abstractmethod
+    async def delete_puzzle_pieces(self, puzzle_id: str, batch_size: int = None) -> int:
+        """Elimina un lote de piezas de un puzzle ya eliminado (una transacción); devuelve cuántas."""
+
+    async def delete_puzzle(self, puzzle_id: str, batch_size: int = None) -> int:
+        """
+        Elimina el puzzle y luego sus piezas en lotes de `batch_size` (una transacción por lote);
+        devuelve cuántas piezas eliminó (no falla si no existe). Si se interrumpe a mitad,
+        las piezas restantes quedan huérfanas y las elimina purge_orphan_pieces.
+        """
+        await self.delete_puzzle_node(puzzle_id)
+        batch_size = batch_size or DELETE_BATCH_SIZE
+        total = 0
+        while True:
+            deleted = await self.delete_puzzle_pieces(puzzle_id, batch_size)
+            total += deleted
+            if deleted < batch_size:
+                return total
+
+    async def puzzle_exists(self, puzzle_id: str) -> bool:
+        return await self.get_puzzle_version(puzzle_id) is not None
+
+    @abstractmethod
+    async def get_puzzle_version(self, puzzle_id: str) -> Optional[int]:
+        """Versión actual del puzzle, o None si no existe."""
+
+    # --- Piezas ---
+
+    @abstractmethod
+    async def create_pieces(self, puzzle_id: str, pieces: list) -> list:
+        """Crea un lote de piezas (una sola transacción) y devuelve las piezas creadas."""
+
+    @abstractmethod
+    async def list_pieces(self, puzzle_id: str, filters: dict = None, fields: list = None,
+                          after: list = None, limit: int = None) -> list:
+        """
+        Devuelve las piezas del puzzle que cumplen los filtros, ordenadas por
+        (sequenceNumber, pieceId) (hasta `limit`).
+        """
+
+    @abstractmethod
+    async def count_pieces(self, puzzle_id: str, filters: dict = None) -> int:
+        """Cuenta las piezas del puzzle que cumplen los filtros sin cargarlas."""
+
+    @abstractmethod
+    async def get_piece(self, puzzle_id: str, piece_id: str) -> Optional[dict]:
+        """Devuelve la pieza o None si no existe en ese puzzle."""
+
+    @abstractmethod
+    async def update_piece(self, puzzle_id: str, piece_id: str, fields: dict):
+        """Actualiza la pieza; devuelve (pieza, nueva versión del puzzle) o None si no existe."""
+
+    @abstractmethod
+    async def delete_piece(self, puzzle_id: str, piece_id: str) -> bool:
+        """Elimina la pieza; devuelve False si no existía."""
+
+    @abstractmethod
+    async def update_pieces(self, puzzle_id: str, updates: list):
+        """
+        Aplica varias actualizaciones en una sola transacción. Cada una es
+        {"pieceId" o "sequenceNumber", "fields"}; devuelve (piezas actualizadas por cada
+        una, nueva versión del puzzle) o None si el puzzle no existe.
+        """
+
+    @abstractmethod
+    async def delete_pieces(self, puzzle_id: str, targets: list):
+        """
+        Elimina en una sola transacción las piezas de cada selector {"pieceId" o "sequenceNumber"};
+        devuelve (piezas eliminadas por selector, nueva versión del puzzle) o None si el puzzle no existe.
+        """
+
+    @abstractmethod
+    async def count_orphan_pieces(self) -> int:
+        """Cuenta las piezas que no pertenecen a ningún puzzle."""
+
+    @abstractmethod
+    async def purge_orphan_pieces(self, batch_size: int = None) -> int:
+        """Elimina un lote de piezas huérfanas (una transacción); devuelve cuántas eliminó."""
+
+    # --- Lecturas del solver ---
+
+    @abstractmethod
+    async def get_puzzle_and_pieces(self, puzzle_id: str):
+        """Devuelve (puzzle, piezas), o (None, []) si el puzzle no existe."""
+
+    async def get_puzzle_and_piece_columns(self, puzzle_id: str):
+        """
+        Devuelve (puzzle, PieceColumns) con sólo los campos que usa el solver, o
+        (None, columnas vacías) si el puzzle no existe. Por defecto convierte get_puzzle_and_pieces;
+        las implementaciones pueden proyectar los campos en la consulta.
+        """
+        puzzle, pieces = await self.get_puzzle_and_pieces(puzzle_id)
+        return puzzle, PieceColumns.from_dicts(pieces)
+
+    async def get_puzzle_and_solver_pieces(self, puzzle_id: str):
+        """
+        Puzzle y piezas para resolverlo completo, en una sola lectura: PieceColumns, salvo en los
+        puzzles por bordes, cuya búsqueda necesita todas las propiedades de cada pieza
+        (diccionarios). (None, columnas vacías) si el puzzle no existe.
+        """
+        puzzle, pieces = await self.get_puzzle_and_pieces(puzzle_id)
+        if puzzle is None:
+            return None, PieceColumns()
+        return puzzle, pieces if is_edges_puzzle(puzzle) else PieceColumns.from_dicts(pieces)
+
+    @abstractmethod
+    async def get_many_puzzles_and_pieces(self, puzzle_ids: list) -> dict:
+        """Devuelve {puzzle_id: (puzzle, piezas)}; los ids inexistentes no aparecen."""
+
+    @abstractmethod
+    async def get_piece_counts(self, puzzle_id: str):
+        """
+        Devuelve (puzzle, grupos) sin cargar las piezas, donde cada grupo es
+        {"group", "n", "present"} y los grupos vienen ordenados; None si el puzzle no existe.
+        """
+
+    @abstractmethod
+    def iter_ordered_pieces(self, puzzle_id: str, by_group: bool) -> AsyncIterator[dict]:
+        """
+        Itera las piezas (sequenceNumber, pieceOrientation, group, status) ordenadas por
+        sequenceNumber, o por (group, sequenceNumber) si by_group, sin cargarlas todas.
+        """
+
+    # --- Disposición resuelta ---
+
+    @abstractmethod
+    async def get_layout(self, puzzle_id: str) -> Optional[dict]:
+        """
+        Devuelve {"version", "layoutVersion", "placements"} con una colocación
+        {pieceId, sequenceNumber, group, row, col, orientation} por pieza, ordenadas por
+        (row, col); layoutVersion es None si nunca se guardó. None si el puzzle no existe.
+        """
+
+    @abstractmethod
+    async def save_layout(self, puzzle_id: str, version: int, placements: list, adjacent: list) -> bool:
+        """
+        Reemplaza la disposición en una sola transacción: una relación PLACED_AT por colocación
+        y una ADJACENT_TO {side} por par {a, b, side} (b a la derecha o debajo de a).
+        Sólo escribe si el puzzle sigue en `version`; devuelve False si no.
+        """
+
+    @abstractmethod
+    async def delete_layout(self, puzzle_id: str) -> bool:
+        """Elimina la disposición guardada; devuelve False si el puzzle no existe."""
+
+    @abstractmethod
+    async def get_neighbors(self, puzzle_id: str, piece_id: str) -> Optional[dict]:
+        """
+        Colocación de la pieza y de sus vecinas en la disposición guardada:
+        {"version", "layoutVersion", "sequenceNumber", "placement", "neighbors"}, donde cada
+        vecina es {side, pieceId, sequenceNumber, row, col, orientation} con `side` visto desde
+        la pieza. None si la pieza no existe en ese puzzle.
+        """
+
+    # --- Sesiones de armado ---
+
+    @abstractmethod
+    async def create_assembly(self, puzzle_id: str, session_id: str) -> Optional[dict]:
+        """Crea una sesión sin bloques terminados y con el cursor en 0; None si el puzzle no existe."""
+
+    @abstractmethod
+    async def get_assembly(self, session_id: str) -> Optional[dict]:
+        """Devuelve la sesión, o None si no existe."""
+
+    @abstractmethod
+    async def list_assemblies(self, puzzle_id: str) -> Optional[list]:
+        """Sesiones del puzzle por fecha de creación; None si el puzzle no existe."""
+
+    @abstractmethod
+    async def update_assembly(self, session_id: str, complete: list, reopen: list,
+                              cursor: Optional[int]) -> Optional[dict]:
+        """
+        En una sola escritura: agrega `complete` a los bloques terminados, quita `reopen` y,
+        si no es None, mueve el cursor. Devuelve la sesión actualizada o None si no existe.
+        """
+
+    @abstractmethod
+    async def delete_assembly(self, session_id: str) -> bool:
+        """Elimina la sesión; devuelve False si no existía."""
@@ -0,0 +1,379 @@
+"""
+Repositorio en memoria: mismo comportamiento que Neo4j sin base de datos, para desarrollo
+local, tests y benchmarks. Los datos viven en el proceso (cada worker tiene los suyos).
+
+Índices:
+- _puzzles:    puzzleId -> puzzle
+- _pieces:     puzzleId -> {pieceId -> pieza}
+- _sequences:  puzzleId -> {sequenceNumber -> {pieceId -> pieza}}
+- _layouts:    puzzleId -> (pieceId -> colocación, pieceId -> [(lado, pieceId vecina)])
+- _orphans:    puzzleId eliminado -> {pieceId -> pieza} (las que aún no se borraron por lotes)
+Las operaciones no ceden el event loop a mitad de una escritura, por lo que cada una es atómica.
+"""
+import time
+import uuid
+from typing import Optional
+
+from core.geometric import is_edges_puzzle
+from core.pieces import PieceColumns
+from repositories.base import DELETE_BATCH_SIZE, PuzzleRepository
+
+# Campos de la pieza que necesita el solver al recorrerlas en orden
+_STEP_FIELDS = ("sequenceNumber", "pieceOrientation", "group", "status")
+
+_OPPOSITE_SIDE = {"top": "bottom", "right": "left", "bottom": "top", "left": "right"}
+
+
+def _matches(row: dict, filters: dict) -> bool:
+    return all(row.get(k) == v for k, v in (filters or {}).items())
+
+
+def _project(row: dict, fields: list) -> dict:
+    """Como la proyección de mapa en Cypher: los campos ausentes valen None."""
+    return {f: row.get(f) for f in fields} if fields else dict(row)
+
+
+def _set_fields(target: dict, fields: dict) -> None:
+    """Como SET en Cypher: asignar None elimina la propiedad."""
+    for key, value in fields.items():
+        if value is None:
+            target.pop(key, None)
+        else:
+            target[key] = value
+
+
+class MemoryRepository(PuzzleRepository):
+
+    def __init__(self):
+        self._puzzles = {}
+        self._pieces = {}
+        self._sequences = {}
+        self._layouts = {}
+        self._assemblies = {}
+        self._orphans = {}
+
+    def clear(self) -> None:
+        self._puzzles.clear()
+        self._pieces.clear()
+        self._sequences.clear()
+        self._layouts.clear()
+        self._assemblies.clear()
+        self._orphans.clear()
+
+    def _bump(self, puzzle: dict) -> int:
+        puzzle["version"] = puzzle.get("version", 0) + 1
+        return puzzle["version"]
+
+    def _index(self, piece: dict) -> None:
+        self._sequences[piece["puzzleId"]].setdefault(piece["sequenceNumber"], {})[piece["pieceId"]] = piece
+
+    def _unindex(self, piece: dict) -> None:
+        sequences = self._sequences[piece["puzzleId"]]
+        bucket = sequences[piece["sequenceNumber"]]
+        del bucket[piece["pieceId"]]
+        if not bucket:
+            del sequences[piece["sequenceNumber"]]
+
+    # --- Puzzles ---
+
+    async def create_puzzle(self, puzzle_id: str, data: dict) -> dict:
+        puzzle = {k: v for k, v in data.items() if v is not None}
+        puzzle.update(puzzleId=puzzle_id, version=0)
+        self._puzzles[puzzle_id] = puzzle
+        self._pieces[puzzle_id] = {}
+        self._sequences[puzzle_id] = {}
+        return dict(puzzle)
+
+    async def get_puzzle(self, puzzle_id: str) -> Optional[dict]:
+        puzzle = self._puzzles.get(puzzle_id)
+        return dict(puzzle) if puzzle else None
+
+    async def list_puzzles(self, filters: dict = None, fields: list = None,
+                           after: list = None, limit: int = None) -> list:
+        rows = sorted(
+            (p for p in self._puzzles.values() if _matches(p, filters)
+             and (after is None or p["puzzleId"] > after[0])),
+            key=lambda p: p["puzzleId"]
+        )
+        return [_project(p, fields) for p in rows[:limit]]
+
+    async def count_puzzles(self, filters: dict = None) -> int:
+        return sum(_matches(p, filters) for p in self._puzzles.values())
+
+    async def update_puzzle(self, puzzle_id: str, fields: dict) -> Optional[dict]:
+        puzzle = self._puzzles.get(puzzle_id)
+        if puzzle is None:
+            return None
+        _set_fields(puzzle, fields)
+        self._bump(puzzle)
+        return dict(puzzle)
+
+    async def delete_puzzle_node(self, puzzle_id: str) -> bool:
+        if self._puzzles.pop(puzzle_id, None) is None:
+            return False
+        self._sequences.pop(puzzle_id, None)
+        self._layouts.pop(puzzle_id, None)
+        for session_id in [k for k, s in self._assemblies.items() if s["puzzleId"] == puzzle_id]:
+            del self._assemblies[session_id]
+        # Como en Neo4j, las piezas quedan huérfanas hasta que se borran por lotes
+        self._orphans.setdefault(puzzle_id, {}).update(self._pieces.pop(puzzle_id, {}))
+        return True
+
+    async def delete_puzzle_pieces(self, puzzle_id: str, batch_size: int = None) -> int:
+        pieces = self._orphans.get(puzzle_id)
+        if not pieces:
+            return 0
+        batch = list(pieces)[:batch_size or DELETE_BATCH_SIZE]
+        for piece_id in batch:
+            del pieces[piece_id]
+        if not pieces:
+            del self._orphans[puzzle_id]
+        return len(batch)
+
+    async def get_puzzle_version(self, puzzle_id: str) -> Optional[int]:
+        puzzle = self._puzzles.get(puzzle_id)
+        return puzzle.get("version", 0) if puzzle else None
+
+    # --- Piezas ---
+
+    async def create_pieces(self, puzzle_id: str, pieces: list) -> list:
+        puzzle = self._puzzles.get(puzzle_id)
+        if puzzle is None:
+            return []
+        self._bump(puzzle)
+        created = []
+        for data in pieces:
+            piece = {k: v for k, v in data.items() if v is not None}
+            piece.update(pieceId=str(uuid.uuid4()), puzzleId=puzzle_id)
+            self._pieces[puzzle_id][piece["pieceId"]] = piece
+            self._index(piece)
+            created.append(dict(piece))
+        return created
+
+    async def list_pieces(self, puzzle_id: str, filters: dict = None, fields: list = None,
+                          after: list = None, limit: int = None) -> list:
+        after = tuple(after) if after is not None else None
+        rows = sorted(
+            (p for p in self._pieces.get(puzzle_id, {}).values() if _matches(p, filters)
+             and (after is None or (p["sequenceNumber"], p["pieceId"]) > after)),
+            key=lambda p: (p["sequenceNumber"], p["pieceId"])
+        )
+        return [_project(p, fields) for p in rows[:limit]]
+
+    async def count_pieces(self, puzzle_id: str, filters: dict = None) -> int:
+        return sum(_matches(p, filters) for p in self._pieces.get(puzzle_id, {}).values())
+
+    async def get_piece(self, puzzle_id: str, piece_id: str) -> Optional[dict]:
+        piece = self._pieces.get(puzzle_id, {}).get(piece_id)
+        return dict(piece) if piece else None
+
+    async def update_piece(self, puzzle_id: str, piece_id: str, fields: dict):
+        piece = self._pieces.get(puzzle_id, {}).get(piece_id)
+        if piece is None:
+            return None
+        self._unindex(piece)
+        _set_fields(piece, fields)
+        self._index(piece)
+        return dict(piece), self._bump(self._puzzles[puzzle_id])
+
+    async def delete_piece(self, puzzle_id: str, piece_id: str) -> bool:
+        piece = self._pieces.get(puzzle_id, {}).pop(piece_id, None)
+        if piece is None:
+            return False
+        self._unindex(piece)
+        self._bump(self._puzzles[puzzle_id])
+        return True
+
+    def _select(self, puzzle_id: str, target: dict) -> list:
+        if target.get("pieceId") is not None:
+            piece = self._pieces[puzzle_id].get(target["pieceId"])
+            return [piece] if piece else []
+        return list(self._sequences[puzzle_id].get(target.get("sequenceNumber"), {}).values())
+
+    async def update_pieces(self, puzzle_id: str, updates: list):
+        if puzzle_id not in self._puzzles:
+            return None
+        results = []
+        for update in updates:
+            pieces = self._select(puzzle_id, update)
+            for piece in pieces:
+                self._unindex(piece)
+                _set_fields(piece, update["fields"])
+                self._index(piece)
+            results.append([dict(p) for p in pieces])
+        return results, self._bump(self._puzzles[puzzle_id])
+
+    async def delete_pieces(self, puzzle_id: str, targets: list):
+        if puzzle_id not in self._puzzles:
+            return None
+        # Se cuentan todas las coincidencias antes de borrar: una pieza puede aparecer en dos selectores
+        matched = [self._select(puzzle_id, target) for target in targets]
+        for piece in {p["pieceId"]: p for pieces in matched for p in pieces}.values():
+            del self._pieces[puzzle_id][piece["pieceId"]]
+            self._unindex(piece)
+        return [len(pieces) for pieces in matched], self._bump(self._puzzles[puzzle_id])
+
+    async def count_orphan_pieces(self) -> int:
+        return sum(len(pieces) for pieces in self._orphans.values())
+
+    async def purge_orphan_pieces(self, batch_size: int = None) -> int:
+        size, deleted = batch_size or DELETE_BATCH_SIZE, 0
+        for puzzle_id in list(self._orphans):
+            if deleted == size:
+                break
+            deleted += await self.delete_puzzle_pieces(puzzle_id, size - deleted)
+        return deleted
+
+    # --- Lecturas del solver ---
+
+    async def get_puzzle_and_pieces(self, puzzle_id: str):
+        puzzle = self._puzzles.get(puzzle_id)
+        if puzzle is None:
+            return None, []
+        return dict(puzzle), [dict(p) for p in self._pieces[puzzle_id].values()]
+
+    async def get_puzzle_and_piece_columns(self, puzzle_id: str):
+        puzzle = self._puzzles.get(puzzle_id)
+        if puzzle is None:
+            return None, PieceColumns()
+        return dict(puzzle), PieceColumns.from_dicts(self._pieces[puzzle_id].values())
+
+    async def get_puzzle_and_solver_pieces(self, puzzle_id: str):
+        puzzle = self._puzzles.get(puzzle_id)
+        if puzzle is None or not is_edges_puzzle(puzzle):
+            return await self.get_puzzle_and_piece_columns(puzzle_id)
+        return await self.get_puzzle_and_pieces(puzzle_id)
+
+    async def get_many_puzzles_and_pieces(self, puzzle_ids: list) -> dict:
+        loaded = {}
+        for puzzle_id in puzzle_ids:
+            puzzle, pieces = await self.get_puzzle_and_pieces(puzzle_id)
+            if puzzle is not None:
+                loaded[puzzle_id] = (puzzle, pieces)
+        return loaded
+
+    async def get_piece_counts(self, puzzle_id: str):
+        puzzle = self._puzzles.get(puzzle_id)
+        if puzzle is None:
+            return None
+        groups = {}
+        for piece in self._pieces[puzzle_id].values():
+            g = groups.setdefault(piece.get("group"), {"group": piece.get("group"), "n": 0, "present": 0})
+            g["n"] += 1
+            g["present"] += piece.get("status") == "present"
+        # Como ORDER BY en Cypher: los nulos al final
+        return dict(puzzle), [groups[k] for k in sorted(groups, key=lambda g: (g is None, g or 0))]
+
+    async def iter_ordered_pieces(self, puzzle_id: str, by_group: bool):
+        if by_group:
+            ordered = sorted(
+                self._pieces.get(puzzle_id, {}).values(),
+                key=lambda p: (p.get("group") is None, p.get("group") or 0, p["sequenceNumber"])
+            )
+        else:
+            sequences = self._sequences.get(puzzle_id, {})
+            ordered = (piece for seq in sorted(sequences) for piece in sequences[seq].values())
+        for piece in ordered:
+            yield {field: piece.get(field) for field in _STEP_FIELDS}
+
+    # --- Disposición resuelta ---
+
+    def _placement(self, puzzle_id: str, piece_id: str, placement: dict) -> Optional[dict]:
+        # Como DETACH DELETE: las piezas eliminadas después de guardar no aparecen
+        piece = self._pieces[puzzle_id].get(piece_id)
+        if piece is None:
+            return None
+        return {**placement, "pieceId": piece_id, "sequenceNumber": piece.get("sequenceNumber")}
+
+    async def get_layout(self, puzzle_id: str) -> Optional[dict]:
+        puzzle = self._puzzles.get(puzzle_id)
+        if puzzle is None:
+            return None
+        placed, _ = self._layouts.get(puzzle_id, ({}, {}))
+        placements = []
+        for piece_id, placement in placed.items():
+            found = self._placement(puzzle_id, piece_id, placement)
+            if found:
+                found["group"] = self._pieces[puzzle_id][piece_id].get("group")
+                placements.append(found)
+        placements.sort(key=lambda pl: (pl["row"], pl["col"]))
+        return {"version": puzzle.get("version", 0), "layoutVersion": puzzle.get("layoutVersion"),
+                "placements": placements}
+
+    async def save_layout(self, puzzle_id: str, version: int, placements: list, adjacent: list) -> bool:
+        puzzle = self._puzzles.get(puzzle_id)
+        if puzzle is None or (version is not None and puzzle.get("version", 0) != version):
+            return False
+        placed = {
+            pl["pieceId"]: {"row": pl["row"], "col": pl["col"], "orientation": pl.get("orientation")}
+            for pl in placements if pl["pieceId"] in self._pieces[puzzle_id]
+        }
+        neighbors = {}
+        for adj in adjacent:
+            if adj["a"] in placed and adj["b"] in placed:
+                neighbors.setdefault(adj["a"], []).append((adj["side"], adj["b"]))
+                neighbors.setdefault(adj["b"], []).append((_OPPOSITE_SIDE[adj["side"]], adj["a"]))
+        self._layouts[puzzle_id] = (placed, neighbors)
+        _set_fields(puzzle, {"layoutVersion": version})
+        return True
+
+    async def delete_layout(self, puzzle_id: str) -> bool:
+        return await self.save_layout(puzzle_id, None, [], [])
+
+    async def get_neighbors(self, puzzle_id: str, piece_id: str) -> Optional[dict]:
+        piece = self._pieces.get(puzzle_id, {}).get(piece_id)
+        if piece is None:
+            return None
+        puzzle = self._puzzles[puzzle_id]
+        placed, neighbors = self._layouts.get(puzzle_id, ({}, {}))
+        found = []
+        for side, other_id in neighbors.get(piece_id, ()):
+            other = self._placement(puzzle_id, other_id, placed[other_id])
+            if other:
+                found.append({**other, "side": side})
+        return {
+            "version": puzzle.get("version", 0),
+            "layoutVersion": puzzle.get("layoutVersion"),
+            "sequenceNumber": piece.get("sequenceNumber"),
+            "placement": dict(placed[piece_id]) if piece_id in placed else None,
+            "neighbors": found,
+        }
+
+    # --- Sesiones de armado ---
+
+    async def create_assembly(self, puzzle_id: str, session_id: str) -> Optional[dict]:
+        if puzzle_id not in self._puzzles:
+            return None
+        now = time.time()
+        session = {"sessionId": session_id, "puzzleId": puzzle_id, "completed": [], "cursor": 0,
+                   "createdAt": now, "updatedAt": now}
+        self._assemblies[session_id] = session
+        return _copy_assembly(session)
+
+    async def get_assembly(self, session_id: str) -> Optional[dict]:
+        session = self._assemblies.get(session_id)
+        return _copy_assembly(session) if session else None
+
+    async def list_assemblies(self, puzzle_id: str) -> Optional[list]:
+        if puzzle_id not in self._puzzles:
+            return None
+        found = [s for s in self._assemblies.values() if s["puzzleId"] == puzzle_id]
+        return [_copy_assembly(s) for s in sorted(found, key=lambda s: s["createdAt"])]
+
+    async def update_assembly(self, session_id: str, complete: list, reopen: list,
+                              cursor: Optional[int]) -> Optional[dict]:
+        session = self._assemblies.get(session_id)
+        if session is None:
+            return None
+        session["completed"] = [k for k in session["completed"] if k not in reopen and k not in complete] + complete
+        if cursor is not None:
+            session["cursor"] = cursor
+        session["updatedAt"] = time.time()
+        return _copy_assembly(session)
+
+    async def delete_assembly(self, session_id: str) -> bool:
+        return self._assemblies.pop(session_id, None) is not None
+
+
+def _copy_assembly(session: dict) -> dict:
+    return {**session, "completed": list(session["completed"])}
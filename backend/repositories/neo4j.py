@@ -0,0 +1,545 @@
+"""Repositorio sobre Neo4j: las consultas Cypher que antes vivían en los routers y el solver."""
+import time
+from typing import Optional
+
+from services.neo4j import READ_ACCESS, get_async_session, read, read_one, write, write_one, write_transaction
+from services.metrics import timed
+from repositories.base import DELETE_BATCH_SIZE, PUZZLE_FIELDS, PuzzleRepository
+from core.geometric import is_edges_puzzle
+from core.pieces import PieceColumns
+
+BULK_CREATE_QUERY = """
+MATCH (p:Puzzle {puzzleId: $puzzle_id})
+SET p.version = coalesce(p.version, 0) + 1
+WITH p
+UNWIND $pieces AS pc
+CREATE (piece:Piece {
+  pieceId:          randomUUID(),
+  puzzleId:         p.puzzleId,
+  sequenceNumber:   pc.sequenceNumber,
+  pieceOrientation: pc.pieceOrientation,
+  group:            pc.group,
+  status:           pc.status,
+  edges:            pc.edges
+})
+MERGE (p)-[:HAS_PIECE]->(piece)
+RETURN piece {.*, puzzleId: p.puzzleId} AS piece
+"""
+
+# Sólo los campos que usa el solver (core/pieces.py), una lista por pieza
+PIECE_COLUMNS_QUERY = """
+MATCH (p:Puzzle {puzzleId: $puzzle_id})
+OPTIONAL MATCH (p)-[:HAS_PIECE]->(piece)
+WITH p, collect(piece) AS pieces
+RETURN p, [x IN pieces | [x.sequenceNumber, x.group, x.status, x.pieceOrientation]] AS rows
+"""
+
+# Los puzzles por bordes traen los nodos completos; el resto, sólo las columnas del solver
+SOLVER_PIECES_QUERY = """
+MATCH (p:Puzzle {puzzleId: $puzzle_id})
+OPTIONAL MATCH (p)-[:HAS_PIECE]->(piece)
+WITH p, collect(piece) AS pieces, p.solverMode = 'edges' AS edges
+RETURN p,
+       CASE WHEN edges THEN pieces ELSE [] END AS nodes,
+       CASE WHEN edges THEN [] ELSE [x IN pieces | [x.sequenceNumber, x.group, x.status, x.pieceOrientation]] END AS rows
+"""
+
+PIECE_COUNTS_QUERY = """
+MATCH (p:Puzzle {puzzleId: $puzzle_id})
+OPTIONAL MATCH (p)-[:HAS_PIECE]->(piece)
+WITH p, piece.group AS group, count(piece) AS n,
+     sum(CASE WHEN piece.status = 'present' THEN 1 ELSE 0 END) AS present
+ORDER BY group
+RETURN p, collect({group: group, n: n, present: present}) AS groups
+"""
+
+ORDERED_PIECES_QUERY = """
+MATCH (p:Puzzle {puzzleId: $puzzle_id})-[:HAS_PIECE]->(piece)
+RETURN piece {.sequenceNumber, .pieceOrientation, .group, .status} AS piece
+ORDER BY %s
+"""
+
+
+def _where(var: str, filters: dict) -> tuple:
+    """
+    Condiciones `var.prop = $f_prop` para los filtros y sus parámetros.
+    Los nombres de propiedad vienen de las listas blancas de repositories.base.
+    """
+    filters = filters or {}
+    return [f"{var}.{k} = $f_{k}" for k in filters], {f"f_{k}": v for k, v in filters.items()}
+
+
+def _projection(var: str, fields: list) -> str:
+    """Proyección de mapa con los campos pedidos; puzzleId siempre se toma del puzzle."""
+    items = ["puzzleId: p.puzzleId" if f == "puzzleId" else f".{f}" for f in fields]
+    return f"{var} {{{', '.join(items)}}}"
+
+
+# Piezas de cada selector de una operación masiva; sólo uno de pieceId / sequenceNumber
+# viene informado, y la igualdad con null no coincide, así que uno de los dos OPTIONAL MATCH
+# queda vacío. Ambos se resuelven con índices (unicidad de pieceId y puzzleId + sequenceNumber).
+_BULK_MATCH = """
+MATCH (p:Puzzle {puzzleId: $puzzle_id})
+SET p.version = coalesce(p.version, 0) + 1
+WITH p
+UNWIND range(0, size($items) - 1) AS i
+WITH p, i, $items[i] AS item
+OPTIONAL MATCH (p)-[:HAS_PIECE]->(byId:Piece {pieceId: item.pieceId})
+OPTIONAL MATCH (p)-[:HAS_PIECE]->(bySeq:Piece {puzzleId: p.puzzleId, sequenceNumber: item.sequenceNumber})
+WITH p, i, item, collect(DISTINCT byId) + collect(DISTINCT bySeq) AS pieces
+"""
+
+BULK_UPDATE_QUERY = _BULK_MATCH + """
+FOREACH (piece IN pieces | SET piece += item.fields)
+RETURN i, [piece IN pieces | piece {.*, puzzleId: p.puzzleId}] AS pieces, p.version AS version
+ORDER BY i
+"""
+
+# Se cuentan todas las coincidencias antes de borrar: una pieza puede aparecer en dos selectores
+BULK_DELETE_QUERY = _BULK_MATCH + """
+WITH p, i, pieces ORDER BY i
+WITH p, collect(pieces) AS matched
+FOREACH (piece IN reduce(acc = [], ps IN matched | acc + [x IN ps WHERE NOT x IN acc]) | DETACH DELETE piece)
+RETURN [ps IN matched | size(ps)] AS deleted, p.version AS version
+"""
+
+
+# Las piezas se buscan por el índice (puzzleId, sequenceNumber), no por la relación:
+# el puzzle ya se eliminó cuando se borran por lotes. El índice compuesto sólo se usa con un
+# predicado sobre las dos propiedades; una pieza sin sequenceNumber (no las crea la API)
+# queda huérfana y la elimina la purga.
+DELETE_PIECES_BATCH_QUERY = """
+MATCH (piece:Piece {puzzleId: $puzzle_id})
+WHERE piece.sequenceNumber IS NOT NULL
+WITH piece LIMIT $batch_size
+DETACH DELETE piece
+RETURN count(*) AS deleted
+"""
+
+ORPHAN_PIECES_MATCH = """
+MATCH (piece:Piece)
+WHERE NOT EXISTS { (:Puzzle)-[:HAS_PIECE]->(piece) }
+"""
+
+# Disposición resuelta: (pieza)-[:PLACED_AT {row, col, orientation}]->(puzzle) y
+# (pieza)-[:ADJACENT_TO {side}]->(pieza); las piezas se buscan por la unicidad de pieceId.
+# La escritura sólo procede si la versión del puzzle no cambió desde que se resolvió.
+LAYOUT_CLEAR_QUERY = """
+MATCH (p:Puzzle {puzzleId: $puzzle_id})
+WHERE $version IS NULL OR coalesce(p.version, 0) = $version
+OPTIONAL MATCH (p)-[:HAS_PIECE]->(:Piece)-[r:PLACED_AT|ADJACENT_TO]->()
+DELETE r
+WITH DISTINCT p
+SET p.layoutVersion = $version
+RETURN p.puzzleId AS puzzleId
+"""
+
+LAYOUT_PLACE_QUERY = """
+UNWIND $placements AS pl
+MATCH (p:Puzzle {puzzleId: $puzzle_id})
+MATCH (piece:Piece {pieceId: pl.pieceId})
+CREATE (piece)-[:PLACED_AT {row: pl.row, col: pl.col, orientation: pl.orientation}]->(p)
+"""
+
+LAYOUT_ADJACENT_QUERY = """
+UNWIND $adjacent AS adj
+MATCH (a:Piece {pieceId: adj.a})
+MATCH (b:Piece {pieceId: adj.b})
+CREATE (a)-[:ADJACENT_TO {side: adj.side}]->(b)
+"""
+
+LAYOUT_QUERY = """
+MATCH (p:Puzzle {puzzleId: $puzzle_id})
+OPTIONAL MATCH (piece:Piece)-[at:PLACED_AT]->(p)
+WITH p, piece, at ORDER BY at.row, at.col
+RETURN coalesce(p.version, 0) AS version, p.layoutVersion AS layoutVersion,
+       collect(at {.row, .col, .orientation, pieceId: piece.pieceId,
+                   sequenceNumber: piece.sequenceNumber, group: piece.group}) AS placements
+"""
+
+# Un solo salto desde la pieza: las relaciones se recorren en ambos sentidos y el lado
+# se invierte cuando la pieza es el destino
+NEIGHBORS_QUERY = """
+MATCH (p:Puzzle {puzzleId: $puzzle_id})-[:HAS_PIECE]->(piece:Piece {pieceId: $piece_id})
+OPTIONAL MATCH (piece)-[at:PLACED_AT]->(p)
+OPTIONAL MATCH (piece)-[r:ADJACENT_TO]-(other:Piece)-[oat:PLACED_AT]->(p)
+RETURN coalesce(p.version, 0) AS version, p.layoutVersion AS layoutVersion,
+       piece.sequenceNumber AS sequenceNumber, at {.row, .col, .orientation} AS placement,
+       collect(oat {.row, .col, .orientation, pieceId: other.pieceId, sequenceNumber: other.sequenceNumber,
+                    side: CASE WHEN startNode(r) = piece THEN r.side ELSE $opposite[r.side] END}) AS neighbors
+"""
+OPPOSITE_SIDE = {"top": "bottom", "right": "left", "bottom": "top", "left": "right"}
+
+# Sesiones de armado: (:AssemblySession)-[:ASSEMBLES]->(:Puzzle); sin el puzzle no se encuentran
+ASSEMBLY_CREATE_QUERY = """
+MATCH (p:Puzzle {puzzleId: $puzzle_id})
+CREATE (s:AssemblySession {
+    sessionId: $session_id, puzzleId: $puzzle_id, completed: [], cursor: 0, createdAt: $now, updatedAt: $now
+})-[:ASSEMBLES]->(p)
+RETURN s
+"""
+
+ASSEMBLY_QUERY = """
+MATCH (s:AssemblySession {sessionId: $session_id})-[:ASSEMBLES]->(:Puzzle)
+RETURN s
+"""
+
+ASSEMBLY_LIST_QUERY = """
+MATCH (p:Puzzle {puzzleId: $puzzle_id})
+OPTIONAL MATCH (s:AssemblySession)-[:ASSEMBLES]->(p)
+WITH p, s ORDER BY s.createdAt
+RETURN collect(s) AS sessions
+"""
+
+ASSEMBLY_UPDATE_QUERY = """
+MATCH (s:AssemblySession {sessionId: $session_id})-[:ASSEMBLES]->(:Puzzle)
+SET s.completed = [k IN s.completed WHERE NOT k IN $reopen AND NOT k IN $complete] + $complete,
+    s.cursor = coalesce($cursor, s.cursor),
+    s.updatedAt = $now
+RETURN s
+"""
+
+
+async def _create_batch(tx, puzzle_id: str, batch: list) -> list:
+    """Función de transacción: crea un lote de piezas con un solo UNWIND."""
+    result = await tx.run(BULK_CREATE_QUERY, {"puzzle_id": puzzle_id, "pieces": batch})
+    return [rec["piece"] async for rec in result]
+
+
+async def _save_layout(tx, puzzle_id: str, version, placements: list, adjacent: list) -> bool:
+    """Función de transacción: borra la disposición anterior y crea la nueva con dos UNWIND."""
+    params = {"puzzle_id": puzzle_id, "version": version}
+    result = await tx.run(LAYOUT_CLEAR_QUERY, params)
+    if await result.single() is None:
+        return False
+    result = await tx.run(LAYOUT_PLACE_QUERY, {**params, "placements": placements})
+    await result.consume()
+    result = await tx.run(LAYOUT_ADJACENT_QUERY, {**params, "adjacent": adjacent})
+    await result.consume()
+    return True
+
+
+class Neo4jRepository(PuzzleRepository):
+
+    async def create_puzzle(self, puzzle_id: str, data: dict) -> dict:
+        rec = await write_one(
+            """
+            CREATE (p:Puzzle {
+              puzzleId:            $puzzleId,
+              puzzleTypeIsRegular: $puzzleTypeIsRegular,
+              puzzleTheme:         $puzzleTheme,
+              puzzleBrand:         $puzzleBrand,
+              puzzlePieceQty:      $puzzlePieceQty,
+              puzzleMaterial:      $puzzleMaterial,
+              row_size:            $row_size,
+              solverMode:          $solverMode,
+              version:             0
+            })
+            RETURN p {.*, puzzleId: p.puzzleId} AS p
+            """,
+            {**data, "puzzleId": puzzle_id}
+        )
+        return rec["p"] if rec else None
+
+    async def get_puzzle(self, puzzle_id: str) -> Optional[dict]:
+        rec = await read_one(
+            """
+            MATCH (p:Puzzle {puzzleId: $puzzleId})
+            RETURN p {.*, puzzleId: p.puzzleId} AS p
+            """,
+            {"puzzleId": puzzle_id}
+        )
+        return rec["p"] if rec else None
+
+    async def list_puzzles(self, filters: dict = None, fields: list = None,
+                           after: list = None, limit: int = None) -> list:
+        conditions, params = _where("p", filters)
+        conditions.insert(0, "p.puzzleId IS NOT NULL")
+        if after is not None:
+            conditions.append("p.puzzleId > $after")
+            params["after"] = after[0]
+        records = await read(
+            f"""
+            MATCH (p:Puzzle)
+            WHERE {" AND ".join(conditions)}
+            RETURN {_projection("p", fields or PUZZLE_FIELDS)} AS p
+            ORDER BY p.puzzleId
+            {"LIMIT $limit" if limit is not None else ""}
+            """,
+            {**params, "limit": limit}
+        )
+        return [rec["p"] for rec in records]
+
+    async def count_puzzles(self, filters: dict = None) -> int:
+        conditions, params = _where("p", filters)
+        conditions.insert(0, "p.puzzleId IS NOT NULL")
+        rec = await read_one(
+            f"""
+            MATCH (p:Puzzle)
+            WHERE {" AND ".join(conditions)}
+            RETURN count(p) AS n
+            """,
+            params
+        )
+        return rec["n"]
+
+    async def update_puzzle(self, puzzle_id: str, fields: dict) -> Optional[dict]:
+        # Construye dinámicamente el SET
+        set_str = ", ".join(f"p.{k} = ${k}" for k in fields)
+        # Toda escritura incrementa la versión del puzzle (invalida soluciones cacheadas)
+        set_str += ", p.version = coalesce(p.version, 0) + 1"
+        rec = await write_one(
+            f"""
+            MATCH (p:Puzzle {{puzzleId: $puzzleId}})
+            SET {set_str}
+            RETURN p {{.*, puzzleId: p.puzzleId}} AS p
+            """,
+            {"puzzleId": puzzle_id, **fields}
+        )
+        return rec["p"] if rec else None
+
+    async def delete_puzzle_node(self, puzzle_id: str) -> bool:
+        rec = await write_one(
+            """
+            MATCH (p:Puzzle {puzzleId: $puzzleId})
+            OPTIONAL MATCH (s:AssemblySession)-[:ASSEMBLES]->(p)
+            DETACH DELETE s, p
+            RETURN count(DISTINCT p) AS deleted
+            """,
+            {"puzzleId": puzzle_id}
+        )
+        return bool(rec and rec["deleted"])
+
+    async def delete_puzzle_pieces(self, puzzle_id: str, batch_size: int = None) -> int:
+        rec = await write_one(
+            DELETE_PIECES_BATCH_QUERY, {"puzzle_id": puzzle_id, "batch_size": batch_size or DELETE_BATCH_SIZE}
+        )
+        return rec["deleted"]
+
+    async def get_puzzle_version(self, puzzle_id: str) -> Optional[int]:
+        rec = await read_one(
+            """
+            MATCH (p:Puzzle {puzzleId: $puzzle_id})
+            RETURN coalesce(p.version, 0) AS version
+            """,
+            {"puzzle_id": puzzle_id}
+        )
+        return rec["version"] if rec else None
+
+    async def create_pieces(self, puzzle_id: str, pieces: list) -> list:
+        # Transacción administrada: si falla por un error transitorio se reintenta el lote completo
+        return await write_transaction(_create_batch, puzzle_id, pieces)
+
+    async def list_pieces(self, puzzle_id: str, filters: dict = None, fields: list = None,
+                          after: list = None, limit: int = None) -> list:
+        conditions, params = _where("piece", filters)
+        if after is not None:
+            # Paginación por clave: sin SKIP, la página empieza en la posición del índice
+            conditions.append(
+                "(piece.sequenceNumber > $after_seq"
+                " OR (piece.sequenceNumber = $after_seq AND piece.pieceId > $after_id))"
+            )
+            params.update(after_seq=after[0], after_id=after[1])
+        projection = _projection("piece", fields) if fields else "piece {.*, puzzleId: p.puzzleId}"
+        records = await read(
+            f"""
+            MATCH (p:Puzzle {{puzzleId: $puzzle_id}})
+                  -[:HAS_PIECE]->(piece:Piece)
+            {"WHERE " + " AND ".join(conditions) if conditions else ""}
+            RETURN {projection} AS piece
+            ORDER BY piece.sequenceNumber, piece.pieceId
+            {"LIMIT $limit" if limit is not None else ""}
+            """,
+            {**params, "puzzle_id": puzzle_id, "limit": limit}
+        )
+        return [rec["piece"] for rec in records]
+
+    async def count_pieces(self, puzzle_id: str, filters: dict = None) -> int:
+        conditions, params = _where("piece", filters)
+        rec = await read_one(
+            f"""
+            MATCH (p:Puzzle {{puzzleId: $puzzle_id}})
+                  -[:HAS_PIECE]->(piece:Piece)
+            {"WHERE " + " AND ".join(conditions) if conditions else ""}
+            RETURN count(piece) AS n
+            """,
+            {**params, "puzzle_id": puzzle_id}
+        )
+        return rec["n"] if rec else 0
+
+    async def get_piece(self, puzzle_id: str, piece_id: str) -> Optional[dict]:
+        rec = await read_one(
+            """
+            MATCH (p:Puzzle {puzzleId: $puzzle_id})
+                  -[:HAS_PIECE]->(piece:Piece {pieceId: $piece_id})
+            RETURN piece {.*, puzzleId: p.puzzleId} AS piece
+            """,
+            {"puzzle_id": puzzle_id, "piece_id": piece_id}
+        )
+        return rec["piece"] if rec else None
+
+    async def update_piece(self, puzzle_id: str, piece_id: str, fields: dict):
+        rec = await write_one(
+            """
+            MATCH (p:Puzzle {puzzleId: $puzzle_id})
+                  -[:HAS_PIECE]->(piece:Piece {pieceId: $piece_id})
+            SET piece += $fields,
+                p.version = coalesce(p.version, 0) + 1
+            RETURN piece {.*, puzzleId: p.puzzleId} AS piece, p.version AS version
+            """,
+            {"puzzle_id": puzzle_id, "piece_id": piece_id, "fields": fields}
+        )
+        return (rec["piece"], rec["version"]) if rec else None
+
+    async def delete_piece(self, puzzle_id: str, piece_id: str) -> bool:
+        rec = await write_one(
+            """
+            MATCH (p:Puzzle {puzzleId: $puzzle_id})
+                  -[:HAS_PIECE]->(piece:Piece {pieceId: $piece_id})
+            SET p.version = coalesce(p.version, 0) + 1
+            DETACH DELETE piece
+            RETURN COUNT(piece) AS deleted
+            """,
+            {"puzzle_id": puzzle_id, "piece_id": piece_id}
+        )
+        return bool(rec and rec["deleted"])
+
+    async def update_pieces(self, puzzle_id: str, updates: list):
+        records = await write(BULK_UPDATE_QUERY, {"puzzle_id": puzzle_id, "items": updates})
+        if not records:
+            return None
+        return [rec["pieces"] for rec in records], records[0]["version"]
+
+    async def delete_pieces(self, puzzle_id: str, targets: list):
+        rec = await write_one(BULK_DELETE_QUERY, {"puzzle_id": puzzle_id, "items": targets})
+        return (rec["deleted"], rec["version"]) if rec else None
+
+    async def count_orphan_pieces(self) -> int:
+        rec = await read_one(ORPHAN_PIECES_MATCH + "RETURN count(piece) AS n")
+        return rec["n"]
+
+    async def purge_orphan_pieces(self, batch_size: int = None) -> int:
+        rec = await write_one(
+            ORPHAN_PIECES_MATCH + """
+            WITH piece LIMIT $batch_size
+            DETACH DELETE piece
+            RETURN count(*) AS deleted
+            """,
+            {"batch_size": batch_size or DELETE_BATCH_SIZE}
+        )
+        return rec["deleted"]
+
+    async def get_puzzle_and_pieces(self, puzzle_id: str):
+        rec = await read_one(
+            """
+            MATCH (p:Puzzle {puzzleId: $puzzle_id})
+            OPTIONAL MATCH (p)-[:HAS_PIECE]->(piece)
+            RETURN p, collect(piece) AS pieces
+            """,
+            {"puzzle_id": puzzle_id}
+        )
+        if not rec:
+            return None, []
+        with timed("convert"):
+            return dict(rec["p"]), [dict(node) for node in rec["pieces"]]
+
+    async def get_puzzle_and_piece_columns(self, puzzle_id: str):
+        rec = await read_one(PIECE_COLUMNS_QUERY, {"puzzle_id": puzzle_id})
+        if not rec:
+            return None, PieceColumns()
+        with timed("convert"):
+            return dict(rec["p"]), PieceColumns.from_rows(rec["rows"])
+
+    async def get_puzzle_and_solver_pieces(self, puzzle_id: str):
+        rec = await read_one(SOLVER_PIECES_QUERY, {"puzzle_id": puzzle_id})
+        if not rec:
+            return None, PieceColumns()
+        with timed("convert"):
+            puzzle = dict(rec["p"])
+            if is_edges_puzzle(puzzle):
+                return puzzle, [dict(node) for node in rec["nodes"]]
+            return puzzle, PieceColumns.from_rows(rec["rows"])
+
+    async def get_many_puzzles_and_pieces(self, puzzle_ids: list) -> dict:
+        records = await read(
+            """
+            UNWIND $puzzle_ids AS puzzle_id
+            MATCH (p:Puzzle {puzzleId: puzzle_id})
+            OPTIONAL MATCH (p)-[:HAS_PIECE]->(piece)
+            RETURN puzzle_id, p, collect(piece) AS pieces
+            """,
+            {"puzzle_ids": list(puzzle_ids)}
+        )
+        with timed("convert"):
+            return {
+                rec["puzzle_id"]: (dict(rec["p"]), [dict(node) for node in rec["pieces"]])
+                for rec in records
+            }
+
+    async def get_piece_counts(self, puzzle_id: str):
+        # Agregación en la base: no se transfieren las piezas
+        rec = await read_one(PIECE_COUNTS_QUERY, {"puzzle_id": puzzle_id})
+        if not rec:
+            return None
+        return dict(rec["p"]), [g for g in rec["groups"] if g["n"]]
+
+    async def iter_ordered_pieces(self, puzzle_id: str, by_group: bool):
+        # El cursor no puede reintentarse a mitad de la respuesta, así que se usa una sesión
+        # de lectura (enrutada a seguidores) en lugar de una transacción administrada.
+        order = "piece.group, piece.sequenceNumber" if by_group else "piece.sequenceNumber"
+        async with get_async_session(READ_ACCESS) as session:
+            result = await session.run(ORDERED_PIECES_QUERY % order, puzzle_id=puzzle_id)
+            async for rec in result:
+                yield rec["piece"]
+
+    async def get_layout(self, puzzle_id: str) -> Optional[dict]:
+        rec = await read_one(LAYOUT_QUERY, {"puzzle_id": puzzle_id})
+        return dict(rec) if rec else None
+
+    async def save_layout(self, puzzle_id: str, version: int, placements: list, adjacent: list) -> bool:
+        return await write_transaction(_save_layout, puzzle_id, version, placements, adjacent)
+
+    async def delete_layout(self, puzzle_id: str) -> bool:
+        # Sin versión: se borran las relaciones y layoutVersion queda en null
+        return await write_transaction(_save_layout, puzzle_id, None, [], [])
+
+    async def get_neighbors(self, puzzle_id: str, piece_id: str) -> Optional[dict]:
+        rec = await read_one(
+            NEIGHBORS_QUERY, {"puzzle_id": puzzle_id, "piece_id": piece_id, "opposite": OPPOSITE_SIDE}
+        )
+        return dict(rec) if rec else None
+
+    # --- Sesiones de armado ---
+
+    async def create_assembly(self, puzzle_id: str, session_id: str) -> Optional[dict]:
+        rec = await write_one(
+            ASSEMBLY_CREATE_QUERY, {"puzzle_id": puzzle_id, "session_id": session_id, "now": time.time()}
+        )
+        return dict(rec["s"]) if rec else None
+
+    async def get_assembly(self, session_id: str) -> Optional[dict]:
+        rec = await read_one(ASSEMBLY_QUERY, {"session_id": session_id})
+        return dict(rec["s"]) if rec else None
+
+    async def list_assemblies(self, puzzle_id: str) -> Optional[list]:
+        rec = await read_one(ASSEMBLY_LIST_QUERY, {"puzzle_id": puzzle_id})
+        return [dict(node) for node in rec["sessions"]] if rec else None
+
+    async def update_assembly(self, session_id: str, complete: list, reopen: list,
+                              cursor: Optional[int]) -> Optional[dict]:
+        rec = await write_one(ASSEMBLY_UPDATE_QUERY, {
+            "session_id": session_id, "complete": complete, "reopen": reopen,
+            "cursor": cursor, "now": time.time(),
+        })
+        return dict(rec["s"]) if rec else None
+
+    async def delete_assembly(self, session_id: str) -> bool:
+        rec = await write_one(
+            """
+            MATCH (s:AssemblySession {sessionId: $session_id})
+            DETACH DELETE s
+            RETURN count(s) AS deleted
+            """,
+            {"session_id": session_id}
+        )
+        return rec["deleted"] > 0
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, HTTPException, Path, Query, Response
+from typing import Optional
+from core import maintenance
+from core.jobs import get_job_manager
+from repositories import get_repository
+from services.metrics import TimedRoute
+
+router = APIRouter(prefix="/admin", tags=["admin"], route_class=TimedRoute)
+
+
+def _job_view(job) -> dict:
+    # El resultado de una tarea de mantenimiento es un resumen breve: va con el estado
+    return {**job.snapshot(), "result": job.result}
+
+
+def _job_or_404(job_id: str):
+    job = get_job_manager().get(job_id)
+    if job is None or job.kind == "solve":
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado.")
+    return job
+
+
+@router.get("/orphans")
+async def count_orphan_pieces():
+    """Cantidad de piezas que no pertenecen a ningún puzzle."""
+    return {"count": await get_repository().count_orphan_pieces()}
+
+
+@router.post("/orphans/purge", status_code=202)
+async def purge_orphan_pieces(
+    response: Response,
+    batch_size: Optional[int] = Query(None, ge=1, le=100_000, description="Piezas por lote (por defecto PIECES_DELETE_BATCH_SIZE)")
+):
+    """
+    Elimina las piezas huérfanas por lotes, una transacción por lote, en segundo plano.
+    Devuelve el trabajo (Location: /admin/jobs/{jobId}); si ya hay una purga en curso, esa.
+    """
+    job = maintenance.purge_orphans(batch_size)
+    response.headers["Location"] = f"{router.prefix}/jobs/{job.id}"
+    return _job_view(job)
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str = Path(..., description="Id del trabajo")):
+    """Estado de una tarea de mantenimiento, con su avance y, al terminar, el resumen."""
+    return _job_view(_job_or_404(job_id))
+
+
+@router.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str = Path(..., description="Id del trabajo")):
+    """Cancela la tarea después del lote en curso; lo que quede sin borrar lo elimina la purga."""
+    return _job_view(get_job_manager().cancel(_job_or_404(job_id).id))
@@ -0,0 +1,79 @@
+from fastapi import APIRouter, HTTPException, Path, Query, Response
+from typing import Optional
+from core import assembly
+from core.steps import UnsolvablePuzzle
+from models.assembly import AssemblyUpdate
+from services.metrics import TimedRoute
+
+router = APIRouter(prefix="/solver", tags=["Assembly"], route_class=TimedRoute)
+
+
+async def _call(coro):
+    """
+    Traduce los errores esperados del armado: ValueError -> 404; InvalidProgress y
+    UnsolvablePuzzle -> 400. Cualquier otro error (base de datos, solver) queda como 500.
+    """
+    try:
+        return await coro
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (assembly.InvalidProgress, UnsolvablePuzzle) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/{puzzle_id}/sessions", status_code=201)
+async def create_session(
+    response: Response,
+    puzzle_id: str = Path(..., description="UUID del puzzle")
+):
+    """
+    Crea una sesión de armado del puzzle (Location: /solver/sessions/{sessionId}), con el resumen
+    de la solución y el avance, sin los pasos: se piden por partes con /next.
+    """
+    session = await _call(assembly.create_session(puzzle_id))
+    response.headers["Location"] = f"{router.prefix}/sessions/{session['sessionId']}"
+    return session
+
+
+@router.get("/{puzzle_id}/sessions")
+async def list_sessions(puzzle_id: str = Path(..., description="UUID del puzzle")):
+    """Sesiones de armado del puzzle, por fecha de creación."""
+    return await _call(assembly.list_sessions(puzzle_id))
+
+
+@router.get("/sessions/{session_id}")
+async def get_session(session_id: str = Path(..., description="Id de la sesión")):
+    """Bloques terminados, cursor y avance de la sesión, con el resumen de la solución."""
+    return await _call(assembly.get_session(session_id))
+
+
+@router.patch("/sessions/{session_id}")
+async def update_session(
+    payload: AssemblyUpdate,
+    session_id: str = Path(..., description="Id de la sesión")
+):
+    """
+    Marca filas (regular) o grupos (irregular) como terminados o pendientes y mueve el cursor,
+    en una sola escritura. Un bloque que no existe en la solución responde 400.
+    """
+    return await _call(assembly.update_session(session_id, payload.complete, payload.reopen, payload.cursor))
+
+
+@router.get("/sessions/{session_id}/next")
+async def next_steps(
+    session_id: str = Path(..., description="Id de la sesión"),
+    limit: int = Query(assembly.NEXT_LIMIT, ge=1, le=assembly.MAX_NEXT_LIMIT, description="Pasos a devolver"),
+    after: Optional[int] = Query(None, ge=0, description="Posición desde la que leer (por defecto, el cursor de la sesión)"),
+    text: bool = Query(True, description="Incluir las instrucciones en texto")
+):
+    """
+    Los próximos pasos sin terminar: se saltean las filas o grupos marcados y sólo se devuelven
+    `limit` pasos, en columnas (con su posición). nextCursor es el `after` de la lectura siguiente
+    (null si no quedan pasos pendientes).
+    """
+    return await _call(assembly.next_steps(session_id, limit, after, text))
+
+
+@router.delete("/sessions/{session_id}", status_code=204)
+async def delete_session(session_id: str = Path(..., description="Id de la sesión")):
+    await _call(assembly.delete_session(session_id))
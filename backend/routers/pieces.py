@@ -1,98 +1,309 @@
-from fastapi import APIRouter, HTTPException, Path
+import os
+import json
+import time
+import logging
+from fastapi import APIRouter, HTTPException, Path, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from uuid import UUID
-from typing import List
-from models.piece import PieceCreate, PieceRead, PieceUpdate
-from services.neo4j import get_session
+from typing import List, Optional
+from models.piece import (
+    PieceBulkDelete, PieceBulkResult, PieceBulkUpdate, PieceCreate, PieceRead, PieceUpdate
+)
+from repositories import get_repository
+from repositories.base import PIECE_FIELDS
+from core.pagination import decode_cursor, page, parse_fields
+from core.importer import iter_lines, iter_piece_rows
+from core.singleflight import SingleFlight
+from core.solver import invalidate_solutions, apply_piece_update
+from services.metrics import TimedRoute, count_pieces
+from services.http_cache import make_etag, not_modified, set_etag
 
-router = APIRouter(prefix="/puzzle/{puzzle_id}/pieces", tags=["Pieces"])
+router = APIRouter(prefix="/puzzle/{puzzle_id}/pieces", tags=["Pieces"], route_class=TimedRoute)
+
+
+# Tamaño máximo de cada lote enviado a Neo4j en la carga masiva
+BULK_BATCH_SIZE = int(os.getenv("PIECES_BULK_BATCH_SIZE", "1000"))
+
+piece_lists = SingleFlight("list_pieces")
+
+
+async def create_pieces_in_batches(puzzle_id: str, pieces: list, batch_size: int = None):
+    """
+    Inserta las piezas (diccionarios) en lotes, cada uno en su propia transacción.
+    Devuelve la lista de piezas creadas y la duración en milisegundos de cada lote.
+    """
+    batch_size = batch_size or BULK_BATCH_SIZE
+    created, timings = [], []
+    for start in range(0, len(pieces), batch_size):
+        batch = pieces[start:start + batch_size]
+        t0 = time.perf_counter()
+        created.extend(await get_repository().create_pieces(puzzle_id, batch))
+        count_pieces(len(batch))
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        timings.append(elapsed_ms)
+        logging.info(
+            f"Lote {len(timings)} de piezas para {puzzle_id}: {len(batch)} piezas en {elapsed_ms:.1f} ms"
+        )
+    return created, timings
 
 
 @router.post("/bulk", response_model=List[PieceRead])
-def create_pieces_bulk(
+async def create_pieces_bulk(
     puzzle_id: UUID,
-    pieces: List[PieceCreate]
+    pieces: List[PieceCreate],
+    response: Response,
+    batch_size: Optional[int] = Query(None, ge=1, description="Piezas por lote (por defecto PIECES_BULK_BATCH_SIZE)")
 ):
     """
     Crea varias piezas en un solo request.
     - Verifica que el Puzzle exista.
-    - Crea nodos Piece, relaciones y retorna las piezas creadas.
+    - Envía las piezas al repositorio en lotes (UNWIND en Neo4j), un lote por transacción.
+    - Reporta la duración de cada lote en el header Server-Timing.
     """
-    created = []
-    with get_session() as session:
-        # 1) validar que exista el puzzle
-        if not session.run(
-            "MATCH (p:Puzzle {puzzleId:$id}) RETURN p",
-            {"id": str(puzzle_id)}
-        ).single():
-            raise HTTPException(status_code=404, detail="Puzzle no encontrado")
-
-        # 2) crear cada pieza y relacionarla
-        for pc in pieces:
-            rec = session.run(
-                """
-                MATCH (p:Puzzle {puzzleId: $puzzle_id})
-                CREATE (piece:Piece {
-                  pieceId:          randomUUID(),
-                  sequenceNumber:   $sequenceNumber,
-                  pieceOrientation: $pieceOrientation,
-                  group:            $group,
-                  status:           $status
-                })
-                MERGE (p)-[:HAS_PIECE]->(piece)
-                RETURN piece {.*, puzzleId: p.puzzleId} AS piece
-                """,
-                {**pc.model_dump(), "puzzle_id": str(puzzle_id)}
-            ).single()
-
-            created.append(PieceRead(**rec["piece"]))
-
-    return created
+    # 1) validar que exista el puzzle
+    if not await get_repository().puzzle_exists(str(puzzle_id)):
+        raise HTTPException(status_code=404, detail="Puzzle no encontrado")
 
+    # 2) crear las piezas por lotes y relacionarlas
+    created, timings = await create_pieces_in_batches(
+        str(puzzle_id),
+        [pc.model_dump() for pc in pieces],
+        batch_size
+    )
+    invalidate_solutions(str(puzzle_id))
 
-@router.get("/", response_model=List[PieceRead])
-def list_pieces(
-    puzzle_id: UUID = Path(..., description="UUID del puzzle")
+    response.headers["Server-Timing"] = ", ".join(
+        f"batch{i};dur={ms:.1f}" for i, ms in enumerate(timings, start=1)
+    )
+    return [PieceRead(**piece) for piece in created]
+
+
+def _selector(item) -> dict:
+    return {
+        "pieceId": str(item.pieceId) if item.pieceId else None,
+        "sequenceNumber": item.sequenceNumber,
+    }
+
+
+# Las rutas /bulk se declaran antes de /{piece_id} para que "bulk" no se tome como UUID
+@router.patch("/bulk", response_model=List[PieceBulkResult])
+async def update_pieces_bulk(
+    puzzle_id: UUID,
+    updates: List[PieceBulkUpdate]
 ):
-    """Devuelve todas las piezas de un Puzzle dado."""
-    with get_session() as session:
-        result = session.run(
-            """
-            MATCH (p:Puzzle {puzzleId: $puzzle_id})
-                  -[:HAS_PIECE]->(piece:Piece)
-            RETURN piece {.*, puzzleId: p.puzzleId} AS piece
-            """,
-            {"puzzle_id": str(puzzle_id)}
+    """
+    Actualiza varias piezas (por pieceId o sequenceNumber) en una sola transacción.
+    - Devuelve, para cada elemento, cuántas piezas coincidieron y cómo quedaron.
+    - Las soluciones derivadas se invalidan una sola vez.
+    """
+    if not updates:
+        raise HTTPException(status_code=400, detail="No se enviaron piezas para actualizar")
+    items = []
+    for i, update in enumerate(updates):
+        fields = update.model_dump(exclude_unset=True, exclude={"pieceId", "sequenceNumber"})
+        if not fields:
+            raise HTTPException(status_code=400, detail=f"Elemento {i}: no hay campos para actualizar")
+        items.append({**_selector(update), "fields": fields})
+
+    result = await get_repository().update_pieces(str(puzzle_id), items)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Puzzle no encontrado")
+    matched, _ = result
+    count_pieces(sum(len(pieces) for pieces in matched))
+    invalidate_solutions(str(puzzle_id))
+    return [
+        PieceBulkResult(
+            **_selector(update),
+            matched=len(pieces),
+            pieces=[PieceRead(**piece) for piece in pieces]
         )
-        return [PieceRead(**rec["piece"]) for rec in result]
+        for update, pieces in zip(updates, matched)
+    ]
+
+
+@router.delete("/bulk", response_model=List[PieceBulkResult])
+async def delete_pieces_bulk(
+    puzzle_id: UUID,
+    payload: PieceBulkDelete
+):
+    """
+    Elimina varias piezas (por pieceId y/o sequenceNumber) en una sola transacción.
+    Devuelve cuántas piezas eliminó cada selector e invalida las soluciones una sola vez.
+    """
+    targets = [{"pieceId": str(piece_id)} for piece_id in payload.pieceIds] + \
+              [{"sequenceNumber": seq} for seq in payload.sequenceNumbers]
+    if not targets:
+        raise HTTPException(status_code=400, detail="No se enviaron piezas para eliminar")
+
+    result = await get_repository().delete_pieces(str(puzzle_id), targets)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Puzzle no encontrado")
+    deleted, _ = result
+    count_pieces(sum(deleted))
+    invalidate_solutions(str(puzzle_id))
+    return [PieceBulkResult(**target, matched=n) for target, n in zip(targets, deleted)]
+
+
+class _BodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse que no escucha desconexiones mientras responde:
+    el generador sigue leyendo el cuerpo del request y no debe competir por `receive`.
+    """
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+@router.post("/import")
+async def import_pieces(
+    request: Request,
+    puzzle_id: UUID = Path(..., description="UUID del puzzle"),
+    body_format: Optional[str] = Query(None, alias="format", pattern="^(ndjson|csv)$", description="Formato del cuerpo; por defecto según Content-Type"),
+    batch_size: Optional[int] = Query(None, ge=1, description="Piezas por lote (por defecto PIECES_BULK_BATCH_SIZE)")
+):
+    """
+    Importa piezas desde un cuerpo NDJSON o CSV leído de forma incremental.
+    - Cada fila se valida al leerla; las filas inválidas se reportan y se omiten.
+    - Las piezas se escriben en lotes acotados; no se lee más cuerpo hasta escribir el lote.
+    - Devuelve el progreso como NDJSON (una línea por lote, errores y resumen final).
+    """
+    fmt = body_format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    size = batch_size or BULK_BATCH_SIZE
+
+    if not await get_repository().puzzle_exists(str(puzzle_id)):
+        raise HTTPException(status_code=404, detail="Puzzle no encontrado")
+
+    async def progress():
+        rows = created = errors = batches = 0
+        batch = []
+
+        async def flush():
+            nonlocal created, batches
+            t0 = time.perf_counter()
+            done, _ = await create_pieces_in_batches(str(puzzle_id), batch, size)
+            created += len(done)
+            batches += 1
+            batch.clear()
+            return json.dumps({
+                "batch": batches,
+                "rows": rows,
+                "created": created,
+                "errors": errors,
+                "ms": round((time.perf_counter() - t0) * 1000, 1),
+            }) + "\n"
+
+        try:
+            async for line_no, piece, error in iter_piece_rows(iter_lines(request.stream()), fmt):
+                rows += 1
+                if error:
+                    errors += 1
+                    yield json.dumps({"line": line_no, "error": error}) + "\n"
+                    continue
+                batch.append(piece)
+                if len(batch) >= size:
+                    yield await flush()
+            if batch:
+                yield await flush()
+        except Exception as e:
+            # La respuesta ya empezó: el error va como última línea, con lo que ya quedó escrito
+            logging.exception(f"Importación de piezas para {puzzle_id} interrumpida")
+            yield json.dumps({
+                "done": False, "error": str(e), "rows": rows, "created": created, "errors": errors
+            }) + "\n"
+            return
+        finally:
+            # También si falla o el cliente se desconecta después de escribir algún lote
+            invalidate_solutions(str(puzzle_id))
+
+        yield json.dumps({"done": True, "rows": rows, "created": created, "errors": errors}) + "\n"
+
+    return _BodyStreamingResponse(progress(), media_type="application/x-ndjson")
+
+
+def _filters(status, group) -> dict:
+    return {k: v for k, v in {"status": status, "group": group}.items() if v is not None}
+
+
+# Declarada antes de /{piece_id} para que "count" no se tome como UUID
+@router.get("/count")
+async def count_puzzle_pieces(
+    puzzle_id: UUID = Path(..., description="UUID del puzzle"),
+    status:    Optional[str] = Query(None, description="Filtra por status ('present' | 'missing')"),
+    group:     Optional[int] = Query(None, description="Filtra por grupo")
+):
+    """Cuenta las piezas del puzzle que cumplen los filtros (sin cargarlas)."""
+    return {"count": await get_repository().count_pieces(str(puzzle_id), _filters(status, group))}
+
+
+@router.get("/", response_model=List[PieceRead])
+async def list_pieces(
+    request:   Request,
+    response:  Response,
+    puzzle_id: UUID = Path(..., description="UUID del puzzle"),
+    status:    Optional[str] = Query(None, description="Filtra por status ('present' | 'missing')"),
+    group:     Optional[int] = Query(None, description="Filtra por grupo"),
+    fields:    Optional[str] = Query(None, description="Campos a devolver separados por coma (sequenceNumber y pieceId siempre se incluyen)"),
+    limit:     Optional[int] = Query(None, ge=1, le=10_000, description="Tamaño de página (por defecto, todas)"),
+    cursor:    Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior")
+):
+    """
+    Devuelve las piezas de un Puzzle ordenadas por (sequenceNumber, pieceId).
+    - Los filtros se resuelven en la base de datos.
+    - Con `fields` sólo se devuelven esos campos (sin validar contra PieceRead).
+    - Con `limit` se pagina por clave: si hay más resultados, el header X-Next-Cursor
+      trae el cursor de la página siguiente.
+    - Con If-None-Match y la versión del puzzle sin cambios responde 304 sin leer las piezas.
+    """
+    try:
+        projection = parse_fields(fields, PIECE_FIELDS, ("sequenceNumber", "pieceId"))
+        after = decode_cursor(cursor, 2) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    version = await get_repository().get_puzzle_version(str(puzzle_id))
+    etag = make_etag(version, request) if version is not None else None
+    if etag:
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+
+    filters = _filters(status, group)
+    size = limit + 1 if limit else None  # una fila extra indica que hay otra página
+    # Los pedidos idénticos concurrentes (misma versión, filtros y página) comparten la consulta
+    key = (str(puzzle_id), version, tuple(sorted(filters.items())),
+           tuple(projection) if projection else None, tuple(after) if after else None, size)
+    pieces = await piece_lists.do(
+        key, get_repository().list_pieces, str(puzzle_id), filters, projection, after, size
+    )
+    pieces, next_cursor = page(pieces, limit, lambda p: [p["sequenceNumber"], p["pieceId"]])
+    count_pieces(len(pieces))
+
+    if projection:
+        response = JSONResponse(pieces)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if etag:
+        set_etag(response, etag)
+    return response if projection else [PieceRead(**piece) for piece in pieces]
 
 
 @router.get("/{piece_id}", response_model=PieceRead)
-def get_piece(
+async def get_piece(
     puzzle_id: UUID = Path(...),
     piece_id:  UUID = Path(..., description="UUID de la pieza")
 ):
     """Lee una pieza por su UUID."""
-    with get_session() as session:
-        rec = session.run(
-            """
-            MATCH (p:Puzzle {puzzleId: $puzzle_id})
-                  -[:HAS_PIECE]->(piece:Piece {pieceId: $piece_id})
-            RETURN piece {.*, puzzleId: p.puzzleId} AS piece
-            """,
-            {
-                "puzzle_id": str(puzzle_id),
-                "piece_id":  str(piece_id)
-            }
-        ).single()
+    piece = await get_repository().get_piece(str(puzzle_id), str(piece_id))
 
-        if not rec:
-            raise HTTPException(status_code=404, detail="Pieza no encontrada")
+    if not piece:
+        raise HTTPException(status_code=404, detail="Pieza no encontrada")
 
-        return PieceRead(**rec["piece"])
+    return PieceRead(**piece)
 
 
 @router.patch("/{piece_id}", response_model=PieceRead)
-def update_piece(
+async def update_piece(
     puzzle_id: UUID = Path(...),
     piece_id:  UUID = Path(...),
     payload:   PieceUpdate = ...
@@ -102,48 +313,25 @@ def update_piece(
     if not fields:
         raise HTTPException(status_code=400, detail="No hay campos para actualizar")
 
-    with get_session() as session:
-        rec = session.run(
-            """
-            MATCH (p:Puzzle {puzzleId: $puzzle_id})
-                  -[:HAS_PIECE]->(piece:Piece {pieceId: $piece_id})
-            SET piece += $fields
-            RETURN piece {.*, puzzleId: p.puzzleId} AS piece
-            """,
-            {
-                "puzzle_id": str(puzzle_id),
-                "piece_id":  str(piece_id),
-                "fields":    fields
-            }
-        ).single()
+    updated = await get_repository().update_piece(str(puzzle_id), str(piece_id), fields)
 
-        if not rec:
-            raise HTTPException(status_code=404, detail="Pieza no encontrada")
+    if not updated:
+        raise HTTPException(status_code=404, detail="Pieza no encontrada")
 
-        return PieceRead(**rec["piece"])
+    piece, version = updated
+    # Sólo se regeneran las instrucciones afectadas por esta pieza
+    apply_piece_update(str(puzzle_id), piece, version)
+    return PieceRead(**piece)
 
 
 @router.delete("/{piece_id}", status_code=204)
-def delete_piece(
+async def delete_piece(
     puzzle_id: UUID = Path(...),
     piece_id:  UUID = Path(...)
 ):
     """Elimina el nodo Piece y sus relaciones."""
-    with get_session() as session:
-        rec = session.run(
-            """
-            MATCH (p:Puzzle {puzzleId: $puzzle_id})
-                  -[:HAS_PIECE]->(piece:Piece {pieceId: $piece_id})
-            DETACH DELETE piece
-            RETURN COUNT(piece) AS deleted
-            """,
-            {
-                "puzzle_id": str(puzzle_id),
-                "piece_id":  str(piece_id)
-            }
-        ).single()
-
-        if not rec or rec["deleted"] == 0:
-            raise HTTPException(status_code=404, detail="Pieza no encontrada")
+    if not await get_repository().delete_piece(str(puzzle_id), str(piece_id)):
+        raise HTTPException(status_code=404, detail="Pieza no encontrada")
+    invalidate_solutions(str(puzzle_id))
     # status_code=204 implica body vacío
     return None
\ No newline at end of file
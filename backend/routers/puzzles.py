@@ -1,88 +1,121 @@
-from fastapi import APIRouter, HTTPException, Path
-from typing import List
+from fastapi import APIRouter, HTTPException, Path, Query, Request, Response
+from fastapi.responses import JSONResponse
+from typing import List, Optional
 from uuid import UUID, uuid4
 
 from models.puzzle import PuzzleCreate, PuzzleRead, PuzzleUpdate
-from services.neo4j import get_session
+from repositories import get_repository
+from repositories.base import PUZZLE_FIELDS
+from core.pagination import decode_cursor, page, parse_fields
+from core.solver import invalidate_solutions
+from services.metrics import TimedRoute, count_pieces
+from services.http_cache import make_etag, not_modified, set_etag
 
 router = APIRouter(
     prefix="/puzzles",
-    tags=["puzzles"]
+    tags=["puzzles"],
+    route_class=TimedRoute
 )
 
 @router.post("/", response_model=PuzzleRead)
-def create_puzzle(payload: PuzzleCreate):
+async def create_puzzle(payload: PuzzleCreate):
     """
     Crea un nuevo Puzzle.
     - Genera UUID
     - Inserta nodo con propiedades (sin column_size)
     """
     pid = str(uuid4())
-    with get_session() as session:
-        rec = session.run(
-            """
-            CREATE (p:Puzzle {
-              puzzleId:            $puzzleId,
-              puzzleTypeIsRegular: $puzzleTypeIsRegular,
-              puzzleTheme:         $puzzleTheme,
-              puzzleBrand:         $puzzleBrand,
-              puzzlePieceQty:      $puzzlePieceQty,
-              puzzleMaterial:      $puzzleMaterial,
-              row_size:            $row_size
-            })
-            RETURN p {.*, puzzleId: p.puzzleId} AS p
-            """,
-            {**payload.model_dump(), "puzzleId": pid}
-        ).single()
-
-        if not rec:
-            raise HTTPException(status_code=500, detail="No se pudo crear el puzzle")
-
-        return PuzzleRead(**rec["p"])
+    puzzle = await get_repository().create_puzzle(pid, payload.model_dump())
+
+    if not puzzle:
+        raise HTTPException(status_code=500, detail="No se pudo crear el puzzle")
+
+    return PuzzleRead(**puzzle)
+
+
+def _filters(theme, brand, material, regular) -> dict:
+    """Filtros de la query string como propiedades del nodo Puzzle."""
+    filters = {
+        "puzzleTheme": theme,
+        "puzzleBrand": brand,
+        "puzzleMaterial": material,
+        "puzzleTypeIsRegular": regular,
+    }
+    return {k: v for k, v in filters.items() if v is not None}
+
+
+# Declarada antes de /{puzzle_id} para que "count" no se tome como UUID
+@router.get("/count")
+async def count_puzzles(
+    theme:    Optional[str]  = Query(None, description="Filtra por puzzleTheme"),
+    brand:    Optional[str]  = Query(None, description="Filtra por puzzleBrand"),
+    material: Optional[str]  = Query(None, description="Filtra por puzzleMaterial"),
+    regular:  Optional[bool] = Query(None, description="Filtra por puzzleTypeIsRegular")
+):
+    """Cuenta los puzzles que cumplen los filtros (sin cargarlos)."""
+    return {"count": await get_repository().count_puzzles(_filters(theme, brand, material, regular))}
 
 
 @router.get("/{puzzle_id}", response_model=PuzzleRead)
-def get_puzzle(
+async def get_puzzle(
+    request:   Request,
+    response:  Response,
     puzzle_id: UUID = Path(..., description="UUID del puzzle")
 ):
-    """Recupera un Puzzle por su UUID."""
-    with get_session() as session:
-        rec = session.run(
-            """
-            MATCH (p:Puzzle {puzzleId: $puzzleId})
-            RETURN p {.*, puzzleId: p.puzzleId} AS p
-            """,
-            {"puzzleId": str(puzzle_id)}
-        ).single()
+    """Recupera un Puzzle por su UUID (admite If-None-Match)."""
+    puzzle = await get_repository().get_puzzle(str(puzzle_id))
 
-        if not rec:
-            raise HTTPException(status_code=404, detail="Puzzle no encontrado")
+    if not puzzle:
+        raise HTTPException(status_code=404, detail="Puzzle no encontrado")
 
-        return PuzzleRead(**rec["p"])
+    etag = make_etag(puzzle.get("version", 0), request)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_etag(response, etag)
+    return PuzzleRead(**puzzle)
 
 
 @router.get("/", response_model=List[PuzzleRead])
-def list_puzzles():
-    """Lista todos los puzzles con sus propiedades correctamente tipadas."""
-    with get_session() as session:
-        result = session.run(
-            """
-            MATCH (p:Puzzle)
-            WHERE p.puzzleId IS NOT NULL
-            RETURN
-              p.puzzleId            AS puzzleId,
-              p.puzzleTypeIsRegular AS puzzleTypeIsRegular,
-              p.puzzleTheme         AS puzzleTheme,
-              p.puzzleBrand         AS puzzleBrand,
-              p.puzzlePieceQty      AS puzzlePieceQty,
-              p.puzzleMaterial      AS puzzleMaterial,
-              p.row_size            AS row_size
-            """
-        )
-        return [PuzzleRead(**record) for record in result]
+async def list_puzzles(
+    response: Response,
+    theme:    Optional[str]  = Query(None, description="Filtra por puzzleTheme"),
+    brand:    Optional[str]  = Query(None, description="Filtra por puzzleBrand"),
+    material: Optional[str]  = Query(None, description="Filtra por puzzleMaterial"),
+    regular:  Optional[bool] = Query(None, description="Filtra por puzzleTypeIsRegular"),
+    fields:   Optional[str]  = Query(None, description="Campos a devolver separados por coma (puzzleId siempre se incluye)"),
+    limit:    Optional[int]  = Query(None, ge=1, le=10_000, description="Tamaño de página (por defecto, todos)"),
+    cursor:   Optional[str]  = Query(None, description="Valor de X-Next-Cursor de la página anterior")
+):
+    """
+    Lista los puzzles ordenados por puzzleId.
+    - Los filtros se resuelven en la base de datos.
+    - Con `fields` sólo se devuelven esos campos (sin validar contra PuzzleRead).
+    - Con `limit` se pagina por clave: si hay más resultados, el header X-Next-Cursor
+      trae el cursor de la página siguiente.
+    """
+    try:
+        projection = parse_fields(fields, PUZZLE_FIELDS, ("puzzleId",))
+        after = decode_cursor(cursor, 1) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    rows = await get_repository().list_puzzles(
+        _filters(theme, brand, material, regular),
+        projection,
+        after,
+        limit + 1 if limit else None  # una fila extra indica que hay otra página
+    )
+    rows, next_cursor = page(rows, limit, lambda p: [p["puzzleId"]])
+
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    if projection:
+        return JSONResponse(rows, headers=headers)
+    response.headers.update(headers)
+    return [PuzzleRead(**puzzle) for puzzle in rows]
 
 @router.patch("/{puzzle_id}", response_model=PuzzleRead)
-def update_puzzle(
+async def update_puzzle(
     puzzle_id: UUID = Path(...),
     payload:   PuzzleUpdate = ...
 ):
@@ -91,37 +124,26 @@ def update_puzzle(
     if not fields:
         raise HTTPException(status_code=400, detail="No se enviaron campos para actualizar")
 
-    # Construye dinámicamente el SET
-    set_str = ", ".join(f"p.{k} = ${k}" for k in fields)
-    params  = {"puzzleId": str(puzzle_id), **fields}
+    # Toda escritura incrementa la versión del puzzle (invalida soluciones cacheadas)
+    puzzle = await get_repository().update_puzzle(str(puzzle_id), fields)
 
-    with get_session() as session:
-        rec = session.run(
-            f"""
-            MATCH (p:Puzzle {{puzzleId: $puzzleId}})
-            SET {set_str}
-            RETURN p {{.*, puzzleId: p.puzzleId}} AS p
-            """,
-            params
-        ).single()
+    if not puzzle:
+        raise HTTPException(status_code=404, detail="Puzzle no encontrado")
 
-        if not rec:
-            raise HTTPException(status_code=404, detail="Puzzle no encontrado")
-
-        return PuzzleRead(**rec["p"])
+    invalidate_solutions(str(puzzle_id))
+    return PuzzleRead(**puzzle)
 
 
 @router.delete("/{puzzle_id}", status_code=204)
-def delete_puzzle(
+async def delete_puzzle(
     puzzle_id: UUID = Path(...)
 ):
-    """Elimina un Puzzle y sus relaciones."""
-    with get_session() as session:
-        session.run(
-            """
-            MATCH (p:Puzzle {puzzleId: $puzzleId})
-            DETACH DELETE p
-            """,
-            {"puzzleId": str(puzzle_id)}
-        )
+    """
+    Elimina un Puzzle y todas sus piezas.
+    Las piezas se borran en lotes de PIECES_DELETE_BATCH_SIZE (una transacción por lote)
+    para acotar la memoria de cada transacción en puzzles grandes.
+    """
+    deleted = await get_repository().delete_puzzle(str(puzzle_id))
+    count_pieces(deleted)
+    invalidate_solutions(str(puzzle_id))
     return None
\ No newline at end of file
@@ -1,23 +1,351 @@
-from fastapi import APIRouter, HTTPException, Path
-from typing import List
-from core.solver import solve_puzzle
+import json
+from fastapi import APIRouter, HTTPException, Path, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional
+from core.solver import (
+    solve_puzzle_cached, solve_puzzle_structured_cached, solution_diff, stream_solution,
+    fetch_many_puzzles_and_pieces, fetch_puzzle_version,
+)
+from core.batch import solve_many
+from core.layout import current_layout, piece_neighbors
+from core.jobs import JobQueueFull, get_job_manager
+from core.steps import UnsolvablePuzzle
+from repositories import get_repository
+from core import render
+from core.cache import solution_cache, structured_cache
+from models.solution import StructuredSolution, BatchSolveRequest
+from services.metrics import TimedRoute
+from services.http_cache import make_etag, not_modified, set_etag
 
 router = APIRouter(
     prefix="/solver",
-    tags=["Solver"]
+    tags=["Solver"],
+    route_class=TimedRoute
 )
 
+ENGINE_QUERY = Query(None, pattern="^(python|numpy)$", description="Motor para puzzles regulares (por defecto SOLVER_ENGINE)")
+
+@router.get("/cache/stats")
+def get_cache_stats():
+    """Estadísticas del cache de soluciones (aciertos, fallos, desalojos y memoria)."""
+    return {
+        "instructions": solution_cache.stats(),
+        "structured": structured_cache.stats(),
+    }
+
+
+@router.post("/batch")
+async def solve_batch(payload: BatchSolveRequest):
+    """
+    Resuelve varios puzzles: lee todas las piezas con una sola consulta y reparte
+    el cálculo en un pool de procesos (SOLVER_BATCH_WORKERS). Admite hasta
+    SOLVER_BATCH_MAX_PUZZLES puzzles y los motores "python" o "numpy" (422 si no).
+    Devuelve NDJSON con una línea por puzzle, en el orden en que van terminando.
+    """
+    puzzle_ids = list(dict.fromkeys(payload.puzzleIds))
+    loaded = await fetch_many_puzzles_and_pieces(puzzle_ids)
+
+    async def results():
+        for puzzle_id in puzzle_ids:
+            if puzzle_id not in loaded:
+                yield json.dumps({"puzzleId": puzzle_id, "error": "Puzzle no encontrado."}) + "\n"
+        async for puzzle_id, instructions, error in solve_many(loaded, payload.engine):
+            if error:
+                yield json.dumps({"puzzleId": puzzle_id, "error": error}) + "\n"
+            else:
+                version = loaded[puzzle_id][0].get("version", 0)
+                solution_cache.put(puzzle_id, version, instructions)
+                yield json.dumps({"puzzleId": puzzle_id, "version": version, "instructions": instructions}) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+# Segundos máximos entre líneas de estado al seguir un trabajo (mantienen viva la conexión)
+JOB_EVENTS_HEARTBEAT = 15
+
+
+def _job_or_404(job_id: str):
+    job = get_job_manager().get(job_id)
+    if job is None or job.kind != "solve":
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado.")
+    return job
+
+
+@router.get("/jobs")
+async def list_jobs():
+    """Estado de la cola de trabajos y de los trabajos guardados (activos y terminados)."""
+    manager = get_job_manager()
+    return {"stats": manager.stats(), "jobs": [job.snapshot() for job in manager.get_all() if job.kind == "solve"]}
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str = Path(..., description="Id del trabajo")):
+    """
+    Estado del trabajo: queued, running, cancelling, done, failed o cancelled, con su avance si
+    lo informa.
+    """
+    return _job_or_404(job_id).snapshot()
+
+
+@router.get("/jobs/{job_id}/result", response_model=List[str])
+async def get_job_result(job_id: str = Path(..., description="Id del trabajo")):
+    """
+    Instrucciones del trabajo terminado. Mientras está en cola o en curso responde 202 con su
+    estado; 400 si falló y 409 si se canceló. Si el trabajo ya soltó su resultado (límite de
+    memoria), se lee del cache de soluciones por su versión; 410 si tampoco está ahí.
+    """
+    job = _job_or_404(job_id)
+    if job.status == "done":
+        result = job.result if job.result is not None else solution_cache.get(job.puzzle_id, job.version)
+        if result is None:
+            raise HTTPException(status_code=410, detail="El resultado ya no está guardado; cree otro trabajo.")
+        return result
+    if job.status == "failed":
+        raise HTTPException(status_code=400, detail=job.error)
+    if job.status == "cancelled":
+        raise HTTPException(status_code=409, detail="El trabajo fue cancelado.")
+    return JSONResponse(job.snapshot(), status_code=202)
+
+
+@router.get("/jobs/{job_id}/events")
+async def follow_job(job_id: str = Path(..., description="Id del trabajo")):
+    """NDJSON con el estado del trabajo cada vez que cambia (avance incluido), hasta que termina."""
+    job = _job_or_404(job_id)
+
+    async def events():
+        while True:
+            yield json.dumps(job.snapshot()) + "\n"
+            if job.finished:
+                return
+            await job.wait_change(job.revision, JOB_EVENTS_HEARTBEAT)
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@router.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str = Path(..., description="Id del trabajo")):
+    """
+    Cancela el trabajo: si está en cola se descarta; si está en curso queda en "cancelling" y se
+    interrumpe en su próximo reporte de avance (o al terminar, si no reporta). Devuelve el estado
+    resultante.
+    """
+    job = get_job_manager().cancel(_job_or_404(job_id).id)
+    return job.snapshot()
+
+
+async def _current_version(puzzle_id: str) -> int:
+    version = await fetch_puzzle_version(puzzle_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Puzzle no encontrado.")
+    return version
+
+
+@router.post("/{puzzle_id}/jobs", status_code=202)
+async def create_job(
+    response: Response,
+    puzzle_id: str = Path(..., description="UUID del puzzle"),
+    engine: Optional[str] = ENGINE_QUERY
+):
+    """
+    Encola la resolución del puzzle y devuelve el trabajo (Location: /solver/jobs/{jobId}).
+    Un pedido para la misma versión y motor que un trabajo existente devuelve ese trabajo
+    (coalesced=true). Con la cola llena responde 429 con Retry-After.
+    """
+    try:
+        job, created = await get_job_manager().submit(puzzle_id, engine)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    response.headers["Location"] = f"{router.prefix}/jobs/{job.id}"
+    return {**job.snapshot(), "coalesced": not created}
+
+
 @router.get("/{puzzle_id}", response_model=List[str])
 async def get_solution(
-    puzzle_id: str = Path(..., description="UUID del puzzle")
+    request: Request,
+    response: Response,
+    puzzle_id: str = Path(..., description="UUID del puzzle"),
+    engine: Optional[str] = ENGINE_QUERY
 ):
     """
     Devuelve una serie de instrucciones detalladas para armar el puzzle,
     indicando piezas faltantes y posiciones.
+    Con If-None-Match y la versión sin cambios responde 304 sin leer las piezas.
+    """
+    version = await _current_version(puzzle_id)
+    etag = make_etag(version, request)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
+    try:
+        instructions = await solve_puzzle_cached(puzzle_id, engine, version)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UnsolvablePuzzle as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    set_etag(response, etag)
+    return instructions
+
+
+@router.get("/{puzzle_id}/diff")
+async def get_solution_diff(
+    puzzle_id: str = Path(..., description="UUID del puzzle"),
+    since: int = Query(..., ge=0, description="Versión del puzzle que ya tiene el cliente")
+):
+    """
+    Devuelve sólo las instrucciones que cambiaron desde la versión `since`, identificadas
+    por clave ("summary", "piece:<n>", "group:<id>"); text=null indica una línea eliminada.
+    Si la versión es demasiado antigua, devuelve la solución completa con full=true.
+    """
+    try:
+        return await solution_diff(puzzle_id, since)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UnsolvablePuzzle as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{puzzle_id}/layout")
+async def get_layout(puzzle_id: str = Path(..., description="UUID del puzzle")):
+    """
+    Disposición guardada en el grafo (PLACED_AT / ADJACENT_TO): una colocación
+    {pieceId, sequenceNumber, group, row, col, orientation} por pieza, ordenadas por fila y columna.
+    Si no hay o es de una versión anterior, resuelve el puzzle y la guarda en una sola escritura.
+    """
+    try:
+        return await current_layout(puzzle_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UnsolvablePuzzle as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/{puzzle_id}/layout", status_code=204)
+async def delete_layout(puzzle_id: str = Path(..., description="UUID del puzzle")):
+    """Elimina la disposición guardada; se vuelve a calcular cuando se pida."""
+    if not await get_repository().delete_layout(puzzle_id):
+        raise HTTPException(status_code=404, detail="Puzzle no encontrado.")
+
+
+@router.get("/{puzzle_id}/neighbors/{piece_id}")
+async def get_neighbors(
+    puzzle_id: str = Path(..., description="UUID del puzzle"),
+    piece_id: str = Path(..., description="UUID de la pieza")
+):
+    """
+    Qué va junto a la pieza: su colocación y la de sus vecinas (side: top, right, bottom, left),
+    en una búsqueda de un salto sobre la disposición guardada.
+    """
+    try:
+        found = await piece_neighbors(puzzle_id, piece_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UnsolvablePuzzle as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if found is None:
+        raise HTTPException(status_code=404, detail="Pieza no encontrada.")
+    return found
+
+
+@router.get("/{puzzle_id}/structured", response_model=StructuredSolution, response_model_exclude_none=True)
+async def get_structured_solution(
+    request: Request,
+    response: Response,
+    puzzle_id: str = Path(..., description="UUID del puzzle"),
+    text: bool = Query(False, description="Incluir también las instrucciones en texto"),
+    engine: Optional[str] = ENGINE_QUERY
+):
+    """
+    Devuelve la solución como datos: un resumen y los pasos en columnas
+    (seq, row, col, group, orientation, missing, absent). El texto es opcional.
+    Admite If-None-Match igual que GET /solver/{puzzle_id}.
+    """
+    version = await _current_version(puzzle_id)
+    etag = make_etag(version, request)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
+    try:
+        solution = await solve_puzzle_structured_cached(puzzle_id, text, engine, version)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UnsolvablePuzzle as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    set_etag(response, etag)
+    return solution
+
+
+async def _agroupby(items, key):
+    """groupby para iteradores asíncronos: produce (clave, lista) por cada bloque consecutivo."""
+    block, current = [], None
+    async for item in items:
+        k = key(item)
+        if block and k != current:
+            yield current, block
+            block = []
+        current = k
+        block.append(item)
+    if block:
+        yield current, block
+
+
+async def _stream_events(summary: dict, steps, by: str, text: bool):
+    """Convierte el resumen y los pasos en eventos (tipo, datos), por paso o por bloque."""
+    line = render.step_line(summary["mode"])
+
+    def as_dict(step):
+        data = step._asdict()
+        if text:
+            data["text"] = line(step)
+        return data
+
+    if text:
+        summary = {**summary, "text": render.summary_line(summary)}
+    yield "summary", summary
+
+    if by == "step":
+        async for step in steps:
+            yield "step", as_dict(step)
+    elif summary["mode"] in ("regular", "edges"):
+        async for row, block in _agroupby(steps, lambda s: s.row):
+            yield "row", {"row": row, "steps": [as_dict(s) for s in block]}
+    else:
+        sizes = dict(zip(summary["groups"], summary["groupSizes"]))
+        async for group_id, block in _agroupby(steps, lambda s: s.group):
+            data = {"group": group_id, "steps": [as_dict(s) for s in block]}
+            if text:
+                data["text"] = render.group_header(group_id, sizes[group_id])
+            yield "group", data
+    yield "end", {}
+
+
+@router.get("/{puzzle_id}/stream")
+async def stream_solution_endpoint(
+    puzzle_id: str = Path(..., description="UUID del puzzle"),
+    stream_format: str = Query("ndjson", alias="format", pattern="^(ndjson|sse)$", description="ndjson o sse (Server-Sent Events)"),
+    by: str = Query("block", pattern="^(step|block)$", description="step: un evento por paso; block: por fila (regular) o grupo (irregular)"),
+    text: bool = Query(True, description="Incluir las instrucciones en texto")
+):
+    """
+    Transmite la solución a medida que se genera, leyendo las piezas de Neo4j con un cursor:
+    la primera instrucción llega sin esperar a la última y la memoria no crece con el puzzle.
     """
+    solution = stream_solution(puzzle_id)
     try:
-        instructions = solve_puzzle(puzzle_id)
+        summary = await solution.__anext__()
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except UnsolvablePuzzle as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return instructions
\ No newline at end of file
+    events = _stream_events(summary, solution, by, text)
+    if stream_format == "sse":
+        body = (f"event: {kind}\ndata: {json.dumps(data)}\n\n" async for kind, data in events)
+        return StreamingResponse(body, media_type="text/event-stream")
+    body = (json.dumps({"type": kind, **data}) + "\n" async for kind, data in events)
+    return StreamingResponse(body, media_type="application/x-ndjson")
@@ -0,0 +1,112 @@
+"""
+Compresión de respuestas (brotli o gzip) según Accept-Encoding.
+
+Sólo se comprimen respuestas completas (un único mensaje de cuerpo) de al menos
+COMPRESSION_MIN_SIZE bytes y de tipos de texto/JSON. Las respuestas en streaming (NDJSON,
+SSE) pasan sin cambios para que cada línea llegue al cliente en cuanto se genera.
+Brotli es opcional: sin el paquete `brotli` sólo se ofrece gzip.
+"""
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # Brotli es opcional: sin él se usa gzip
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4  # Más rápido que el 11 por defecto; casi la misma relación para JSON
+
+COMPRESSIBLE_TYPES = (b"application/json", b"text/")
+
+
+def choose_encoding(accept_encoding: str) -> str:
+    """Codificación preferida entre las aceptadas por el cliente (q > 0), o None."""
+    accepted = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    best = max(candidates, key=lambda e: accepted.get(e, accepted.get("*", 0.0)))
+    return best if accepted.get(best, accepted.get("*", 0.0)) > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    """Middleware ASGI que comprime las respuestas completas grandes."""
+
+    def __init__(self, app, minimum_size: int = None):
+        self.app = app
+        self.minimum_size = COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(dict(scope["headers"]).get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def send_wrapper(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Se retiene hasta ver el cuerpo: los headers dependen de si se comprime
+                start = message
+                return
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            headers = start.get("headers", [])
+            names = {k.lower() for k, _ in headers}
+            content_type = dict((k.lower(), v) for k, v in headers).get(b"content-type", b"")
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or b"content-encoding" in names
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+                or len(body) < self.minimum_size
+            ):
+                if content_type.startswith(COMPRESSIBLE_TYPES):
+                    headers = [*headers, (b"vary", b"Accept-Encoding")]
+                await send({**start, "headers": headers})
+                start = None
+                await send(message)
+                return
+
+            body = compress(body, encoding)
+            headers = [
+                (k, _encoded_etag(v, encoding) if k.lower() == b"etag" else v)
+                for k, v in headers if k.lower() != b"content-length"
+            ] + [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(body)).encode()),
+                (b"vary", b"Accept-Encoding"),
+            ]
+            await send({**start, "headers": headers})
+            start = None
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _encoded_etag(etag: bytes, encoding: str) -> bytes:
+    """Un ETag fuerte identifica bytes exactos: la versión comprimida lleva otro."""
+    if etag.endswith(b'"'):
+        return etag[:-1] + f"-{encoding}".encode() + b'"'
+    return etag
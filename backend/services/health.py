@@ -0,0 +1,82 @@
+"""
+Estado del arranque del proceso, para las sondas del orquestador:
+- vivo (/live): el proceso atiende requests; no depende de la base de datos.
+- listo (/ready): el almacenamiento respondió y el pool está precalentado.
+  El estado del esquema (restricciones e índices) se informa aparte: si no se pudo crear,
+  la app atiende igual.
+
+También registra cuánto tardó cada etapa desde que empezó a importarse la app
+(import, startup, ready), expuesto en /ready y en /metrics como app_startup_seconds.
+"""
+import threading
+import time
+
+from services.metrics import add_collector, gauge_lines
+
+
+class StartupState:
+
+    def __init__(self, started: float = None):
+        self._lock = threading.Lock()
+        self.started = started if started is not None else time.perf_counter()
+        self.phases = {}
+        self.ready = False
+        self.error = None
+        self.attempts = 0
+        self.schema = None
+
+    def mark(self, phase: str) -> float:
+        """Registra la etapa con el tiempo transcurrido desde el inicio y lo devuelve."""
+        elapsed = time.perf_counter() - self.started
+        with self._lock:
+            self.phases[phase] = elapsed
+        return elapsed
+
+    def set_ready(self) -> None:
+        with self._lock:
+            self.ready = True
+            self.error = None
+        self.mark("ready")
+
+    def set_failed(self, error: Exception) -> None:
+        with self._lock:
+            self.ready = False
+            self.attempts += 1
+            self.error = f"{type(error).__name__}: {error}"
+
+    def set_schema(self, missing, error: Exception = None) -> None:
+        """Resultado de preparar el esquema: lo que falta (lista) o el error si no se pudo."""
+        with self._lock:
+            self.schema = {
+                "status": "ok" if missing == [] else "missing",
+                "missing": missing,
+                "error": f"{type(error).__name__}: {error}" if error else None,
+            }
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "error": self.error,
+                "failedAttempts": self.attempts,
+                "schema": self.schema,
+                "startupSeconds": dict(self.phases),
+            }
+
+
+startup_state = StartupState()
+
+
+def _startup_lines() -> list:
+    stats = startup_state.snapshot()
+    lines = gauge_lines(
+        "app_startup_seconds", "Segundos desde el inicio del import de la app hasta cada etapa.",
+        [({"phase": phase}, seconds) for phase, seconds in stats["startupSeconds"].items()],
+    ) + gauge_lines("app_ready", "1 si el almacenamiento respondió (sonda /ready).", [(None, int(stats["ready"]))])
+    if stats["schema"]:
+        lines += gauge_lines("app_schema_complete", "1 si las restricciones e índices de Neo4j existen.",
+                             [(None, int(stats["schema"]["status"] == "ok"))])
+    return lines
+
+
+add_collector(_startup_lines)
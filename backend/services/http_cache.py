@@ -0,0 +1,62 @@
+"""
+GET condicional con ETags fuertes derivados de la versión del puzzle.
+
+La versión se incrementa con cada escritura, así que (versión, ruta, query) identifica
+exactamente el contenido de la respuesta. Con If-None-Match se responde 304 sin más trabajo
+que leer la versión. Si la respuesta se comprime, services/compression.py agrega la
+codificación al ETag ("...-gzip"); aquí ese sufijo se ignora al comparar.
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Cambiarlo cuando cambie el formato de alguna respuesta cacheada por los clientes
+ETAG_REVISION = "1"
+
+ENCODING_SUFFIXES = ("-gzip", "-br")
+
+# El cliente puede guardar la respuesta pero debe revalidarla siempre
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(version: int, request: Request) -> str:
+    """ETag fuerte de la representación de `request` en esa versión del puzzle."""
+    key = f"{ETAG_REVISION}|{version}|{request.url.path}|{request.url.query}"
+    return '"' + hashlib.sha1(key.encode()).hexdigest()[:20] + '"'
+
+
+def _strip(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]  # If-None-Match usa comparación débil
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix + '"'):
+            return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+
+def matching_etag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """Etiqueta enviada por el cliente que coincide con `etag`, o None."""
+    if not if_none_match:
+        return None
+    for tag in if_none_match.split(","):
+        if tag.strip() == "*" or _strip(tag) == etag:
+            return tag.strip()
+    return None
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """
+    Respuesta 304 si el cliente ya tiene esta versión; se devuelve la etiqueta tal como
+    la envió (con el sufijo de codificación de la respuesta que tiene guardada).
+    """
+    matched = matching_etag(request.headers.get("if-none-match"), etag)
+    if matched is None:
+        return None
+    return Response(status_code=304, headers={"ETag": etag if matched == "*" else matched, "Cache-Control": CACHE_CONTROL})
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -0,0 +1,225 @@
+"""
+Métricas de la API en formato de texto de Prometheus (GET /metrics), sin dependencias externas.
+
+- Latencia por ruta: histograma http_request_duration_seconds{method, route, status}.
+- Tiempo por fase de cada request: http_request_phase_seconds{route, phase}, con las fases
+  "db" (repositorio), "convert" (registros de Neo4j a diccionarios), "solve" (solver) y
+  "serialize" (desde que el endpoint retorna hasta que empieza la respuesta).
+  Las fases anidadas se descuentan de la fase que las contiene.
+- Piezas leídas o escritas por request: http_request_pieces{route}.
+- Métricas adicionales (cache, pool de Neo4j) mediante colectores registrados con add_collector.
+"""
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from fastapi.routing import APIRoute
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PIECE_BUCKETS = (0, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+
+class Histogram:
+    """Histograma con etiquetas (buckets acumulativos, como en Prometheus)."""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series = {}  # valores de etiquetas -> [conteos por bucket..., +Inf], suma
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        with self._lock:
+            counts, total = self._series.get(labels, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect_left(self.buckets, value)] += 1
+            self._series[labels] = (counts, total + value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted(self._series.items())
+        for labels, (counts, total) in series:
+            pairs = [f'{k}="{_escape(v)}"' for k, v in zip(self.labelnames, labels)]
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                le = ",".join(pairs + [f'le="{bound}"'])
+                lines.append(f"{self.name}_bucket{{{le}}} {cumulative}")
+            base = "{" + ",".join(pairs) + "}" if pairs else ""
+            lines.append(f"{self.name}_sum{base} {total}")
+            lines.append(f"{self.name}_count{base} {cumulative}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def gauge_lines(name: str, help_text: str, samples: dict, kind: str = "gauge") -> list:
+    """Líneas de una métrica simple; samples es una lista de (etiquetas como dict o None, valor)."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        pairs = ",".join(f'{k}="{_escape(v)}"' for k, v in (labels or {}).items())
+        lines.append(f"{name}{{{pairs}}} {value}" if pairs else f"{name} {value}")
+    return lines
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Latencia de los requests por ruta.",
+    ("method", "route", "status"), LATENCY_BUCKETS,
+)
+phase_duration = Histogram(
+    "http_request_phase_seconds", "Tiempo de cada fase (db, convert, solve, serialize) por request.",
+    ("route", "phase"), LATENCY_BUCKETS,
+)
+request_pieces = Histogram(
+    "http_request_pieces", "Piezas leídas o escritas por request.",
+    ("route",), PIECE_BUCKETS,
+)
+
+_collectors = []
+
+
+def add_collector(collector) -> None:
+    """Registra una función sin argumentos que devuelve líneas adicionales para /metrics."""
+    _collectors.append(collector)
+
+
+def render_metrics() -> str:
+    lines = []
+    for histogram in (request_duration, phase_duration, request_pieces):
+        lines.extend(histogram.render())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+class RequestStats:
+    """Tiempos por fase y piezas de un request (compartido por las tareas e hilos que lo atienden)."""
+
+    def __init__(self):
+        self.phases = {}
+        self.pieces = 0
+        self.endpoint_done = None
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+_current = contextvars.ContextVar("request_stats", default=None)
+# Fases abiertas en el contexto actual: ((fase, inicio del tramo actual), ...). Cada tarea o
+# hilo tiene su copia, así las fases de tareas concurrentes del request no se mezclan.
+_phase_stack = contextvars.ContextVar("request_phase_stack", default=())
+
+
+@contextmanager
+def timed(phase: str):
+    """
+    Acumula el tiempo del bloque en la fase dada del request en curso (si lo hay).
+    Las fases anidadas son exclusivas: mientras corre la interna, la externa no suma.
+    """
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    outer = _phase_stack.get()
+    now = time.perf_counter()
+    if outer:
+        parent, started = outer[-1]
+        stats.add(parent, now - started)
+    token = _phase_stack.set(outer + ((phase, now),))
+    try:
+        yield
+    finally:
+        now = time.perf_counter()
+        stats.add(phase, now - _phase_stack.get()[-1][1])
+        _phase_stack.reset(token)
+        if outer:
+            # La fase externa retoma desde ahora
+            _phase_stack.set(outer[:-1] + ((outer[-1][0], now),))
+
+
+def count_pieces(n: int) -> None:
+    """Suma piezas leídas o escritas al request en curso."""
+    stats = _current.get()
+    if stats is not None:
+        stats.pieces += n
+
+
+def _mark_endpoint_done() -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.endpoint_done = time.perf_counter()
+
+
+class TimedRoute(APIRoute):
+    """Ruta que registra cuándo termina el endpoint, para medir la serialización de la respuesta."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if inspect.iscoroutinefunction(endpoint):
+            @functools.wraps(endpoint)
+            async def wrapped(*args, **kw):
+                try:
+                    return await endpoint(*args, **kw)
+                finally:
+                    _mark_endpoint_done()
+        else:
+            @functools.wraps(endpoint)
+            def wrapped(*args, **kw):
+                try:
+                    return endpoint(*args, **kw)
+                finally:
+                    _mark_endpoint_done()
+        super().__init__(path, wrapped, **kwargs)
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI: mide cada request hasta el último fragmento de la respuesta
+    (incluidas las respuestas en streaming) y registra latencia, fases y piezas.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if stats.endpoint_done is not None:
+                    stats.phases["serialize"] = time.perf_counter() - stats.endpoint_done
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            request_duration.observe(time.perf_counter() - started, scope["method"], route_path, str(status))
+            for phase, seconds in stats.phases.items():
+                phase_duration.observe(seconds, route_path, phase)
+            if stats.pieces:
+                request_pieces.observe(stats.pieces, route_path)
@@ -1,7 +1,12 @@
 import os
-from neo4j import GraphDatabase
+import time
+import asyncio
+import importlib
+import threading
 from dotenv import load_dotenv
 
+from services.metrics import add_collector, gauge_lines
+
 # Carga variables de entorno desde un archivo .env si existe
 load_dotenv()
 
@@ -11,21 +16,51 @@ NEO4J_USERNAME = os.getenv("NEO4J_USERNAME")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
 NEO4J_DATABASE = os.getenv("NEO4J_DATABASE", "neo4j")
 
-if not all([NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD]):
-    raise ValueError(
-        "Por favor define las variables de entorno NEO4J_URI, NEO4J_USERNAME y NEO4J_PASSWORD"
-    )
 
-# Singleton para el driver de Neo4j
+# Configuración del pool de conexiones y de las transacciones administradas
+NEO4J_MAX_CONNECTION_POOL_SIZE = int(os.getenv("NEO4J_MAX_CONNECTION_POOL_SIZE", "100"))
+NEO4J_CONNECTION_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", "60"))
+NEO4J_MAX_CONNECTION_LIFETIME = float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600"))
+NEO4J_FETCH_SIZE = int(os.getenv("NEO4J_FETCH_SIZE", "1000"))
+# Tiempo máximo durante el cual execute_read/execute_write reintentan errores transitorios
+NEO4J_MAX_TRANSACTION_RETRY_TIME = float(os.getenv("NEO4J_MAX_TRANSACTION_RETRY_TIME", "15"))
+# Conexiones que abre el calentamiento del arranque (ver warm_up)
+NEO4J_WARMUP_CONNECTIONS = int(os.getenv("NEO4J_WARMUP_CONNECTIONS", "10"))
+
+# Modos de acceso (los mismos valores que neo4j.READ_ACCESS / neo4j.WRITE_ACCESS): el paquete
+# neo4j pesa en el arranque, así que sólo se importa al crear el primer driver
+READ_ACCESS = "READ"
+WRITE_ACCESS = "WRITE"
+
+
+def _driver_config() -> dict:
+    # Se valida al crear el driver (no al importar) para poder usar la app sin Neo4j,
+    # p. ej. con PUZZLE_REPOSITORY=memory
+    if not all([NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD]):
+        raise ValueError(
+            "Por favor define las variables de entorno NEO4J_URI, NEO4J_USERNAME y NEO4J_PASSWORD"
+        )
+    return {
+        "auth": (NEO4J_USERNAME, NEO4J_PASSWORD),
+        "max_connection_pool_size": NEO4J_MAX_CONNECTION_POOL_SIZE,
+        "connection_acquisition_timeout": NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+        "max_connection_lifetime": NEO4J_MAX_CONNECTION_LIFETIME,
+        "max_transaction_retry_time": NEO4J_MAX_TRANSACTION_RETRY_TIME,
+    }
+
+
+# Singletons para los drivers de Neo4j (síncrono y asíncrono)
 _driver = None
+_async_driver = None
 
-def get_driver() -> GraphDatabase.driver:
+def get_driver():
     """
     Inicializa y retorna un driver de Neo4j singleton.
     """
     global _driver
     if _driver is None:
-        _driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USERNAME, NEO4J_PASSWORD))
+        from neo4j import GraphDatabase
+        _driver = GraphDatabase.driver(NEO4J_URI, **_driver_config())
     return _driver
 
 
@@ -37,8 +72,212 @@ def get_session():
             session.run(...)
     """
     driver = get_driver()
-    return driver.session(database=NEO4J_DATABASE)
+    return driver.session(database=NEO4J_DATABASE, fetch_size=NEO4J_FETCH_SIZE)
 
 def close_driver():
     """Cierra el driver (llamar al apagar la app)."""
-    _driver.close()
+    global _driver
+    if _driver is not None:
+        _driver.close()
+        _driver = None
+
+
+def get_async_driver():
+    """
+    Inicializa y retorna el driver asíncrono singleton.
+    Debe usarse desde el event loop de la app (los handlers async de FastAPI).
+    """
+    global _async_driver
+    if _async_driver is None:
+        from neo4j import AsyncGraphDatabase
+        _async_driver = AsyncGraphDatabase.driver(NEO4J_URI, **_driver_config())
+    return _async_driver
+
+
+def get_async_session(access_mode: str = WRITE_ACCESS):
+    """
+    Retorna una nueva sesión asíncrona de Neo4j.
+    Con access_mode=READ_ACCESS las consultas se enrutan a los seguidores del clúster.
+    Uso:
+        async with get_async_session() as session:
+            result = await session.run(...)
+    Para consultas que no se transmiten por partes, preferir read()/write(), que reintentan.
+    """
+    return get_async_driver().session(
+        database=NEO4J_DATABASE, fetch_size=NEO4J_FETCH_SIZE, default_access_mode=access_mode
+    )
+
+
+async def warm_up(connections: int = None) -> None:
+    """
+    Crea el driver asíncrono, verifica la conexión y abre `connections` conexiones a la vez
+    (una sesión con RETURN 1 cada una) para que los primeros requests no paguen el handshake.
+    Lanza la excepción del driver si la base no responde.
+    """
+    # Importar el paquete es lo más lento: se hace en un hilo para no frenar el event loop
+    await asyncio.to_thread(importlib.import_module, "neo4j")
+    driver = get_async_driver()
+    await driver.verify_connectivity()
+
+    async def ping():
+        async with get_async_session(READ_ACCESS) as session:
+            result = await session.run("RETURN 1 AS test")
+            await result.consume()
+
+    await asyncio.gather(*(ping() for _ in range(connections or NEO4J_WARMUP_CONNECTIONS)))
+
+
+async def close_async_driver():
+    """Cierra el driver asíncrono (llamar al apagar la app)."""
+    global _async_driver
+    if _async_driver is not None:
+        await _async_driver.close()
+        _async_driver = None
+
+
+class PoolMetrics:
+    """
+    Métricas de uso del pool medidas alrededor de las transacciones administradas
+    (el driver no expone las de su pool): transacciones esperando conexión y en curso,
+    tiempo de espera hasta obtenerla, reintentos y fallos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.transactions = 0
+        self.retries = 0
+        self.failures = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def begin(self) -> None:
+        with self._lock:
+            self.waiting += 1
+
+    def acquired(self, wait_seconds: float) -> None:
+        with self._lock:
+            self.waiting -= 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.transactions += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+    def end(self, acquired: bool, retries: int, failed: bool) -> None:
+        with self._lock:
+            if acquired:
+                self.in_use -= 1
+            else:
+                self.waiting -= 1
+            self.retries += retries
+            self.failures += failed
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "max_pool_size": NEO4J_MAX_CONNECTION_POOL_SIZE,
+                "in_use": self.in_use,
+                "waiting": self.waiting,
+                "peak_in_use": self.peak_in_use,
+                "utilization": self.in_use / NEO4J_MAX_CONNECTION_POOL_SIZE,
+                "transactions": self.transactions,
+                "retries": self.retries,
+                "failures": self.failures,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_avg": self.wait_seconds_total / self.transactions if self.transactions else 0.0,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+def _pool_metrics_lines() -> list:
+    stats = pool_metrics.snapshot()
+    lines = []
+    for name, key, kind, help_text in (
+        ("neo4j_pool_max_size", "max_pool_size", "gauge", "Tamaño máximo del pool de conexiones."),
+        ("neo4j_pool_in_use", "in_use", "gauge", "Transacciones con conexión en curso."),
+        ("neo4j_pool_waiting", "waiting", "gauge", "Transacciones esperando una conexión."),
+        ("neo4j_pool_utilization", "utilization", "gauge", "Fracción del pool en uso."),
+        ("neo4j_transactions_total", "transactions", "counter", "Transacciones administradas."),
+        ("neo4j_transaction_retries_total", "retries", "counter", "Reintentos por errores transitorios."),
+        ("neo4j_transaction_failures_total", "failures", "counter", "Transacciones fallidas."),
+        ("neo4j_pool_wait_seconds_total", "wait_seconds_total", "counter", "Tiempo total esperando conexión."),
+        ("neo4j_pool_wait_seconds_max", "wait_seconds_max", "gauge", "Mayor espera por una conexión."),
+    ):
+        lines.extend(gauge_lines(name, help_text, [(None, stats[key])], kind))
+    return lines
+
+
+add_collector(_pool_metrics_lines)
+
+
+async def _execute(access_mode: str, work, *args, **kwargs):
+    """
+    Ejecuta `work(tx, *args, **kwargs)` en una transacción administrada: el driver la
+    reintenta ante errores transitorios (p. ej. cambio de líder) durante a lo sumo
+    NEO4J_MAX_TRANSACTION_RETRY_TIME segundos. `work` debe consumir los resultados.
+    """
+    started = time.perf_counter()
+    attempts = 0
+
+    async def tx_function(tx):
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            pool_metrics.acquired(time.perf_counter() - started)
+        return await work(tx, *args, **kwargs)
+
+    pool_metrics.begin()
+    failed = False
+    try:
+        async with get_async_session(access_mode) as session:
+            if access_mode == READ_ACCESS:
+                return await session.execute_read(tx_function)
+            return await session.execute_write(tx_function)
+    except Exception:
+        failed = True
+        raise
+    finally:
+        pool_metrics.end(attempts > 0, max(attempts - 1, 0), failed)
+
+
+async def read_transaction(work, *args, **kwargs):
+    """Transacción de lectura administrada (con reintentos, enrutada a seguidores)."""
+    return await _execute(READ_ACCESS, work, *args, **kwargs)
+
+
+async def write_transaction(work, *args, **kwargs):
+    """Transacción de escritura administrada (con reintentos, enrutada al líder)."""
+    return await _execute(WRITE_ACCESS, work, *args, **kwargs)
+
+
+async def _fetch_all(tx, query: str, parameters: dict) -> list:
+    result = await tx.run(query, parameters)
+    return [record async for record in result]
+
+
+async def read(query: str, parameters: dict = None) -> list:
+    """Ejecuta una consulta de lectura y devuelve todos sus registros."""
+    return await read_transaction(_fetch_all, query, parameters or {})
+
+
+async def write(query: str, parameters: dict = None) -> list:
+    """Ejecuta una consulta de escritura y devuelve todos sus registros."""
+    return await write_transaction(_fetch_all, query, parameters or {})
+
+
+async def read_one(query: str, parameters: dict = None):
+    """Como read(), pero devuelve sólo el primer registro (o None)."""
+    records = await read(query, parameters)
+    return records[0] if records else None
+
+
+async def write_one(query: str, parameters: dict = None):
+    """Como write(), pero devuelve sólo el primer registro (o None)."""
+    records = await write(query, parameters)
+    return records[0] if records else None
@@ -0,0 +1,108 @@
+"""
+Perfilado opcional por request con cProfile.
+Con PROFILER_ENABLED=true, un request con el header "X-Profile: 1" se perfila completo
+(incluido el trabajo que el solver manda a hilos con run_in_thread). La respuesta trae
+"X-Profile-Id" y el resultado se consulta en GET /debug/profiles/{id}.
+
+cProfile mide todo lo que corre en el hilo del event loop mientras dura el request, así que
+con concurrencia también aparecen otros requests: perfilar en un worker sin tráfico.
+Sólo se perfila un request a la vez; si ya hay uno en curso, el header se ignora.
+"""
+import asyncio
+import contextvars
+import cProfile
+import io
+import os
+import pstats
+import threading
+import uuid
+from collections import OrderedDict
+
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "false").lower() in ("1", "true", "yes")
+# Perfiles que se conservan en memoria (los más antiguos se descartan)
+PROFILER_KEEP = int(os.getenv("PROFILER_KEEP", "20"))
+PROFILE_HEADER = b"x-profile"
+
+_profiles = OrderedDict()  # id -> pstats.Stats
+_lock = threading.Lock()
+_busy = False
+_thread_profiles = contextvars.ContextVar("thread_profiles", default=None)
+
+
+def get_profile(profile_id: str, sort: str = "cumulative", limit: int = 50):
+    """Texto de pstats de un perfil guardado, o None si no existe."""
+    with _lock:
+        stats = _profiles.get(profile_id)
+    if stats is None:
+        return None
+    out = io.StringIO()
+    stats.stream = out
+    stats.sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+def _store(profile_id: str, profile: cProfile.Profile, thread_profiles: list) -> None:
+    stats = pstats.Stats(profile)
+    for extra in thread_profiles:
+        stats.add(extra)
+    with _lock:
+        _profiles[profile_id] = stats
+        while len(_profiles) > PROFILER_KEEP:
+            _profiles.popitem(last=False)
+
+
+async def run_in_thread(fn, *args):
+    """
+    Igual que asyncio.to_thread, pero si el request en curso se está perfilando
+    también perfila la función en el hilo y la suma al perfil del request.
+    """
+    profiles = _thread_profiles.get()
+    if profiles is None:
+        return await asyncio.to_thread(fn, *args)
+
+    def profiled():
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(fn, *args)
+        finally:
+            profiles.append(profile)
+
+    return await asyncio.to_thread(profiled)
+
+
+class ProfilerMiddleware:
+    """Middleware ASGI que perfila los requests marcados con el header X-Profile."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _busy
+        if (
+            not PROFILER_ENABLED
+            or scope["type"] != "http"
+            or dict(scope["headers"]).get(PROFILE_HEADER, b"0") in (b"", b"0", b"false")
+            or _busy
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        _busy = True
+        profile_id = uuid.uuid4().hex[:12]
+        thread_profiles = []
+        token = _thread_profiles.set(thread_profiles)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.disable()
+            _thread_profiles.reset(token)
+            _busy = False
+            _store(profile_id, profile, thread_profiles)
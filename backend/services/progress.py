@@ -0,0 +1,28 @@
+"""
+Avance de un cálculo largo (p. ej. la búsqueda por bordes) hacia quien lo sigue, sin pasar un
+callback por todas las capas: el trabajo en segundo plano (core/jobs.py) fija un receptor en el
+contexto y el cálculo llama a report(). asyncio.to_thread copia el contexto, así que también
+funciona desde los hilos del solver. Sin receptor, report() no hace nada.
+
+El receptor puede lanzar una excepción para interrumpir el cálculo (cancelación).
+"""
+import contextvars
+from contextlib import contextmanager
+
+_receiver = contextvars.ContextVar("progress_receiver", default=None)
+
+
+def report(done: int, total: int) -> None:
+    receiver = _receiver.get()
+    if receiver is not None:
+        receiver(done, total)
+
+
+@contextmanager
+def tracking(receiver):
+    """Dentro del bloque, report(done, total) llama a receiver(done, total)."""
+    token = _receiver.set(receiver)
+    try:
+        yield
+    finally:
+        _receiver.reset(token)
@@ -0,0 +1,161 @@
+"""
+Esquema de Neo4j: restricciones de unicidad e índices que usan las consultas de los routers.
+Se aplica al iniciar la app (idempotente) o a mano:
+
+    python -m services.schema          # crea lo que falte y verifica
+    python -m services.schema --check  # sólo verifica e inspecciona los planes (EXPLAIN)
+"""
+import sys
+import logging
+
+from services.neo4j import get_session
+from repositories.neo4j import DELETE_PIECES_BATCH_QUERY
+
+CONSTRAINTS = {
+    "puzzle_id_unique":
+        "CREATE CONSTRAINT puzzle_id_unique IF NOT EXISTS FOR (p:Puzzle) REQUIRE p.puzzleId IS UNIQUE",
+    "piece_id_unique":
+        "CREATE CONSTRAINT piece_id_unique IF NOT EXISTS FOR (piece:Piece) REQUIRE piece.pieceId IS UNIQUE",
+    "assembly_session_id_unique":
+        "CREATE CONSTRAINT assembly_session_id_unique IF NOT EXISTS "
+        "FOR (s:AssemblySession) REQUIRE s.sessionId IS UNIQUE",
+}
+
+INDEXES = {
+    # Búsqueda de piezas por puzzle y número de secuencia
+    "piece_puzzle_sequence":
+        "CREATE INDEX piece_puzzle_sequence IF NOT EXISTS FOR (piece:Piece) ON (piece.puzzleId, piece.sequenceNumber)",
+}
+
+# Consultas frecuentes que deben comenzar con una búsqueda por índice
+HOT_QUERIES = {
+    "puzzle_by_id":
+        "MATCH (p:Puzzle {puzzleId: $puzzle_id}) RETURN p",
+    "pieces_of_puzzle":
+        "MATCH (p:Puzzle {puzzleId: $puzzle_id})-[:HAS_PIECE]->(piece:Piece) RETURN piece",
+    "piece_by_id":
+        "MATCH (p:Puzzle {puzzleId: $puzzle_id})-[:HAS_PIECE]->(piece:Piece {pieceId: $piece_id}) RETURN piece",
+    "piece_by_sequence":
+        "MATCH (piece:Piece {puzzleId: $puzzle_id, sequenceNumber: $seq}) RETURN piece",
+    "pieces_page":
+        "MATCH (p:Puzzle {puzzleId: $puzzle_id})-[:HAS_PIECE]->(piece:Piece) "
+        "WHERE piece.sequenceNumber > $seq RETURN piece ORDER BY piece.sequenceNumber, piece.pieceId LIMIT 100",
+    "piece_neighbors":
+        "MATCH (piece:Piece {pieceId: $piece_id})-[:ADJACENT_TO]-(other:Piece) RETURN other",
+    "assembly_session_by_id":
+        "MATCH (s:AssemblySession {sessionId: $session_id}) RETURN s",
+    # Lotes del borrado de un puzzle: por el índice compuesto, no recorriendo todas las piezas
+    "puzzle_pieces_batch_delete": DELETE_PIECES_BATCH_QUERY,
+}
+
+# Índice compuesto de piezas, tal como aparece en los detalles del plan
+PIECE_SEQUENCE_INDEX = ":Piece(puzzleId, sequenceNumber)"
+# Consultas frecuentes que deben buscar (NodeIndexSeek) en un índice en particular
+REQUIRED_INDEX = {
+    "piece_by_sequence": PIECE_SEQUENCE_INDEX,
+    "puzzle_pieces_batch_delete": PIECE_SEQUENCE_INDEX,
+}
+# Operadores de búsqueda por índice (un NodeIndexScan recorre todo el índice: no cuenta)
+INDEX_SEEK_OPERATORS = ("NodeIndexSeek", "NodeUniqueIndexSeek", "NodeUniqueIndexSeek(Locking)")
+
+BACKFILL_BATCH_SIZE = 10_000
+
+
+def backfill_piece_puzzle_ids(session, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    Copia puzzleId a las piezas creadas antes de que se guardara en el nodo Piece
+    (lo necesita el índice compuesto). Trabaja por lotes; devuelve cuántas actualizó.
+    """
+    total = 0
+    while True:
+        updated = session.execute_write(
+            lambda tx: tx.run(
+                """
+                MATCH (p:Puzzle)-[:HAS_PIECE]->(piece:Piece)
+                WHERE piece.puzzleId IS NULL
+                WITH p, piece LIMIT $batch_size
+                SET piece.puzzleId = p.puzzleId
+                RETURN count(piece) AS updated
+                """,
+                batch_size=batch_size
+            ).single()["updated"]
+        )
+        total += updated
+        if updated < batch_size:
+            return total
+
+
+def missing_schema(session) -> list:
+    """Nombres de restricciones e índices que no existen o no están en línea."""
+    constraints = {rec["name"] for rec in session.run("SHOW CONSTRAINTS YIELD name")}
+    indexes = {
+        rec["name"] for rec in session.run("SHOW INDEXES YIELD name, state")
+        if rec["state"] == "ONLINE"
+    }
+    return [name for name in CONSTRAINTS if name not in constraints] + \
+           [name for name in INDEXES if name not in indexes]
+
+
+def ensure_schema() -> list:
+    """
+    Crea (si no existen) las restricciones e índices, completa puzzleId en piezas antiguas
+    y verifica el resultado. Devuelve la lista de elementos que siguen faltando.
+    """
+    with get_session() as session:
+        for query in list(CONSTRAINTS.values()) + list(INDEXES.values()):
+            session.run(query).consume()
+        session.run("CALL db.awaitIndexes(300)").consume()
+        backfilled = backfill_piece_puzzle_ids(session)
+        if backfilled:
+            logging.info(f"puzzleId agregado a {backfilled} piezas existentes.")
+        missing = missing_schema(session)
+
+    for name in missing:
+        logging.error(f"❌ Falta en el esquema de Neo4j: {name}")
+    if not missing:
+        logging.info("✅ Restricciones e índices de Neo4j verificados.")
+    return missing
+
+
+def plan_uses_index_seek(plan: dict, index: str = None) -> bool:
+    """
+    True si algún operador del plan (EXPLAIN) es una búsqueda por índice. Con `index`
+    (p. ej. PIECE_SEQUENCE_INDEX) tiene que ser un NodeIndexSeek sobre ese índice.
+    """
+    operator = plan.get("operatorType", "").split("@")[0]
+    if index is None:
+        if operator in INDEX_SEEK_OPERATORS:
+            return True
+    elif operator == "NodeIndexSeek" and index in str((plan.get("arguments") or {}).get("Details", "")):
+        return True
+    return any(plan_uses_index_seek(child, index) for child in plan.get("children", []))
+
+
+def check_index_usage() -> dict:
+    """
+    Ejecuta EXPLAIN sobre las consultas frecuentes: {nombre: usa búsqueda por índice}
+    (por el índice de REQUIRED_INDEX, si la consulta tiene uno).
+    """
+    params = {"puzzle_id": "", "piece_id": "", "session_id": "", "seq": 0, "batch_size": 1}
+    with get_session() as session:
+        return {
+            name: plan_uses_index_seek(
+                session.run("EXPLAIN " + query, params).consume().plan or {}, REQUIRED_INDEX.get(name)
+            )
+            for name, query in HOT_QUERIES.items()
+        }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    if "--check" in sys.argv:
+        with get_session() as session:
+            missing = missing_schema(session)
+        for name in missing:
+            logging.error(f"❌ Falta en el esquema de Neo4j: {name}")
+    else:
+        missing = ensure_schema()
+    usage = check_index_usage()
+    for name, seek in usage.items():
+        (logging.info if seek else logging.error)(f"{'✅' if seek else '❌'} {name}: {'index seek' if seek else 'sin índice'}")
+    sys.exit(1 if missing or not all(usage.values()) else 0)
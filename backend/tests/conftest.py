@@ -0,0 +1,73 @@
+import os
+import sys
+
+import pytest
+
+# Sin Neo4j disponible, la API de los tests usa el repositorio en memoria
+# (PUZZLE_REPOSITORY=neo4j para correrlos contra una base real)
+os.environ.setdefault("PUZZLE_REPOSITORY", "memory")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def reset_state() -> None:
+    """Descarta el repositorio, los caches y los trabajos globales que deja un test."""
+    from core import jobs, singleflight
+    from core.cache import solution_cache, structured_cache
+    from core.incremental import incremental_solutions
+    from repositories import set_repository
+
+    set_repository(None)
+    solution_cache.clear()
+    structured_cache.clear()
+    incremental_solutions.clear()
+    singleflight.clear_all()
+    jobs.set_job_manager(None)
+
+
+@pytest.fixture
+def repository():
+    """Repositorio en memoria vacío, instalado como el global durante el test."""
+    from repositories import set_repository
+    from repositories.memory import MemoryRepository
+
+    reset_state()
+    repo = MemoryRepository()
+    set_repository(repo)
+    yield repo
+    reset_state()
+
+
+@pytest.fixture
+def app(repository):
+    """La API (sin middlewares ni arranque) sobre el repositorio del test."""
+    from fastapi import FastAPI
+    from routers import admin, assembly, pieces, puzzles, solver
+
+    app = FastAPI()
+    for module in (puzzles, pieces, assembly, solver, admin):
+        app.include_router(module.router)
+    return app
+
+
+@pytest.fixture
+def client(app):
+    from fastapi.testclient import TestClient
+
+    # Un solo event loop para todo el test: los trabajos en segundo plano siguen corriendo
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def create_puzzle(client):
+    """Crea un puzzle (regular de una fila por defecto) con sus piezas; devuelve (id, piezas creadas)."""
+    def create(pieces=(), **fields):
+        pid = client.post("/puzzles/", json={
+            "puzzleTypeIsRegular": True, "puzzleTheme": "t", "puzzleBrand": "b",
+            "puzzlePieceQty": len(pieces) or 1, "puzzleMaterial": "m", "row_size": len(pieces) or 1,
+            **fields,
+        }).json()["puzzleId"]
+        created = client.post(f"/puzzle/{pid}/pieces/bulk", json=list(pieces)).json() if pieces else []
+        return pid, created
+    return create
@@ -0,0 +1,66 @@
+import os, sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import pytest
+from repositories import base, set_repository
+from repositories.memory import MemoryRepository
+
+
+class OrphansRepository(MemoryRepository):
+    """Repositorio en memoria con piezas huérfanas simuladas (como quedan en Neo4j)."""
+
+    def __init__(self, orphans: int):
+        super().__init__()
+        self.orphans = orphans
+        self.batches = []
+
+    async def count_orphan_pieces(self) -> int:
+        return self.orphans
+
+    async def purge_orphan_pieces(self, batch_size: int = None) -> int:
+        n = min(batch_size, self.orphans)
+        self.orphans -= n
+        self.batches.append(n)
+        return n
+
+
+@pytest.fixture
+def orphans(repository):
+    """El repositorio del test reemplazado por uno con 25 piezas huérfanas."""
+    repo = OrphansRepository(25)
+    set_repository(repo)
+    return repo
+
+
+def _wait(client, job_id):
+    for _ in range(200):
+        job = client.get(f"/admin/jobs/{job_id}").json()
+        if job["status"] == "done":
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"el trabajo quedó en {job['status']}")
+
+
+def test_purge_runs_in_background_by_batches(client, orphans):
+    assert client.get("/admin/orphans").json() == {"count": 25}
+    started = client.post("/admin/orphans/purge?batch_size=10")
+    assert started.status_code == 202
+    job_id = started.json()["jobId"]
+    assert started.headers["location"] == f"/admin/jobs/{job_id}"
+
+    job = _wait(client, job_id)
+    assert job["kind"] == "purge_orphans"
+    assert job["result"] == {"deleted": 25, "batches": 3}
+    assert job["progress"] == {"done": 25, "total": 25}
+    assert orphans.batches == [10, 10, 5]
+    # Los trabajos de mantenimiento no aparecen como trabajos del solver
+    assert client.get(f"/solver/jobs/{job_id}").status_code == 404
+
+
+def test_delete_puzzle_removes_its_pieces(client, create_puzzle, monkeypatch):
+    pid, _ = create_puzzle([{"sequenceNumber": n, "pieceOrientation": 0, "group": 1} for n in range(1, 6)])
+    monkeypatch.setattr(base, "DELETE_BATCH_SIZE", 2)
+    assert client.delete(f"/puzzles/{pid}").status_code == 204
+    assert client.get(f"/puzzles/{pid}").status_code == 404
+    assert client.get("/admin/orphans").json() == {"count": 0}
@@ -0,0 +1,78 @@
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core import assembly
+
+
+def _puzzle(create_puzzle, regular=True):
+    return create_puzzle(
+        [{"sequenceNumber": n, "pieceOrientation": 0, "group": 1 + n % 3} for n in range(1, 13)],
+        puzzleTypeIsRegular=regular, row_size=3,
+    )[0]
+
+
+def test_unfinished_range_skips_completed_blocks():
+    summary = {"mode": "regular", "columns": 4, "groups": [], "groupSizes": []}
+    assert assembly.blocks(summary, 10) == [(1, 0, 4), (2, 4, 8), (3, 8, 10)]
+    assert assembly.unfinished_range(summary, 10, [2], 2, 3) == ([2, 3, 8], 9)
+    assert assembly.unfinished_range(summary, 10, [2], 9, 3) == ([9], None)
+    assert assembly.unfinished_range(summary, 10, [1, 3], 0, 4) == ([4, 5, 6, 7], None)
+    # Un límite justo en el final de un bloque sigue desde el próximo pendiente
+    assert assembly.unfinished_range(summary, 10, [2], 0, 4) == ([0, 1, 2, 3], 8)
+
+    groups = {"mode": "irregular", "columns": None, "groups": [1, 2, 3], "groupSizes": [2, 3, 1]}
+    assert assembly.unfinished_range(groups, 6, [2], 0, 10) == ([0, 1, 5], None)
+    assert assembly.progress(groups, 6, [2, 9]) == {
+        "blocks": 3, "completedBlocks": 1, "steps": 6, "remainingSteps": 3,
+    }
+
+
+def test_session_tracks_rows_and_serves_next_steps(client, create_puzzle):
+    pid = _puzzle(create_puzzle)
+    created = client.post(f"/solver/{pid}/sessions")
+    assert created.status_code == 201
+    session = created.json()
+    sid = session["sessionId"]
+    assert created.headers["location"] == f"/solver/sessions/{sid}"
+    assert (session["blockKind"], session["cursor"], session["completed"]) == ("row", 0, [])
+    assert session["progress"] == {"blocks": 3, "completedBlocks": 0, "steps": 12, "remainingSteps": 12}
+    assert session["summary"]["text"].startswith("Rompecabezas regular")
+
+    page = client.get(f"/solver/sessions/{sid}/next", params={"limit": 3}).json()
+    assert page["steps"]["position"] == [0, 1, 2] and page["nextCursor"] == 3
+    assert page["steps"]["text"][0].startswith("Pieza 1:")
+
+    updated = client.patch(f"/solver/sessions/{sid}", json={"complete": [1, 2], "cursor": 3}).json()
+    assert updated["completed"] == [1, 2]
+    assert updated["progress"]["remainingSteps"] == 4
+    page = client.get(f"/solver/sessions/{sid}/next", params={"limit": 10, "text": False}).json()
+    assert page["after"] == 3
+    assert page["steps"]["seq"] == [9, 10, 11, 12] and "text" not in page["steps"]
+    assert page["nextCursor"] is None
+
+    # El avance queda en el backend: otra lectura (u otro cliente) lo ve
+    reopened = client.patch(f"/solver/sessions/{sid}", json={"reopen": [2], "cursor": 0}).json()
+    assert reopened["completed"] == [1]
+    assert client.get(f"/solver/sessions/{sid}/next", params={"limit": 1}).json()["steps"]["seq"] == [5]
+    assert [s["sessionId"] for s in client.get(f"/solver/{pid}/sessions").json()] == [sid]
+
+    assert client.patch(f"/solver/sessions/{sid}", json={"complete": [7]}).status_code == 400
+    assert client.patch(f"/solver/sessions/{sid}", json={"cursor": 13}).status_code == 400
+    assert client.get("/solver/sessions/x/next").status_code == 404
+    assert client.post("/solver/x/sessions").status_code == 404
+
+    assert client.delete(f"/solver/sessions/{sid}").status_code == 204
+    assert client.get(f"/solver/sessions/{sid}").status_code == 404
+
+
+def test_irregular_sessions_use_groups_and_go_with_the_puzzle(client, create_puzzle):
+    pid = _puzzle(create_puzzle, regular=False)
+    sid = client.post(f"/solver/{pid}/sessions").json()["sessionId"]
+    session = client.patch(f"/solver/sessions/{sid}", json={"complete": [1, 3]}).json()
+    assert session["blockKind"] == "group"
+    assert session["progress"] == {"blocks": 3, "completedBlocks": 2, "steps": 12, "remainingSteps": 4}
+    page = client.get(f"/solver/sessions/{sid}/next").json()
+    assert page["steps"]["group"] == [2, 2, 2, 2] and page["steps"]["seq"] == [1, 4, 7, 10]
+
+    client.delete(f"/puzzles/{pid}")
+    assert client.get(f"/solver/sessions/{sid}").status_code == 404
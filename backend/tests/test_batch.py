@@ -0,0 +1,14 @@
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from models.solution import SOLVER_BATCH_MAX_PUZZLES
+
+
+def test_batch_rejects_unknown_engines_and_too_many_puzzles(client):
+    assert client.post("/solver/batch", json={"puzzleIds": ["a"], "engine": "gpu"}).status_code == 422
+    too_many = [str(n) for n in range(SOLVER_BATCH_MAX_PUZZLES + 1)]
+    assert client.post("/solver/batch", json={"puzzleIds": too_many}).status_code == 422
+
+    resp = client.post("/solver/batch", json={"puzzleIds": ["none"], "engine": "numpy"})
+    assert resp.status_code == 200
+    assert resp.json() == {"puzzleId": "none", "error": "Puzzle no encontrado."}
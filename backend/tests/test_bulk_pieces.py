@@ -0,0 +1,74 @@
+import os, sys
+import asyncio
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import pytest
+from core.solver import solution_cache
+from repositories import get_repository
+
+
+@pytest.fixture
+def puzzle(create_puzzle):
+    return create_puzzle(
+        [{"sequenceNumber": seq, "pieceOrientation": 0, "group": 1} for seq in (1, 2, 3, 3)], row_size=2
+    )
+
+
+def test_bulk_update_by_id_and_sequence(client, puzzle):
+    pid, created = puzzle
+    solution_cache.put(pid, 2, "vieja")
+    resp = client.patch(f"/puzzle/{pid}/pieces/bulk", json=[
+        {"pieceId": created[0]["pieceId"], "status": "missing"},
+        {"sequenceNumber": 3, "pieceOrientation": 90},
+        {"sequenceNumber": 9, "group": 2},
+    ])
+    assert resp.status_code == 200, resp.text
+    results = resp.json()
+    assert [r["matched"] for r in results] == [1, 2, 0]
+    assert results[0]["pieces"][0]["status"] == "missing"
+    assert {p["pieceOrientation"] for p in results[1]["pieces"]} == {90}
+    assert (results[2]["sequenceNumber"], results[2]["pieceId"]) == (9, None)
+    # Una sola escritura: la versión sube una vez y la caché se invalida
+    assert asyncio.run(get_repository().get_puzzle_version(pid)) == 2
+    assert solution_cache.get(pid, 2) is None
+
+
+def test_bulk_update_rejects_bad_items(client, puzzle):
+    pid, created = puzzle
+    url = f"/puzzle/{pid}/pieces/bulk"
+    assert client.patch(url, json=[{"sequenceNumber": 1}]).status_code == 400
+    assert client.patch(url, json=[{"group": 1}]).status_code == 422
+    assert client.patch(url, json=[{"pieceId": created[0]["pieceId"], "sequenceNumber": 1, "group": 1}]).status_code == 422
+
+
+def test_bulk_delete_counts_each_selector(client, puzzle):
+    pid, created = puzzle
+    resp = client.request("DELETE", f"/puzzle/{pid}/pieces/bulk", json={
+        "pieceIds": [created[2]["pieceId"]], "sequenceNumbers": [3, 1, 7],
+    })
+    assert resp.status_code == 200, resp.text
+    assert [r["matched"] for r in resp.json()] == [1, 2, 1, 0]
+    assert [p["sequenceNumber"] for p in client.get(f"/puzzle/{pid}/pieces/").json()] == [2]
+
+
+
+def test_bulk_create_writes_every_batch_in_order(client, create_puzzle, repository, monkeypatch):
+    pid, _ = create_puzzle()
+    batches = []
+    create_pieces = repository.create_pieces
+
+    async def recorded(puzzle_id, pieces):
+        batches.append([p["sequenceNumber"] for p in pieces])
+        return await create_pieces(puzzle_id, pieces)
+
+    monkeypatch.setattr(repository, "create_pieces", recorded)
+    seqs = [7, 3, 5, 1, 6, 2, 4]
+    resp = client.post(f"/puzzle/{pid}/pieces/bulk", params={"batch_size": 3}, json=[
+        {"sequenceNumber": seq, "pieceOrientation": 0, "group": 1} for seq in seqs
+    ])
+    assert resp.status_code == 200, resp.text
+    # El último lote incompleto también se escribe; el orden de entrada se conserva
+    assert batches == [[7, 3, 5], [1, 6, 2], [4]]
+    assert [p["sequenceNumber"] for p in resp.json()] == seqs
+    assert resp.headers["Server-Timing"].count("batch") == 3
+    assert client.get(f"/puzzle/{pid}/pieces/count").json() == {"count": 7}
@@ -0,0 +1,57 @@
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.cache import SolutionCache
+
+
+def test_hit_and_miss_by_version():
+    cache = SolutionCache()
+    cache.put("a", 1, ["x"])
+    assert cache.get("a", 1) == ["x"]
+    assert cache.get("a", 2) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_new_version_replaces_old_one():
+    cache = SolutionCache()
+    cache.put("a", 1, ["x"])
+    cache.put("a", 2, ["y"])
+    assert cache.get("a", 1) is None
+    assert cache.stats()["entries"] == 1
+
+
+def test_late_older_version_does_not_evict_newer_one():
+    cache = SolutionCache()
+    cache.put("a", 3, ["nueva"])
+    cache.put("a", 2, ["vieja"])
+    assert cache.get("a", 3) == ["nueva"]
+    assert cache.get("a", 2) is None
+
+
+def test_lru_eviction_and_memory_cap():
+    cache = SolutionCache(max_entries=2)
+    cache.put("a", 0, ["a"])
+    cache.put("b", 0, ["b"])
+    cache.get("a", 0)
+    cache.put("c", 0, ["c"])
+    assert cache.get("b", 0) is None
+    assert cache.get("a", 0) == ["a"]
+    assert cache.evictions == 1
+
+    small = SolutionCache(max_bytes=500)
+    small.put("big", 0, ["z" * 1000])
+    assert small.get("big", 0) is None
+
+
+def test_ttl_expiration():
+    cache = SolutionCache(ttl_seconds=-1)
+    cache.put("a", 0, ["x"])
+    assert cache.get("a", 0) is None
+
+
+def test_invalidate():
+    cache = SolutionCache()
+    cache.put("a", 3, ["x"])
+    cache.invalidate("a")
+    assert cache.get("a", 3) is None
+    assert cache.stats()["bytes"] == 0
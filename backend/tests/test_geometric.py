@@ -0,0 +1,71 @@
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import pytest
+from benchmarks.synthetic import synthetic_edges, puzzle_payload
+from core.geometric import edges_solution, rotate
+from core.solver import solve_loaded
+from core.steps import UnsolvablePuzzle
+
+
+def _assert_valid(puzzle, pieces, steps):
+    cols = puzzle["row_size"]
+    rows = puzzle["puzzlePieceQty"] // cols
+    by_seq = {p["sequenceNumber"]: p for p in pieces}
+    grid = {(s.row, s.col): rotate(by_seq[s.seq]["edges"], s.orientation // 90) for s in steps}
+    assert len(grid) == rows * cols
+    assert sorted(s.seq for s in steps) == sorted(by_seq)
+    for (r, c), (top, right, bottom, left) in grid.items():
+        assert (top == 0) == (r == 1) and (left == 0) == (c == 1)
+        assert (bottom == 0) == (r == rows) and (right == 0) == (c == cols)
+        if c < cols:
+            assert right + grid[(r, c + 1)][3] == 0
+        if r < rows:
+            assert bottom + grid[(r + 1, c)][0] == 0
+
+
+def test_rotate_moves_edges_clockwise():
+    assert rotate([1, 2, 3, 4], 1) == (4, 1, 2, 3)
+    assert rotate([1, 2, 3, 4], 4) == (1, 2, 3, 4)
+
+
+@pytest.mark.parametrize("n, profiles", [(36, None), (400, None), (400, 64)])
+def test_solves_shuffled_rotated_pieces(n, profiles):
+    puzzle, pieces = synthetic_edges(n, profiles, seed=3)
+    summary, steps = edges_solution(puzzle, pieces)
+    steps = list(steps)
+    assert summary["mode"] == "edges" and summary["rows"] * summary["columns"] == len(pieces)
+    _assert_valid(puzzle, pieces, steps)
+
+
+def test_rejects_incomplete_or_inconsistent_sets():
+    puzzle, pieces = synthetic_edges(16)
+    with pytest.raises(UnsolvablePuzzle):
+        edges_solution(puzzle, pieces[:-1])
+    broken = [dict(p) for p in pieces]
+    broken[0]["edges"] = [0, 0, 0, 0]
+    with pytest.raises(UnsolvablePuzzle):
+        edges_solution(puzzle, broken)
+    with pytest.raises(UnsolvablePuzzle):
+        edges_solution(puzzle, [{**p, "status": "missing"} if i == 0 else p for i, p in enumerate(pieces)])
+
+
+def test_edges_mode_through_the_api(client, create_puzzle):
+    puzzle, loose = synthetic_edges(25, seed=1)
+    pid, created = create_puzzle(loose, **puzzle_payload(puzzle))
+    assert len(created) == 25
+
+    instructions = client.get(f"/solver/{pid}").json()
+    assert instructions == solve_loaded(puzzle, loose)
+    assert instructions[0].startswith("Rompecabezas armado por la forma de los bordes: 5 filas x 5 columnas")
+    assert len(instructions) == 26
+
+    structured = client.get(f"/solver/{pid}/structured").json()
+    assert structured["summary"]["mode"] == "edges"
+    assert sorted(structured["steps"]["seq"]) == list(range(1, 26))
+    events = client.get(f"/solver/{pid}/stream", params={"by": "block"}).text.splitlines()
+    assert len(events) == 1 + 5 + 1  # resumen, una fila por evento y fin
+
+    piece_id = client.get(f"/puzzle/{pid}/pieces/").json()[0]["pieceId"]
+    client.patch(f"/puzzle/{pid}/pieces/{piece_id}", json={"status": "missing"})
+    assert client.get(f"/solver/{pid}").status_code == 400
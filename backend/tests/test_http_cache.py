@@ -0,0 +1,81 @@
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from services.compression import CompressionMiddleware, choose_encoding
+from services.http_cache import matching_etag
+
+
+@pytest.fixture
+def client(app):
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+    with TestClient(app) as client:
+        yield client
+
+
+def test_etag_matching_ignores_encoding_suffix_and_weakness():
+    assert matching_etag('"a", W/"b-gzip"', '"b"') == 'W/"b-gzip"'
+    assert matching_etag("*", '"x"') == "*"
+    assert matching_etag('"a-br"', '"b"') is None
+    assert matching_etag(None, '"b"') is None
+
+
+def test_encoding_negotiation():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0, identity") is None
+    assert choose_encoding("") is None
+    assert choose_encoding("*") in ("br", "gzip")
+
+
+def test_solution_revalidates_with_304_until_a_write(client, create_puzzle):
+    pid, created = create_puzzle(
+        [{"sequenceNumber": n, "pieceOrientation": 0, "group": 1} for n in range(1, 41)], row_size=8
+    )
+
+    first = client.get(f"/solver/{pid}", headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    etag = first.headers["etag"]
+    assert etag.endswith('-gzip"')
+
+    again = client.get(f"/solver/{pid}", headers={"If-None-Match": etag})
+    assert (again.status_code, again.headers["etag"], again.content) == (304, etag, b"")
+    # Otra representación (query distinta) no comparte el ETag
+    assert client.get(f"/solver/{pid}/structured", headers={"If-None-Match": etag}).status_code == 200
+
+    pieces_etag = client.get(f"/puzzle/{pid}/pieces/", params={"fields": "status"}).headers["etag"]
+    assert client.get(f"/puzzle/{pid}/pieces/", params={"fields": "status"},
+                      headers={"If-None-Match": pieces_etag}).status_code == 304
+
+    client.patch(f"/puzzle/{pid}/pieces/{created[0]['pieceId']}", json={"status": "missing"})
+    assert client.get(f"/solver/{pid}", headers={"If-None-Match": etag}).status_code == 200
+    assert client.get(f"/puzzle/{pid}/pieces/", params={"fields": "status"},
+                      headers={"If-None-Match": pieces_etag}).status_code == 200
+
+
+def test_streaming_and_small_responses_are_not_compressed():
+    app = FastAPI()
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("ok")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter(["x" * 500, "y" * 500]), media_type="application/x-ndjson")
+
+    @app.get("/big")
+    def big():
+        return PlainTextResponse("z" * 5000)
+
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+    client = TestClient(app)
+    headers = {"Accept-Encoding": "gzip"}
+    assert "content-encoding" not in client.get("/small", headers=headers).headers
+    assert "content-encoding" not in client.get("/stream", headers=headers).headers
+    resp = client.get("/big", headers=headers)
+    assert resp.headers["content-encoding"] == "gzip" and resp.text == "z" * 5000
+    assert int(resp.headers["content-length"]) < 100
@@ -0,0 +1,111 @@
+import os, sys
+import asyncio
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.importer import iter_lines, iter_piece_rows
+
+
+async def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def _collect(data: bytes, fmt: str, size: int = 7):
+    async def run():
+        return [row async for row in iter_piece_rows(iter_lines(_chunks(data, size)), fmt)]
+    return asyncio.run(run())
+
+
+def test_iter_lines_across_chunk_boundaries():
+    async def run():
+        return [l async for l in iter_lines(_chunks("uno\r\ndós\ntres".encode(), 3))]
+    assert asyncio.run(run()) == ["uno", "dós", "tres"]
+
+
+def test_ndjson_rows_validated_lazily():
+    data = (
+        b'{"sequenceNumber": 1, "pieceOrientation": 0, "group": 1}\n'
+        b'{"sequenceNumber": "x", "pieceOrientation": 0, "group": 1}\n'
+        b'\n'
+        b'{"sequenceNumber": 3, "pieceOrientation": 90, "group": 2, "status": "missing"}\n'
+    )
+    rows = _collect(data, "ndjson")
+    assert [r[0] for r in rows] == [1, 2, 4]
+    assert rows[0][1] == {"sequenceNumber": 1, "pieceOrientation": 0, "group": 1, "status": "present"}
+    assert rows[1][1] is None and rows[1][2]
+    assert rows[2][1]["status"] == "missing"
+
+
+def test_csv_rows_use_header_and_defaults():
+    data = b"sequenceNumber,pieceOrientation,group,status\n1,90,1,\n2,180,3,missing\n"
+    rows = _collect(data, "csv")
+    assert [r[1] for r in rows] == [
+        {"sequenceNumber": 1, "pieceOrientation": 90, "group": 1, "status": "present"},
+        {"sequenceNumber": 2, "pieceOrientation": 180, "group": 3, "status": "missing"},
+    ]
+
+
+def test_invalid_utf8_lines_are_reported_and_skipped():
+    data = (
+        b'\xef\xbb\xbf{"sequenceNumber": 1, "pieceOrientation": 0, "group": 1}\n'
+        b'{"sequenceNumber": 2, "group": "\xff"}\n'
+        b'{"sequenceNumber": 3, "pieceOrientation": 0, "group": 1}\n'
+    )
+    rows = _collect(data, "ndjson", size=5)
+    assert [(r[0], r[1] and r[1]["sequenceNumber"]) for r in rows] == [(1, 1), (2, None), (3, 3)]
+    assert "UTF-8" in rows[1][2]
+
+
+def test_csv_quoted_fields_may_span_lines():
+    data = (
+        b'sequenceNumber,pieceOrientation,group,status\n'
+        b'1,90,1,"pres\nent"\n'
+        b'2,180,3,"missing"\n'
+        b'3,0,1,"sin cerrar\n'
+        b'4,0,1,\n'
+    )
+    rows = _collect(data, "csv", size=4)
+    assert [r[0] for r in rows] == [2, 4, 5]
+    # El salto de línea queda dentro de la celda
+    assert rows[0][1]["status"] == "pres\nent"
+    assert rows[1][1]["status"] == "missing"
+    assert rows[2][1] is None and "comillas" in rows[2][2]
+
+
+def test_import_reports_failures_and_invalidates_written_batches(client, create_puzzle, repository, monkeypatch):
+    from core.solver import solution_cache
+
+    pid, _ = create_puzzle()
+    create_pieces = repository.create_pieces
+
+    async def fail_second_batch(puzzle_id, pieces):
+        if repository._pieces[puzzle_id]:
+            raise RuntimeError("sin conexión")
+        return await create_pieces(puzzle_id, pieces)
+
+    monkeypatch.setattr(repository, "create_pieces", fail_second_batch)
+    solution_cache.put(pid, 1, "vieja")
+    body = b"".join(b'{"sequenceNumber": %d, "pieceOrientation": 0, "group": 1}\n' % n for n in range(1, 6))
+    resp = client.post(f"/puzzle/{pid}/pieces/import", params={"batch_size": 2}, content=body + b"\xff\n")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert lines[0]["created"] == 2
+    assert lines[-1] == {"done": False, "error": "sin conexión", "rows": 4, "created": 2, "errors": 0}
+    assert solution_cache.get(pid, 1) is None
+
+
+def test_oversized_lines_are_reported_and_skipped():
+    data = (
+        b'{"sequenceNumber": 1, "pieceOrientation": 0, "group": 1}\n'
+        + b'{"sequenceNumber": 2, "puzzleTheme": "' + b"x" * 100 + b'"}\n'
+        + b'{"sequenceNumber": 3, "pieceOrientation": 0, "group": 1}\n'
+        + b"y" * 100
+    )
+
+    async def run():
+        lines = iter_lines(_chunks(data, 7), max_line_bytes=64)
+        return [row async for row in iter_piece_rows(lines, "ndjson")]
+
+    rows = asyncio.run(run())
+    assert [(r[0], r[1] and r[1]["sequenceNumber"]) for r in rows] == [(1, 1), (2, None), (3, 3), (4, None)]
+    assert "64 bytes" in rows[1][2] and "64 bytes" in rows[3][2]
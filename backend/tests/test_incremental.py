@@ -0,0 +1,72 @@
+import os, sys
+import random
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import core.solver as solver
+from core.incremental import IncrementalSolution
+
+
+def _pieces(n, groups=3, seed=0):
+    rnd = random.Random(seed)
+    return [
+        {
+            "pieceId": f"id-{i}",
+            "sequenceNumber": i,
+            "pieceOrientation": rnd.choice([0, 90, 180, 270]),
+            "group": rnd.randint(1, groups),
+            "status": rnd.choice(["present", "present", "missing"]),
+        }
+        for i in range(1, n + 1) if i % 7
+    ]
+
+
+@pytest.mark.parametrize("regular", [True, False])
+def test_updates_match_full_solve(regular):
+    puzzle = {"puzzleTypeIsRegular": regular, "puzzlePieceQty": 40, "row_size": 5}
+    pieces = _pieces(40)
+    solve = solver.solve_regular if regular else solver.solve_irregular
+    inc = IncrementalSolution(puzzle, pieces, version=0)
+    assert inc.instructions() == solve(puzzle, pieces)
+
+    rnd = random.Random(1)
+    for version in range(1, 30):
+        piece = rnd.choice(pieces)
+        piece.update(
+            status=rnd.choice(["present", "missing"]),
+            pieceOrientation=rnd.choice([0, 90, 180, 270]),
+            group=rnd.randint(1, 4),
+        )
+        inc.apply_piece_update(dict(piece), version)
+        assert inc.instructions() == solve(puzzle, pieces)
+
+
+def test_single_update_touches_only_affected_lines():
+    puzzle = {"puzzleTypeIsRegular": True, "puzzlePieceQty": 12, "row_size": 3}
+    pieces = [
+        {"pieceId": f"id-{i}", "sequenceNumber": i, "pieceOrientation": 0, "group": 1, "status": "present"}
+        for i in range(1, 13)
+    ]
+    inc = IncrementalSolution(puzzle, pieces, version=4)
+    changed = inc.apply_piece_update({"pieceId": "id-5", "sequenceNumber": 5, "status": "missing"}, 5)
+    assert changed == ["piece:5", "summary"]
+
+    diff = inc.changes_since(4)
+    assert [c["key"] for c in diff] == ["piece:5", "summary"]
+    assert "marcada como faltante" in diff[0]["text"]
+    assert inc.changes_since(5) == []
+    assert inc.changes_since(3) is None
+
+
+def test_group_change_moves_piece_and_headers():
+    puzzle = {"puzzleTypeIsRegular": False, "puzzlePieceQty": 2}
+    pieces = [
+        {"pieceId": "a", "sequenceNumber": 1, "pieceOrientation": 0, "group": 1, "status": "present"},
+        {"pieceId": "b", "sequenceNumber": 2, "pieceOrientation": 0, "group": 2, "status": "present"},
+    ]
+    inc = IncrementalSolution(puzzle, pieces, version=0)
+    inc.apply_piece_update({"pieceId": "b", "sequenceNumber": 2, "group": 1}, 1)
+    diff = {c["key"]: c["text"] for c in inc.changes_since(0)}
+    assert diff["group:2"] is None
+    assert diff["group:1"] == "Grupo 1 (2 piezas):"
+    assert diff["summary"].startswith("Rompecabezas irregular dividido en 1 grupos")
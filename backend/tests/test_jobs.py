@@ -0,0 +1,128 @@
+import os, sys
+import asyncio
+import json
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import pytest
+from benchmarks.synthetic import synthetic_edges, synthetic_regular, puzzle_payload
+from core import jobs
+from core.cache import solution_cache
+
+
+@pytest.fixture
+def create(create_puzzle):
+    """Crea un puzzle sintético (puzzle, piezas) y devuelve su id."""
+    return lambda puzzle, loose: create_puzzle(loose, **puzzle_payload(puzzle))[0]
+
+
+def _wait(client, job_id, status="done"):
+    for _ in range(200):
+        job = client.get(f"/solver/jobs/{job_id}").json()
+        if job["status"] == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"el trabajo quedó en {job['status']}")
+
+
+def test_job_solves_in_background_and_coalesces(client, create):
+    pid = create(*synthetic_regular(100))
+    created = client.post(f"/solver/{pid}/jobs")
+    assert created.status_code == 202
+    job = created.json()
+    assert created.headers["location"] == f"/solver/jobs/{job['jobId']}"
+    assert job["coalesced"] is False
+
+    _wait(client, job["jobId"])
+    assert client.get(f"/solver/jobs/{job['jobId']}/result").json() == client.get(f"/solver/{pid}").json()
+    again = client.post(f"/solver/{pid}/jobs").json()
+    assert (again["jobId"], again["coalesced"]) == (job["jobId"], True)
+    assert client.post("/solver/none/jobs").status_code == 404
+
+
+def test_admission_control_and_cancellation(client, create, monkeypatch):
+    jobs.set_job_manager(jobs.JobManager(workers=1, queue_size=2))
+    gate = asyncio.Event()
+
+    async def slow_solve(puzzle_id, engine=None, version=None, shared=True):
+        await gate.wait()
+        return version, ["listo"]
+
+    monkeypatch.setattr(jobs, "solve_puzzle_versioned", slow_solve)
+    ids = [create(*synthetic_regular(4, seed)) for seed in range(3)]
+    running = client.post(f"/solver/{ids[0]}/jobs").json()["jobId"]
+    queued = client.post(f"/solver/{ids[1]}/jobs").json()["jobId"]
+    full = client.post(f"/solver/{ids[2]}/jobs")
+    assert full.status_code == 429 and full.headers["retry-after"]
+
+    assert client.get(f"/solver/jobs/{queued}/result").status_code == 202
+    assert client.delete(f"/solver/jobs/{queued}").json()["status"] == "cancelled"
+    assert client.post(f"/solver/{ids[2]}/jobs").status_code == 202
+
+    # En curso: sin reportes de avance sigue calculando; el resultado se descarta al terminar
+    _wait(client, running, "running")
+    assert client.delete(f"/solver/jobs/{running}").json()["status"] == "cancelling"
+    assert client.get("/solver/jobs").json()["stats"]["running"] == 1
+    client.portal.call(gate.set)
+    _wait(client, running, "cancelled")
+    assert client.get(f"/solver/jobs/{running}/result").status_code == 409
+    assert client.get("/solver/jobs").json()["stats"]["rejected"] == 1
+
+
+def test_edges_search_reports_progress_and_stops_when_cancelled(client, create):
+    # Pocos perfiles distintos: la búsqueda retrocede mucho y no termina pronto
+    pid = create(*synthetic_edges(400, profiles=2, seed=1))
+    job_id = client.post(f"/solver/{pid}/jobs").json()["jobId"]
+    for _ in range(500):
+        job = client.get(f"/solver/jobs/{job_id}").json()
+        if job["progress"]:
+            break
+        time.sleep(0.01)
+    assert job["status"] == "running" and job["progress"]["total"] == 400
+
+    client.delete(f"/solver/jobs/{job_id}")
+    _wait(client, job_id, "cancelled")
+
+
+def test_events_follow_the_job_until_it_finishes(client, create, monkeypatch):
+    gate = asyncio.Event()
+
+    async def slow_solve(puzzle_id, engine=None, version=None, shared=True):
+        await gate.wait()
+        return version, ["listo"]
+
+    monkeypatch.setattr(jobs, "solve_puzzle_versioned", slow_solve)
+    pid = create(*synthetic_regular(4))
+    job_id = client.post(f"/solver/{pid}/jobs").json()["jobId"]
+    # El cliente de pruebas lee la respuesta completa: el trabajo se libera desde otro hilo
+    threading.Timer(0.1, client.portal.call, (gate.set,)).start()
+    lines = [json.loads(line) for line in client.get(f"/solver/jobs/{job_id}/events").text.splitlines()]
+    assert [e["status"] for e in lines] == ["running", "done"]
+    assert client.get(f"/solver/jobs/{job_id}/result").json() == ["listo"]
+
+
+def test_job_takes_the_version_it_actually_solved(client, create, monkeypatch):
+    async def solve_later_version(puzzle_id, engine=None, version=None, shared=True):
+        return version + 1, ["listo"]
+
+    monkeypatch.setattr(jobs, "solve_puzzle_versioned", solve_later_version)
+    pid = create(*synthetic_regular(4))
+    job = client.post(f"/solver/{pid}/jobs").json()
+    done = _wait(client, job["jobId"])
+    assert done["version"] == job["version"] + 1
+
+
+def test_old_results_are_dropped_over_the_byte_limit(client, create):
+    jobs.set_job_manager(jobs.JobManager(max_result_bytes=1))
+    first, second = (create(*synthetic_regular(16, seed)) for seed in range(2))
+    first_job = client.post(f"/solver/{first}/jobs").json()["jobId"]
+    _wait(client, first_job)
+    second_job = client.post(f"/solver/{second}/jobs").json()["jobId"]
+    _wait(client, second_job)
+    assert [job.result is None for job in jobs.get_job_manager().get_all()] == [True, True]
+
+    # Sin copia propia, el resultado sale del cache de soluciones de esa versión
+    assert client.get(f"/solver/jobs/{first_job}/result").json() == client.get(f"/solver/{first}").json()
+    solution_cache.invalidate(first)
+    assert client.get(f"/solver/jobs/{first_job}/result").status_code == 410
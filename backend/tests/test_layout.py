@@ -0,0 +1,97 @@
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import pytest
+from benchmarks.synthetic import synthetic_edges, puzzle_payload
+from core import layout
+from core.solver import invalidate_solutions
+
+
+def _regular(create_puzzle, regular=True):
+    pid, created = create_puzzle(
+        [{"sequenceNumber": n, "pieceOrientation": 0, "group": 1} for n in range(1, 13)],
+        puzzleTypeIsRegular=regular, row_size=3,
+    )
+    return pid, {p["sequenceNumber"]: p["pieceId"] for p in created}
+
+
+def test_adjacency_pairs_each_neighbor_once():
+    placed = [{"pieceId": f"{r}{c}", "row": r, "col": c} for r in (1, 2) for c in (1, 2)]
+    assert sorted((a["a"], a["b"], a["side"]) for a in layout.adjacency(placed)) == [
+        ("11", "12", "right"), ("11", "21", "bottom"), ("12", "22", "bottom"), ("21", "22", "right"),
+    ]
+
+
+def test_neighbors_come_from_the_stored_layout(client, create_puzzle):
+    pid, ids = _regular(create_puzzle)
+    found = client.get(f"/solver/{pid}/neighbors/{ids[6]}").json()
+    assert found["placement"] == {"row": 2, "col": 2, "orientation": 0}
+    assert found["layoutVersion"] == found["version"]
+    assert [(n["side"], n["sequenceNumber"]) for n in found["neighbors"]] == [
+        ("top", 2), ("right", 7), ("bottom", 10), ("left", 5),
+    ]
+    stored = client.get(f"/solver/{pid}/layout").json()
+    assert [pl["sequenceNumber"] for pl in stored["placements"]] == list(range(1, 13))
+
+    # Una escritura deja vieja la disposición: se recalcula al pedirla
+    client.delete(f"/puzzle/{pid}/pieces/{ids[7]}")
+    found = client.get(f"/solver/{pid}/neighbors/{ids[6]}").json()
+    assert found["layoutVersion"] == found["version"]
+    assert [n["side"] for n in found["neighbors"]] == ["top", "bottom", "left"]
+
+    assert client.delete(f"/solver/{pid}/layout").status_code == 204
+    assert client.get(f"/solver/{pid}/layout").json()["layoutVersion"] == found["version"]
+    assert client.get(f"/solver/{pid}/neighbors/{ids[7]}").status_code == 404
+
+
+def test_irregular_puzzles_have_no_layout(client, create_puzzle):
+    pid, ids = _regular(create_puzzle, regular=False)
+    assert client.get(f"/solver/{pid}/layout").status_code == 400
+    assert client.get("/solver/none/layout").status_code == 404
+
+
+def test_unexpected_errors_are_not_client_errors(client, create_puzzle, repository, monkeypatch):
+    pid, ids = _regular(create_puzzle)
+
+    async def broken(*args):
+        raise RuntimeError("se cayó la conexión")
+
+    monkeypatch.setattr(repository, "get_layout", broken)
+    # Sólo UnsolvablePuzzle es un 400: el resto llega como error del servidor
+    with pytest.raises(RuntimeError):
+        client.get(f"/solver/{pid}/layout")
+
+
+def test_edges_solution_reuses_the_stored_layout(client, create_puzzle, monkeypatch):
+    puzzle, loose = synthetic_edges(36, seed=2)
+    pid, _ = create_puzzle(loose, **puzzle_payload(puzzle))
+    first = client.get(f"/solver/{pid}").json()
+
+    def search(*args):
+        raise AssertionError("no debería volver a buscar")
+
+    invalidate_solutions(pid)
+    monkeypatch.setattr(layout, "solved_layout", search)
+    assert client.get(f"/solver/{pid}").json() == first
+    assert client.get(f"/solver/{pid}/structured").json()["summary"]["mode"] == "edges"
+
+
+def test_edges_layout_identifies_pieces_without_sequence_numbers(client, create_puzzle):
+    puzzle, loose = synthetic_edges(9, seed=4)
+    # Por bordes el número de secuencia no identifica la pieza: todas repiten el mismo
+    pid, created = create_puzzle([{**p, "sequenceNumber": 1} for p in loose], **puzzle_payload(puzzle))
+    placed = client.get(f"/solver/{pid}/layout").json()["placements"]
+    assert sorted(pl["pieceId"] for pl in placed) == sorted(p["pieceId"] for p in created)
+
+    at = {(pl["row"], pl["col"]): pl["pieceId"] for pl in placed}
+    center = client.get(f"/solver/{pid}/neighbors/{at[2, 2]}").json()
+    assert [(n["side"], n["pieceId"]) for n in center["neighbors"]] == [
+        ("top", at[1, 2]), ("right", at[2, 3]), ("bottom", at[3, 2]), ("left", at[2, 1]),
+    ]
+
+    # Sin sequenceNumber, igual cada paso va con su pieza
+    pieces = [{k: v for k, v in p.items() if k != "sequenceNumber"} | {"pieceId": str(i)} for i, p in enumerate(loose)]
+    _, steps, owners = layout.solved_layout({**puzzle, "solverMode": "edges"}, pieces)
+    placed = layout.placements(owners, steps)
+    assert sorted(pl["pieceId"] for pl in placed) == [str(i) for i in range(9)]
+    assert sorted((pl["row"], pl["col"]) for pl in placed) == [(r, c) for r in (1, 2, 3) for c in (1, 2, 3)]
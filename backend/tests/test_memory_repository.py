@@ -0,0 +1,69 @@
+import os, sys
+import asyncio
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import core.solver as solver
+from repositories import set_repository
+from repositories.memory import MemoryRepository
+
+PUZZLE = {"puzzleTypeIsRegular": True, "puzzleTheme": "t", "puzzleBrand": "b",
+          "puzzlePieceQty": 6, "puzzleMaterial": "m", "row_size": 2}
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_writes_bump_version_and_keep_sequence_index():
+    repo = MemoryRepository()
+    _run(repo.create_puzzle("p", PUZZLE))
+    created = _run(repo.create_pieces("p", [
+        {"sequenceNumber": 3, "pieceOrientation": 0, "group": 1, "status": "present"},
+        {"sequenceNumber": 1, "pieceOrientation": 90, "group": 2, "status": "present"},
+    ]))
+    assert all(piece["puzzleId"] == "p" for piece in created)
+    assert _run(repo.get_puzzle_version("p")) == 1
+
+    piece, version = _run(repo.update_piece("p", created[0]["pieceId"], {"status": "missing"}))
+    assert (piece["status"], version) == ("missing", 2)
+    assert _run(repo.delete_piece("p", created[1]["pieceId"]))
+    assert not _run(repo.delete_piece("p", created[1]["pieceId"]))
+    assert _run(repo.get_puzzle_version("p")) == 3
+    assert repo._sequences["p"].keys() == {3}
+
+    assert _run(repo.create_pieces("otro", [{"sequenceNumber": 1}])) == []
+    assert _run(repo.update_piece("p", "x", {"group": 1})) is None
+
+
+def test_stream_solution_matches_solver():
+    repo = MemoryRepository()
+    set_repository(repo)
+    try:
+        for regular in (True, False):
+            pid = f"p{regular}"
+            _run(repo.create_puzzle(pid, {**PUZZLE, "puzzleTypeIsRegular": regular}))
+            _run(repo.create_pieces(pid, [
+                {"sequenceNumber": s, "pieceOrientation": 90 * (s % 4), "group": s % 2,
+                 "status": "missing" if s == 4 else "present"}
+                for s in (6, 2, 1, 4, 5, 2)
+            ]))
+
+            async def collect():
+                return [item async for item in solver.stream_solution(pid)]
+
+            summary, *steps = _run(collect())
+            puzzle, pieces = _run(repo.get_puzzle_and_pieces(pid))
+            expected = solver.solve_structured(puzzle, pieces)
+            assert summary == expected["summary"]
+            assert solver.to_columns(steps) == expected["steps"]
+    finally:
+        set_repository(None)
+
+
+def test_delete_puzzle_removes_its_pieces():
+    repo = MemoryRepository()
+    _run(repo.create_puzzle("p", PUZZLE))
+    _run(repo.create_pieces("p", [{"sequenceNumber": n} for n in range(5)]))
+    assert _run(repo.delete_puzzle("p")) == 5
+    assert _run(repo.list_pieces("p")) == []
+    assert _run(repo.delete_puzzle("p")) == 0
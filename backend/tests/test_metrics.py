@@ -0,0 +1,77 @@
+import os, sys
+import asyncio
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from services import metrics
+
+
+def test_histogram_renders_cumulative_buckets():
+    h = metrics.Histogram("demo_seconds", "Demo.", ("route",), (0.1, 1))
+    h.observe(0.05, "/a")
+    h.observe(0.5, "/a")
+    h.observe(5, "/a")
+    lines = h.render()
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{route="/a"} 3' in lines
+
+
+def test_nested_phases_are_exclusive():
+    stats = metrics.RequestStats()
+    token = metrics._current.set(stats)
+    try:
+        with metrics.timed("db"):
+            time.sleep(0.01)
+            with metrics.timed("convert"):
+                time.sleep(0.02)
+    finally:
+        metrics._current.reset(token)
+    assert 0.01 <= stats.phases["db"] < 0.02
+    assert stats.phases["convert"] >= 0.02
+
+
+def test_concurrent_tasks_keep_their_own_phases():
+    stats = metrics.RequestStats()
+
+    async def phase(name, seconds):
+        with metrics.timed(name):
+            await asyncio.sleep(seconds)
+
+    async def request():
+        token = metrics._current.set(stats)
+        try:
+            # Las fases se abren y cierran intercaladas: db termina antes que convert
+            await asyncio.gather(phase("db", 0.01), phase("convert", 0.04))
+        finally:
+            metrics._current.reset(token)
+
+    asyncio.run(request())
+    assert 0.01 <= stats.phases["db"] < 0.03
+    assert stats.phases["convert"] >= 0.04
+
+
+def test_middleware_records_route_phases_and_pieces():
+    router = APIRouter(route_class=metrics.TimedRoute)
+
+    @router.get("/items/{item_id}")
+    async def item(item_id: int):
+        with metrics.timed("solve"):
+            metrics.count_pieces(7)
+        return {"id": item_id}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(metrics.MetricsMiddleware)
+    for h in (metrics.request_duration, metrics.phase_duration, metrics.request_pieces):
+        h.clear()
+
+    assert TestClient(app).get("/items/3").json() == {"id": 3}
+    text = metrics.render_metrics()
+    assert 'http_request_duration_seconds_count{method="GET",route="/items/{item_id}",status="200"} 1' in text
+    assert 'http_request_phase_seconds_count{route="/items/{item_id}",phase="solve"} 1' in text
+    assert 'http_request_phase_seconds_count{route="/items/{item_id}",phase="serialize"} 1' in text
+    assert 'http_request_pieces_sum{route="/items/{item_id}"} 7' in text
@@ -0,0 +1,84 @@
+import os, sys
+import asyncio
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from services import neo4j as service
+
+
+class _Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __aiter__(self):
+        async def rows():
+            for row in self.rows:
+                yield row
+        return rows()
+
+
+class _Session:
+    """Sesión falsa: el primer intento de cada transacción falla como lo haría un cambio de líder."""
+
+    def __init__(self, access_mode):
+        self.access_mode = access_mode
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, parameters):
+        return _Result([{"query": query, **parameters}])
+
+    async def _retrying(self, work):
+        try:
+            await work(self)
+            raise AssertionError("el primer intento debía fallar")
+        except RuntimeError:
+            pass
+        return await work(self)
+
+    async def execute_read(self, work):
+        assert self.access_mode == service.READ_ACCESS
+        return await self._retrying(work)
+
+    async def execute_write(self, work):
+        assert self.access_mode == service.WRITE_ACCESS
+        return await self._retrying(work)
+
+
+def test_managed_transactions_route_retry_and_record_metrics(monkeypatch):
+    monkeypatch.setattr(service, "get_async_session", _Session)
+    monkeypatch.setattr(service, "pool_metrics", service.PoolMetrics())
+    calls = []
+
+    async def work(tx, value):
+        calls.append(value)
+        if len(calls) % 2:
+            raise RuntimeError("transitorio")
+        result = await tx.run("RETURN $v", {"v": value})
+        return [rec async for rec in result]
+
+    assert asyncio.run(service.read_transaction(work, 1)) == [{"query": "RETURN $v", "v": 1}]
+    assert asyncio.run(service.write_transaction(work, 2)) == [{"query": "RETURN $v", "v": 2}]
+
+    stats = service.pool_metrics.snapshot()
+    assert (stats["transactions"], stats["retries"], stats["failures"]) == (2, 2, 0)
+    assert (stats["in_use"], stats["waiting"], stats["peak_in_use"]) == (0, 0, 1)
+
+
+def test_failed_transaction_is_counted(monkeypatch):
+    monkeypatch.setattr(service, "pool_metrics", service.PoolMetrics())
+
+    class Unavailable(_Session):
+        async def __aenter__(self):
+            raise ConnectionError("sin conexión")
+
+    monkeypatch.setattr(service, "get_async_session", Unavailable)
+    try:
+        asyncio.run(service.read("RETURN 1"))
+    except ConnectionError:
+        pass
+    stats = service.pool_metrics.snapshot()
+    assert (stats["failures"], stats["transactions"], stats["waiting"]) == (1, 0, 0)
@@ -0,0 +1,20 @@
+import os, sys
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+pytest.importorskip("numpy")
+import core.solver as solver
+from benchmarks.bench_engines import synthetic_regular
+
+
+@pytest.mark.parametrize("n", [1, 7, 500])
+def test_numpy_engine_matches_python(n):
+    puzzle, pieces = synthetic_regular(n, seed=n)
+    # Números repetidos, fuera de rango, sin grupo y orientaciones no estándar
+    pieces += [
+        {"sequenceNumber": 1, "pieceOrientation": 45, "group": None, "status": "present"},
+        {"sequenceNumber": n + 3, "pieceOrientation": 0, "group": 2, "status": "present"},
+    ]
+    puzzle["puzzleId"] = "p"
+    assert solver.solve_regular(puzzle, pieces, engine="numpy") == solver.solve_regular(puzzle, pieces, engine="python")
+    assert solver.solve_structured(puzzle, pieces, engine="numpy") == solver.solve_structured(puzzle, pieces, engine="python")
@@ -0,0 +1,57 @@
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import pytest
+from core.pagination import decode_cursor, encode_cursor, parse_fields
+
+
+def test_cursor_round_trip_and_validation():
+    assert decode_cursor(encode_cursor([3, "abc"]), 2) == [3, "abc"]
+    with pytest.raises(ValueError):
+        decode_cursor("no-es-un-cursor", 2)
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(["x"]), 2)
+    assert parse_fields(None, ("a", "b"), ("a",)) is None
+    assert parse_fields("b", ("a", "b"), ("a",)) == ["a", "b"]
+    with pytest.raises(ValueError):
+        parse_fields("c", ("a", "b"), ("a",))
+
+
+def test_pieces_keyset_pages_filters_and_projection(client, create_puzzle):
+    pid, _ = create_puzzle(puzzlePieceQty=5, row_size=5)
+    client.post(f"/puzzle/{pid}/pieces/bulk", json=[
+        {"sequenceNumber": seq, "pieceOrientation": 0, "group": seq % 2,
+         "status": "missing" if seq == 4 else "present"}
+        for seq in (5, 3, 1, 4, 2)
+    ])
+
+    seen, cursor = [], None
+    while True:
+        resp = client.get(f"/puzzle/{pid}/pieces/", params={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert resp.status_code == 200
+        seen += [p["sequenceNumber"] for p in resp.json()]
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == [1, 2, 3, 4, 5]
+
+    resp = client.get(f"/puzzle/{pid}/pieces/", params={"group": 1, "fields": "status"})
+    assert [sorted(p) for p in resp.json()] == [["pieceId", "sequenceNumber", "status"]] * 3
+    assert client.get(f"/puzzle/{pid}/pieces/count", params={"status": "missing"}).json() == {"count": 1}
+    assert client.get(f"/puzzle/{pid}/pieces/", params={"fields": "color"}).status_code == 400
+    assert client.get(f"/puzzle/{pid}/pieces/", params={"cursor": "x"}).status_code == 400
+
+
+def test_puzzles_filters_count_and_pages(client, create_puzzle):
+    ids = sorted(create_puzzle(puzzleTheme=t, puzzleTypeIsRegular=t != "Animales")[0]
+                 for t in ("Paisajes", "Animales", "Paisajes"))
+    assert client.get("/puzzles/count").json() == {"count": 3}
+    assert client.get("/puzzles/count", params={"theme": "Paisajes"}).json() == {"count": 2}
+    assert [p["puzzleId"] for p in client.get("/puzzles/", params={"regular": False}).json()] == \
+        [pid for pid in ids if client.get(f"/puzzles/{pid}").json()["puzzleTheme"] == "Animales"]
+
+    first = client.get("/puzzles/", params={"limit": 2, "fields": "puzzleTheme"})
+    assert [p["puzzleId"] for p in first.json()] == ids[:2]
+    second = client.get("/puzzles/", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+    assert [p["puzzleId"] for p in second.json()] == ids[2:]
+    assert "X-Next-Cursor" not in second.headers
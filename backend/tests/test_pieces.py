@@ -0,0 +1,85 @@
+import os, sys
+import asyncio
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import core.solver as solver
+from core.pieces import PieceColumns
+from repositories.memory import MemoryRepository
+from benchmarks.synthetic import synthetic_regular, synthetic_irregular
+
+
+def _with_edge_cases(pieces, n):
+    # Números repetidos (gana el último), fuera de rango, sin grupo y un status desconocido
+    return pieces + [
+        {"sequenceNumber": 1, "pieceOrientation": 45, "group": 1, "status": "present"},
+        {"sequenceNumber": n + 3, "pieceOrientation": 0, "group": 2, "status": "present"},
+        {"sequenceNumber": 2, "pieceOrientation": 90, "group": 1, "status": "unknown"},
+    ]
+
+
+@pytest.mark.parametrize("n", [0, 1, 7, 500])
+def test_columns_match_dicts(n):
+    regular, regular_pieces = synthetic_regular(n, seed=n)
+    irregular, irregular_pieces = synthetic_irregular(n, seed=n)
+    regular_pieces = _with_edge_cases(regular_pieces, n)
+    irregular_pieces = _with_edge_cases(irregular_pieces, n)
+    regular["puzzleId"] = irregular["puzzleId"] = "p"
+
+    for puzzle, pieces, solve in ((regular, regular_pieces, solver.solve_regular),
+                                  (irregular, irregular_pieces, solver.solve_irregular)):
+        columns = PieceColumns.from_dicts(pieces)
+        assert len(columns) == len(pieces)
+        assert solve(puzzle, columns) == solve(puzzle, pieces)
+        assert solver.solve_structured(puzzle, columns) == solver.solve_structured(puzzle, pieces)
+
+
+def test_numpy_engine_reads_columns_without_copying():
+    np = pytest.importorskip("numpy")
+    from core import numpy_engine
+
+    puzzle, pieces = synthetic_regular(200, seed=3)
+    pieces.append({"sequenceNumber": 5, "pieceOrientation": 90, "group": None, "status": "present"})
+    puzzle["puzzleId"] = "p"
+    columns = PieceColumns.from_dicts(pieces)
+    assert solver.solve_regular(puzzle, columns, "numpy") == solver.solve_regular(puzzle, pieces, "python")
+    assert solver.solve_structured(puzzle, columns, "numpy") == solver.solve_structured(puzzle, pieces, "python")
+
+    seq = numpy_engine._arrays(columns)[0]
+    assert np.shares_memory(seq, np.frombuffer(columns.seq, dtype=np.int64))
+
+
+def test_repository_projects_solver_fields():
+    repo = MemoryRepository()
+
+    async def scenario():
+        await repo.create_puzzle("p", {"puzzleTypeIsRegular": False, "puzzlePieceQty": 3})
+        await repo.create_pieces("p", [
+            {"sequenceNumber": 2, "pieceOrientation": 90, "group": 4, "status": "missing"},
+            {"sequenceNumber": 1, "pieceOrientation": 180, "group": 3, "status": "present"},
+        ])
+        return await repo.get_puzzle_and_piece_columns("p"), await repo.get_puzzle_and_piece_columns("x")
+
+    (puzzle, columns), missing = asyncio.run(scenario())
+    assert puzzle["version"] == 1
+    assert (list(columns.seq), list(columns.group), list(columns.orientation), list(columns.present)) == (
+        [2, 1], [4, 3], [90, 180], [0, 1]
+    )
+    assert columns.nbytes() == 2 * 25
+    assert missing[0] is None and len(missing[1]) == 0
+
+
+def test_solver_pieces_come_whole_only_for_edges_puzzles():
+    repo = MemoryRepository()
+
+    async def scenario():
+        await repo.create_puzzle("r", {"puzzleTypeIsRegular": True, "puzzlePieceQty": 1})
+        await repo.create_puzzle("e", {"puzzleTypeIsRegular": True, "puzzlePieceQty": 1, "solverMode": "edges"})
+        for pid in ("r", "e"):
+            await repo.create_pieces(pid, [{"sequenceNumber": 1, "edges": [0, 0, 0, 0]}])
+        return [await repo.get_puzzle_and_solver_pieces(pid) for pid in ("r", "e", "x")]
+
+    (_, regular), (_, edges), (missing, empty) = asyncio.run(scenario())
+    assert isinstance(regular, PieceColumns) and list(regular.seq) == [1]
+    assert [p["edges"] for p in edges] == [[0, 0, 0, 0]]
+    assert missing is None and len(empty) == 0
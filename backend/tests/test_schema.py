@@ -0,0 +1,45 @@
+import os, sys
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from services import schema
+
+
+def test_plan_walk_finds_nested_index_seek():
+    plan = {
+        "operatorType": "ProduceResults@neo4j",
+        "children": [{
+            "operatorType": "Expand(All)@neo4j",
+            "children": [{"operatorType": "NodeUniqueIndexSeek@neo4j", "children": []}],
+        }],
+    }
+    assert schema.plan_uses_index_seek(plan)
+    assert not schema.plan_uses_index_seek({"operatorType": "NodeByLabelScan@neo4j", "children": []})
+
+
+def _operator(operator: str, details: str) -> dict:
+    return {"operatorType": f"{operator}@neo4j", "arguments": {"Details": details}, "children": []}
+
+
+def test_required_index_needs_a_seek_on_that_index():
+    index = schema.PIECE_SEQUENCE_INDEX
+    composite = "RANGE INDEX piece:Piece(puzzleId, sequenceNumber) WHERE puzzleId = $puzzle_id"
+    seek = {"operatorType": "ProduceResults@neo4j", "children": [_operator("NodeIndexSeek", composite)]}
+    assert schema.plan_uses_index_seek(seek, index)
+    # Recorrer el índice compuesto, o buscar en otro índice, no alcanza
+    assert not schema.plan_uses_index_seek(_operator("NodeIndexScan", composite), index)
+    assert not schema.plan_uses_index_seek(_operator("NodeIndexScan", composite))
+    unique = _operator("NodeUniqueIndexSeek", "UNIQUE piece:Piece(pieceId) WHERE pieceId = $piece_id")
+    assert schema.plan_uses_index_seek(unique)
+    assert not schema.plan_uses_index_seek(unique, index)
+
+
+def test_hot_queries_use_index_seeks():
+    """Requiere un Neo4j accesible (mismas variables de entorno que la app)."""
+    from services.neo4j import get_driver
+    try:
+        get_driver().verify_connectivity()
+    except Exception as e:
+        pytest.skip(f"Neo4j no disponible: {e}")
+    assert schema.ensure_schema() == []
+    assert schema.check_index_usage() == {name: True for name in schema.HOT_QUERIES}
@@ -0,0 +1,110 @@
+import os, sys
+import asyncio
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import core.solver as solver
+from core.singleflight import SingleFlight
+from repositories import set_repository
+from repositories.memory import MemoryRepository
+from services.metrics import render_metrics
+
+PUZZLE = {"puzzleTypeIsRegular": True, "puzzleTheme": "t", "puzzleBrand": "b",
+          "puzzlePieceQty": 6, "puzzleMaterial": "m", "row_size": 2}
+
+
+class SlowRepository(MemoryRepository):
+    """Cuenta las lecturas completas y las demora, para que los pedidos se superpongan."""
+
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    async def get_puzzle_and_pieces(self, puzzle_id: str):
+        self.reads += 1
+        await asyncio.sleep(0.05)
+        return await super().get_puzzle_and_pieces(puzzle_id)
+
+
+def test_concurrent_calls_share_result_and_error():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def work(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        if value == "boom":
+            raise RuntimeError("falló")
+        return [value]
+
+    async def scenario():
+        results = await asyncio.gather(*(flight.do(("p", 1), work, "ok") for _ in range(5)))
+        assert all(r is results[0] for r in results)
+        errors = await asyncio.gather(*(flight.do(("p", 2), work, "boom") for _ in range(3)),
+                                      return_exceptions=True)
+        assert all(isinstance(e, RuntimeError) and str(e) == "falló" for e in errors)
+        # Terminado, la clave se libera: un pedido nuevo vuelve a ejecutar
+        assert await flight.do(("p", 1), work, "ok") == ["ok"]
+
+    asyncio.run(scenario())
+    assert calls == ["ok", "boom", "ok"]
+    assert (flight.leaders, flight.coalesced, flight.in_flight()) == (3, 6, 0)
+
+
+def test_leader_cancellation_and_forget():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def work():
+        calls.append(1)
+        n = len(calls)
+        await asyncio.sleep(0.02)
+        return n
+
+    async def scenario():
+        leader = asyncio.create_task(flight.do(("p",), work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do(("p",), work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        # El que esperaba recibe el resultado aunque el líder se haya ido
+        assert await follower == 1
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+        first = asyncio.create_task(flight.do(("p",), work))
+        await asyncio.sleep(0)
+        flight.forget("p")  # p. ej. tras una escritura: no sumarse a la lectura anterior
+        second = await flight.do(("p",), work)
+        assert (await first, second) == (2, 3)
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_solves_read_the_puzzle_once():
+    repo = SlowRepository()
+    set_repository(repo)
+    try:
+        async def scenario():
+            await repo.create_puzzle("p", PUZZLE)
+            await repo.create_pieces("p", [
+                {"sequenceNumber": n, "pieceOrientation": 0, "group": 1, "status": "present"}
+                for n in range(1, 7)
+            ])
+            solver.invalidate_solutions("p")
+            plain = solver.solve_puzzle_cached("p")
+            structured = solver.solve_puzzle_structured_cached("p")
+            return await asyncio.gather(*[plain] + [solver.solve_puzzle_cached("p") for _ in range(9)]
+                                        + [structured, solver.solve_puzzle_structured_cached("p")])
+
+        before = solver.solutions_in_flight.coalesced
+        results = asyncio.run(scenario())
+        assert all(r is results[0] for r in results[:10])
+        assert results[10] is results[11]
+        # Una sola lectura completa para las diez resoluciones en texto (la estructurada lee columnas)
+        assert repo.reads == 1
+        assert solver.solutions_in_flight.coalesced - before == 9
+        assert 'singleflight_coalesced_total{operation="solution"}' in render_metrics()
+    finally:
+        set_repository(None)
+        solver.invalidate_solutions("p")
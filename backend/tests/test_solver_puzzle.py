@@ -36,9 +36,9 @@ def test_solve_regular_all_present(regular_puzzle_dict, regular_pieces_all_prese
     # Resumen correcto
     assert instr[0] == "Rompecabezas regular: 2 filas x 3 columnas (total 6 piezas, 0 faltantes)."
     # Verifica la primera y última instrucción
-    assert instr[1] == "Pieza 1: colócala en (1, 1) con orientación 0°."
-    assert instr[2] == "Pieza 2: colócala en (1, 2) con orientación 90°."
-    assert instr[-1] == "Pieza 6: colócala en (2, 3) con orientación 90°."
+    assert instr[1] == "Pieza 1: colócala en la columna 1, fila 1 y gira la pieza de forma que la flecha apunte hacia arriba."
+    assert instr[2] == "Pieza 2: colócala en la columna 2, fila 1 y gira la pieza de forma que la flecha apunte hacia la derecha."
+    assert instr[-1] == "Pieza 6: colócala en la columna 3, fila 2 y gira la pieza de forma que la flecha apunte hacia la derecha."
 
 def test_solve_regular_with_missing(regular_puzzle_dict, regular_pieces_with_missing):
     instr = solver.solve_regular(regular_puzzle_dict, regular_pieces_with_missing)
@@ -59,12 +59,12 @@ def test_solve_irregular_simple():
     # Resumen inicial
     assert "dividido en 2 grupos (total 3 piezas, 1 faltantes)." in instr[0]
     # Grupo 1
-    idx1 = instr.index("Grupo 1:")
-    assert instr[idx1 + 1] == "  - Pieza 1: orientación 0°"
-    assert instr[idx1 + 2] == "  - Pieza 2: falta esta pieza."
+    idx1 = instr.index("Grupo 1 (2 piezas):")
+    assert instr[idx1 + 1] == "- Pieza 1 del grupo 1: gira la pieza de forma que la flecha apunte hacia arriba."
+    assert instr[idx1 + 2] == "- Pieza 2 del grupo 1: falta esta pieza."
     # Grupo 2
-    idx2 = instr.index("Grupo 2:")
-    assert instr[idx2 + 1] == "  - Pieza 3: orientación 180°"
+    idx2 = instr.index("Grupo 2 (1 piezas):")
+    assert instr[idx2 + 1] == "- Pieza 3 del grupo 2: gira la pieza de forma que la flecha apunte hacia abajo."
 
 def test_solve_puzzle_regular(monkeypatch, regular_puzzle_dict, regular_pieces_all_present):
     # Simular fetch
@@ -0,0 +1,75 @@
+import os, sys
+import asyncio
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from fastapi.testclient import TestClient
+import app as app_module
+from benchmarks.cold_start import probe
+from services import schema
+from services.health import StartupState
+
+
+def test_import_does_not_load_the_driver_or_numpy():
+    result = probe("memory")
+    assert result["heavy"] == []
+    assert set(result["phases"]) == {"import", "startup", "ready"}
+
+
+def test_live_answers_while_the_database_warms_up(monkeypatch):
+    connected = asyncio.Event()
+    attempts = []
+
+    async def warm_up():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("base inalcanzable")
+        await connected.wait()
+
+    monkeypatch.setattr(app_module, "PUZZLE_REPOSITORY", "neo4j")
+    monkeypatch.setattr(app_module, "NEO4J_WARMUP_RETRY_SECONDS", 0)
+    monkeypatch.setattr(app_module, "warm_up", warm_up)
+    monkeypatch.setattr(app_module, "startup_state", StartupState())
+    monkeypatch.setattr(schema, "ensure_schema", lambda: [])
+
+    with TestClient(app_module.app) as client:
+        assert client.get("/live").status_code == 200
+        pending = client.get("/ready")
+        assert pending.status_code == 503
+        assert pending.json()["ready"] is False
+
+        client.portal.call(connected.set)
+        for _ in range(100):
+            ready = client.get("/ready")
+            if ready.status_code == 200:
+                break
+        assert ready.json()["ready"] is True
+        assert ready.json()["failedAttempts"] == 1
+        assert "ready" in ready.json()["startupSeconds"]
+
+
+def test_schema_failure_is_reported_once_without_blocking_readiness(monkeypatch):
+    calls = {"warm_up": 0, "schema": 0}
+
+    async def warm_up():
+        calls["warm_up"] += 1
+
+    def ensure_schema():
+        calls["schema"] += 1
+        raise PermissionError("sin permiso para crear restricciones")
+
+    monkeypatch.setattr(app_module, "PUZZLE_REPOSITORY", "neo4j")
+    monkeypatch.setattr(app_module, "NEO4J_WARMUP_RETRY_SECONDS", 0)
+    monkeypatch.setattr(app_module, "warm_up", warm_up)
+    monkeypatch.setattr(app_module, "startup_state", StartupState())
+    monkeypatch.setattr(schema, "ensure_schema", ensure_schema)
+
+    with TestClient(app_module.app) as client:
+        for _ in range(100):
+            ready = client.get("/ready")
+            if ready.status_code == 200:
+                break
+        body = ready.json()
+        assert body["ready"] is True and body["failedAttempts"] == 0
+        assert body["schema"]["status"] == "missing"
+        assert "PermissionError" in body["schema"]["error"]
+    assert calls == {"warm_up": 1, "schema": 1}
@@ -0,0 +1,70 @@
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import core.solver as solver
+from models.solution import StructuredSolution
+
+
+def test_regular_columns_and_text_layer():
+    puzzle = {"puzzleId": "p", "puzzleTypeIsRegular": True, "puzzlePieceQty": 4, "row_size": 2, "version": 3}
+    pieces = [
+        {"sequenceNumber": 1, "pieceOrientation": 90, "group": 1, "status": "present"},
+        {"sequenceNumber": 2, "pieceOrientation": 0, "group": 1, "status": "missing"},
+        {"sequenceNumber": 4, "pieceOrientation": 180, "group": 1, "status": "present"},
+    ]
+    solution = solver.solve_structured(puzzle, pieces)
+    steps = solution["steps"]
+    assert solution["version"] == 3
+    assert solution["summary"]["missing"] == 2
+    assert steps["row"] == [1, 1, 2, 2]
+    assert steps["col"] == [1, 2, 1, 2]
+    assert steps["missing"] == [False, True, True, False]
+    assert steps["absent"] == [False, False, True, False]
+    assert steps["orientation"] == [90, None, None, 180]
+
+    text = solver.with_text(solution)
+    assert [text["summary"]["text"]] + text["steps"]["text"] == solver.solve_regular(puzzle, pieces)
+    assert "text" not in solution["steps"]
+    StructuredSolution(**text)
+
+
+def test_irregular_groups_in_summary():
+    puzzle = {"puzzleId": "p", "puzzleTypeIsRegular": False, "puzzlePieceQty": 3}
+    pieces = [
+        {"sequenceNumber": 3, "pieceOrientation": 0, "group": 2, "status": "present"},
+        {"sequenceNumber": 1, "pieceOrientation": 90, "group": 1, "status": "missing"},
+        {"sequenceNumber": 2, "pieceOrientation": 180, "group": 2, "status": "present"},
+    ]
+    solution = solver.solve_structured(puzzle, pieces)
+    assert solution["summary"]["groups"] == [1, 2]
+    assert solution["summary"]["groupSizes"] == [1, 2]
+    assert solution["steps"]["seq"] == [1, 2, 3]
+    assert solution["steps"]["row"] == [None, None, None]
+
+    text = solver.with_text(solution)
+    lines = solver.solve_irregular(puzzle, pieces)
+    assert text["summary"]["text"] == lines[0]
+    assert text["steps"]["text"] == [l for l in lines[1:] if not l.startswith("Grupo ")]
+
+
+def test_regular_steps_are_lazy_and_match_ordered_stream():
+    import asyncio
+    from core.steps import regular_solution, aiter_regular_steps
+    puzzle = {"puzzleTypeIsRegular": True, "puzzlePieceQty": 6, "row_size": 2}
+    pieces = [
+        {"sequenceNumber": 5, "pieceOrientation": 0, "group": 1, "status": "present"},
+        {"sequenceNumber": 2, "pieceOrientation": 90, "group": 1, "status": "present"},
+        {"sequenceNumber": 2, "pieceOrientation": 180, "group": 1, "status": "present"},
+        {"sequenceNumber": 9, "pieceOrientation": 0, "group": 1, "status": "present"},
+    ]
+    summary, steps = regular_solution(puzzle, pieces)
+    assert not isinstance(steps, list)
+
+    async def ordered():
+        for piece in sorted(pieces, key=lambda p: p["sequenceNumber"]):
+            yield piece
+
+    async def collect():
+        return [step async for step in aiter_regular_steps(summary, ordered())]
+
+    assert list(steps) == asyncio.run(collect())
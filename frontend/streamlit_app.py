@@ -1,7 +1,6 @@
 import streamlit as st
 import requests
 from collections import defaultdict
-import re
 
 API_BASE = "http://localhost:8000"  # Asegúrate que esté corriendo el backend con Uvicorn
 
@@ -75,69 +74,103 @@ with tabs[2]:
     st.header("Resolver un puzzle")
 
     pid = st.text_input("ID del puzzle a resolver", st.session_state.get("puzzle_id", ""))
+    por_pagina = st.number_input("Instrucciones por página", min_value=5, max_value=500, value=50, step=5)
+
+    # El avance (filas o grupos terminados y el cursor) se guarda en una sesión de armado del backend
+    col_nueva, col_retomar = st.columns(2)
+    if col_nueva.button("Resolver"):
+        resp = requests.post(f"{API_BASE}/solver/{pid}/sessions")
+        if resp.status_code == 201:
+            st.session_state.sesion_id = resp.json()["sessionId"]
+        else:
+            st.error(f"Error al resolver: {resp.text}")
+            st.session_state.sesion_id = None
+
+    if col_retomar.button("Retomar última sesión"):
+        resp = requests.get(f"{API_BASE}/solver/{pid}/sessions")
+        if resp.status_code == 200 and resp.json():
+            st.session_state.sesion_id = resp.json()[-1]["sessionId"]
+        elif resp.status_code == 200:
+            st.info("Este puzzle no tiene sesiones; usa Resolver para empezar una.")
+        else:
+            st.error(f"Error al buscar sesiones: {resp.text}")
 
-    if st.button("Resolver"):
-        resp = requests.get(f"{API_BASE}/solver/{pid}")
+    sesion_id = st.session_state.get("sesion_id")
+    sesion = None
+    if sesion_id:
+        resp = requests.get(f"{API_BASE}/solver/sessions/{sesion_id}")
         if resp.status_code == 200:
-            st.session_state.instrucciones = resp.json()
+            sesion = resp.json()
         else:
-            st.error(f"Error al resolver: {resp.text}")
-            st.session_state.instrucciones = None
+            st.error(f"Error al leer la sesión: {resp.text}")
 
-    instrucciones = st.session_state.get("instrucciones")
+    if sesion:
+        url_sesion = f"{API_BASE}/solver/sessions/{sesion_id}"
+        resumen = sesion["summary"]
+        avance = sesion["progress"]
+        is_regular = sesion["blockKind"] == "row"
+        nombre_bloques = "filas" if is_regular else "grupos"
 
-    if instrucciones:
         st.subheader("Instrucciones")
-        resumen = instrucciones[0]
-        st.markdown(f"🧩 {resumen}")
-
-        is_regular = resumen.lower().startswith("rompecabezas regular")
-
-        if is_regular:
-            # Agrupar por fila
-            fila_map = defaultdict(list)
-            for line in instrucciones[1:]:
-                match = re.search(r"fila (\d+)", line)
-                if match:
-                    fila = match.group(1)
-                    fila_map[fila].append(line)
-
-            for fila, lines in sorted(fila_map.items(), key=lambda x: int(x[0])):
-                checked = st.checkbox(f"✅ Marcar fila {fila} como resuelta", key=f"fila_{fila}")
-                label = f"Fila {fila}" + (" ✅" if checked else "")
-                with st.expander(label, expanded=not checked):
-                    for l in lines:
-                        icon = "🟡" if "falta esta pieza" in l or "marcada como faltante" in l else "🧩"
-                        st.markdown(f"{icon} {l}")
-
-        if not is_regular:
-            #––> Agrupación por grupo sin regex
-            grupo_map    = defaultdict(list)
-            grupo_orden  = []
-            grupo_actual = None
-
-            # Recorremos cada línea (sin el resumen)
-            for line in instrucciones[1:]:
-                text = line.strip()
-                # Si empieza con "Grupo ", es un título
-                if text.startswith("Grupo "):
-                    grupo_actual = text               # ej. "Grupo 1 (5 piezas):"
-                    grupo_orden.append(grupo_actual)
-                    grupo_map[grupo_actual] = []      # inicializamos lista
-                # Si ya tenemos un grupo en curso, lo añadimos
-                elif grupo_actual is not None:
-                    grupo_map[grupo_actual].append(text)
-
-            def emoji_grupo(idx):
-                numerados = ["1️⃣","2️⃣","3️⃣","4️⃣","5️⃣","6️⃣","7️⃣","8️⃣","9️⃣","🔟"]
-                letras     = ["🅰️","🅱️","🆎","🆑","🆒","🆓","🆔","🆕","🆖","🆗"]
-                return numerados[idx] if idx < len(numerados) else letras[(idx-len(numerados))%len(letras)]
-
-            for idx, grupo in enumerate(grupo_orden):
-                checked = st.checkbox(f"✅ Marcar {grupo} como resuelto", key=f"grupo_{idx}")
-                emoji   = emoji_grupo(idx)
-                label   = f"{emoji} {grupo}" + (" ✅" if checked else "")
-                with st.expander(label, expanded=not checked):
-                    for instr in grupo_map[grupo]:
-                        icon = "🟡" if "falta esta pieza" in instr else "🧩"
-                        st.markdown(f"{icon} {instr}")
+        st.markdown(f"🧩 {resumen['text']}")
+        st.progress(
+            avance["completedBlocks"] / max(avance["blocks"], 1),
+            text=f"{avance['completedBlocks']} de {avance['blocks']} {nombre_bloques} terminados · "
+                 f"{avance['remainingSteps']} pasos pendientes",
+        )
+        st.caption(f"Sesión {sesion_id}")
+
+        def marcar(bloque, key):
+            # Tildado: se completa el bloque; destildado: se reabre
+            campo = "complete" if st.session_state[key] else "reopen"
+            requests.patch(url_sesion, json={campo: [bloque]})
+
+        def mover_cursor(cursor):
+            requests.patch(url_sesion, json={"cursor": cursor})
+
+        # Sólo los próximos pasos pendientes desde el cursor, no la solución completa
+        pagina = requests.get(f"{url_sesion}/next", params={"limit": int(por_pagina)}).json()
+        pasos = pagina["steps"]
+
+        # Índices de los pasos por fila (regular) o por grupo (irregular), en orden de la solución
+        clave = pasos["row"] if is_regular else pasos["group"]
+        indices = defaultdict(list)
+        for i, k in enumerate(clave):
+            indices[k].append(i)
+
+        def icono(i):
+            return "🟡" if pasos["missing"][i] else "🧩"
+
+        def emoji_grupo(idx):
+            numerados = ["1️⃣","2️⃣","3️⃣","4️⃣","5️⃣","6️⃣","7️⃣","8️⃣","9️⃣","🔟"]
+            letras     = ["🅰️","🅱️","🆎","🆑","🆒","🆓","🆔","🆕","🆖","🆗"]
+            return numerados[idx] if idx < len(numerados) else letras[(idx-len(numerados))%len(letras)]
+
+        tamanos = dict(zip(resumen["groups"], resumen["groupSizes"]))
+        completados = set(sesion["completed"])
+        if not indices:
+            st.success("🎉 No quedan pasos pendientes desde esta posición.")
+        for bloque in indices:
+            if is_regular:
+                titulo = f"fila {bloque} como resuelta"
+                label = f"Fila {bloque}"
+            else:
+                titulo = f"grupo {bloque} como resuelto"
+                label = f"{emoji_grupo(resumen['groups'].index(bloque))} Grupo {bloque} ({tamanos[bloque]} piezas)"
+            with st.expander(label, expanded=True):
+                for i in indices[bloque]:
+                    st.markdown(f"{icono(i)} {pasos['text'][i]}")
+                key = f"bloque_{sesion_id}_{bloque}"
+                st.checkbox(f"✅ Marcar {titulo}", key=key, value=bloque in completados,
+                            on_change=marcar, args=(bloque, key))
+
+        col_inicio, col_siguientes = st.columns(2)
+        col_inicio.button("⬅️ Volver al inicio", on_click=mover_cursor, args=(0,), disabled=pagina["after"] == 0)
+        col_siguientes.button("Siguientes ➡️", on_click=mover_cursor, args=(pagina["nextCursor"],),
+                              disabled=pagina["nextCursor"] is None)
+
+        if sesion["completed"]:
+            reabrir = st.multiselect(f"{nombre_bloques.capitalize()} terminados", sesion["completed"])
+            if st.button("Reabrir") and reabrir:
+                requests.patch(url_sesion, json={"reopen": reabrir})
+                st.rerun()